@@ -0,0 +1,198 @@
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+from telethon.tl.types import (
+    InputPeerChannel,
+    Message,
+    MessageReplyHeader,
+    PeerChannel,
+    PeerUser,
+)
+
+# Telegram returns history in pages of up to 100 messages per request
+PAGE_SIZE = 100
+
+# Gemini endpoint that litellm calls for `gemini/...` models
+GEMINI_URL_PATTERN = r"https://generativelanguage\.googleapis\.com/.*"
+
+WORDS = (
+    "release update token price market community roadmap launch wallet "
+    "exchange listing staking rewards governance proposal vote bridge "
+    "security audit partnership airdrop developer api network fees"
+).split()
+
+
+class FakeTelegramClient:
+    """
+    Stand-in for Telethon's TelegramClient that serves N generated channels
+    of M messages each, with a configurable delay per resolve and per page.
+    """
+
+    def __init__(
+        self,
+        session: Any = None,
+        api_id: int = 0,
+        api_hash: str = "",
+        channels: int = 10,
+        messages: int = 100,
+        page_latency: float = 0.0,
+        resolve_latency: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.page_latency = page_latency
+        self.resolve_latency = resolve_latency
+        # Plain text, as with no parse mode configured
+        self.parse_mode = None
+        self.requests = 0
+        self._connected = False
+
+        rng = random.Random(seed)
+        start = datetime.now(timezone.utc) - timedelta(hours=12)
+        self.history: Dict[str, List[Message]] = {}
+        for c in range(channels):
+            peer = PeerChannel(1000 + c)
+            history = []
+            for i in range(1, messages + 1):
+                text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40)))
+                # Every fifth message replies to one of the last ten
+                reply_to = None
+                if i > 1 and i % 5 == 0:
+                    reply_to = MessageReplyHeader(
+                        reply_to_msg_id=rng.randint(max(1, i - 10), i - 1)
+                    )
+                msg = Message(
+                    id=i,
+                    peer_id=peer,
+                    date=start + timedelta(seconds=i * 30),
+                    message=text,
+                    from_id=PeerUser(rng.randint(1, 50)),
+                    reply_to=reply_to,
+                )
+                # Telethon attaches its client after parsing a response
+                msg._client = self
+                history.append(msg)
+            self.history[channel_handle(c)] = history
+
+    async def start(self) -> None:
+        self._connected = True
+
+    async def connect(self) -> None:
+        self._connected = True
+
+    async def disconnect(self) -> None:
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def get_input_entity(self, target: Any) -> InputPeerChannel:
+        await asyncio.sleep(self.resolve_latency)
+        self.requests += 1
+        handle = str(target).lstrip("@")
+        index = list(self.history).index(handle)
+        return InputPeerChannel(channel_id=1000 + index, access_hash=index)
+
+    async def iter_messages(
+        self,
+        entity: Any,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+        min_id: int = 0,
+        offset_date: Optional[datetime] = None,
+    ) -> AsyncIterator[Message]:
+        if isinstance(entity, InputPeerChannel):
+            history = list(self.history.values())[entity.channel_id - 1000]
+        else:
+            history = self.history[str(entity).lstrip("@")]
+
+        if offset_date is not None and offset_date.tzinfo is None:
+            # Like Telethon, treat naive datetimes as local time
+            offset_date = offset_date.astimezone(timezone.utc)
+        selected = [
+            m
+            for m in history
+            if m.id > min_id and (offset_date is None or m.date > offset_date)
+        ]
+        if not reverse:
+            selected.reverse()
+        if limit is not None:
+            selected = selected[:limit]
+
+        for i, msg in enumerate(selected):
+            if i % PAGE_SIZE == 0:
+                await asyncio.sleep(self.page_latency)
+                self.requests += 1
+            yield msg
+
+
+def channel_handle(index: int) -> str:
+    """Handle of the index-th generated channel."""
+    return f"bench_channel_{index}"
+
+
+class FakeLLM:
+    """
+    Gemini-compatible HTTP backend for respx with a fixed response latency
+    and an optional requests-per-minute limit answered with 429s.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        requests_per_minute: Optional[int] = None,
+        output_tokens: int = 120,
+    ) -> None:
+        self.latency = latency
+        self.requests_per_minute = requests_per_minute
+        self.output_tokens = output_tokens
+        self.calls = 0
+        self.rate_limited = 0
+        self._accepted: Deque[float] = deque()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        now = time.monotonic()
+        if self.requests_per_minute:
+            while self._accepted and now - self._accepted[0] >= 60:
+                self._accepted.popleft()
+            if len(self._accepted) >= self.requests_per_minute:
+                self.rate_limited += 1
+                retry_after = 60 - (now - self._accepted[0])
+                return httpx.Response(
+                    429,
+                    headers={"retry-after": f"{retry_after:.3f}"},
+                    json={
+                        "error": {
+                            "code": 429,
+                            "message": "Resource has been exhausted",
+                            "status": "RESOURCE_EXHAUSTED",
+                        }
+                    },
+                )
+            self._accepted.append(now)
+
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        prompt_tokens = len(request.content) // 4
+        text = " ".join(WORDS[i % len(WORDS)] for i in range(self.output_tokens))
+        return httpx.Response(
+            200,
+            json={
+                "candidates": [
+                    {
+                        "content": {"parts": [{"text": text}], "role": "model"},
+                        "finishReason": "STOP",
+                        "index": 0,
+                    }
+                ],
+                "usageMetadata": {
+                    "promptTokenCount": prompt_tokens,
+                    "candidatesTokenCount": self.output_tokens,
+                    "totalTokenCount": prompt_tokens + self.output_tokens,
+                },
+            },
+        )
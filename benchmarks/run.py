@@ -0,0 +1,258 @@
+"""
+End-to-end benchmarks for TeleShell against a fake Telegram client and a fake
+Gemini HTTP backend. Run from the repository root:
+
+    python -m benchmarks.run --channels 20 --messages 200 --save baseline.json
+    python -m benchmarks.run --channels 20 --messages 200 --compare baseline.json
+"""
+
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Optional
+from unittest.mock import patch
+
+import click
+
+# Use litellm's bundled model cost map instead of fetching it at import time
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from benchmarks.fakes import (  # noqa: E402
+    GEMINI_URL_PATTERN,
+    FakeLLM,
+    FakeTelegramClient,
+    channel_handle,
+)
+
+# Result keys compared by --compare, and whether higher values are better
+COMPARED = {
+    "startup_import": False,
+    "startup_help": False,
+    "wall_time": False,
+    "channels_per_second": True,
+    "messages_per_second": True,
+    "peak_memory_mb": False,
+    "telegram_requests": False,
+    "llm_calls": False,
+}
+
+
+def bench_startup(repeat: int = 5) -> Dict[str, float]:
+    """Median wall time of importing the CLI and of `tshell --help`."""
+    commands = {
+        "startup_import": "import teleshell.main",
+        "startup_help": (
+            "import sys; from teleshell.main import cli; "
+            "sys.argv = ['tshell', '--help']; cli()"
+        ),
+    }
+    results = {}
+    for name, code in commands.items():
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, check=True
+            )
+            times.append(time.perf_counter() - start)
+        results[name] = round(statistics.median(times), 4)
+    return results
+
+
+def bench_summarize(
+    channels: int,
+    messages: int,
+    page_latency: float,
+    resolve_latency: float,
+    llm_latency: float,
+    llm_rpm: Optional[int],
+    trace_memory: bool,
+) -> Dict[str, Any]:
+    """Run `run_summarize` once over fresh state and measure it."""
+    import litellm
+    import respx
+    from rich.console import Console
+
+    import teleshell.main as main
+    from teleshell.config import ConfigManager
+
+    # respx intercepts httpx; litellm otherwise talks to Gemini over aiohttp
+    litellm.disable_aiohttp_transport = True
+
+    telegram = FakeTelegramClient(
+        channels=channels,
+        messages=messages,
+        page_latency=page_latency,
+        resolve_latency=resolve_latency,
+    )
+    llm = FakeLLM(latency=llm_latency, requests_per_minute=llm_rpm)
+    handles = [f"@{channel_handle(i)}" for i in range(channels)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_manager = ConfigManager(tmp)
+
+        env = {
+            "TELEGRAM_API_ID": "1",
+            "TELEGRAM_API_HASH": "bench",
+            "GEMINI_API_KEY": "bench",
+        }
+        with (
+            patch.dict(os.environ, env),
+            patch("teleshell.telegram_client.TelegramClient", return_value=telegram),
+            # Render panels as usual, but into a buffer instead of the terminal
+            patch.object(main, "console", Console(file=io.StringIO(), width=120)),
+            respx.mock(assert_all_called=False) as router,
+        ):
+            router.post(url__regex=GEMINI_URL_PATTERN).mock(side_effect=llm)
+
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            asyncio.run(main.run_summarize(handles, "24h", False, config_manager))
+            elapsed = time.perf_counter() - start
+            peak_memory = None
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                peak_memory = peak
+
+        checkpoints = config_manager.checkpoint_store.get_all()
+
+    results: Dict[str, Any] = {
+        "channels": channels,
+        "messages_per_channel": messages,
+        "wall_time": round(elapsed, 4),
+        "channels_per_second": round(channels / elapsed, 2),
+        "messages_per_second": round(channels * messages / elapsed, 1),
+        "telegram_requests": telegram.requests,
+        "llm_calls": llm.calls,
+        "llm_rate_limited": llm.rate_limited,
+        "checkpointed_channels": len(checkpoints),
+    }
+    if peak_memory is not None:
+        results["peak_memory_mb"] = round(peak_memory / 1_000_000, 2)
+    return results
+
+
+# Message serializations compared by bench_message_formats; "verbose" is the
+# naive alternative of ISO timestamps and raw sender and reply IDs
+VERBOSE_FORMAT = "[{date}] {sender_id}{reply}: {text}"
+
+
+def bench_message_formats(messages: int = 200) -> Dict[str, float]:
+    """Mean tokens per message line of each message format, by Gemini's tokenizer."""
+    import litellm
+
+    from teleshell.summarizer import MessageFormatter
+    from teleshell.telegram_client import TelegramClientWrapper
+    from teleshell.templates import MESSAGE_FORMATS
+
+    telegram = FakeTelegramClient(channels=1, messages=messages)
+    records = [
+        TelegramClientWrapper._to_record(msg)
+        for msg in telegram.history[channel_handle(0)]
+    ]
+
+    def tokens_per_message(lines: Any) -> float:
+        total = sum(
+            litellm.token_counter(model="gemini/gemini-flash-latest", text=line)
+            for line in lines
+        )
+        return round(total / len(records), 2)
+
+    results = {}
+    for name in MESSAGE_FORMATS:
+        format_message = MessageFormatter({"message_format": name}, records)
+        results[f"tokens_per_message_{name}"] = tokens_per_message(
+            format_message(r) for r in records
+        )
+    results["tokens_per_message_verbose"] = tokens_per_message(
+        VERBOSE_FORMAT.format(
+            date=r.date.isoformat(),
+            sender_id=r.sender_id,
+            reply=f" (reply to {r.reply_to})" if r.reply_to else "",
+            text=r.text,
+        )
+        for r in records
+    )
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, str]:
+    """Relative change of the performance results against a baseline."""
+    changes = {}
+    for key, higher_is_better in COMPARED.items():
+        value, before = results.get(key), baseline.get(key)
+        if value is None or not before:
+            continue
+        change = (value - before) / before * 100
+        better = change > 0 if higher_is_better else change < 0
+        marker = "better" if better else "worse" if change else "same"
+        changes[key] = f"{before} -> {value} ({change:+.1f}%, {marker})"
+    return changes
+
+
+@click.command()
+@click.option("--channels", default=20, help="Number of fake channels.")
+@click.option("--messages", default=200, help="Messages per channel.")
+@click.option("--page-latency", default=0.05, help="Seconds per Telegram page.")
+@click.option("--resolve-latency", default=0.05, help="Seconds per entity lookup.")
+@click.option("--llm-latency", default=0.5, help="Seconds per LLM response.")
+@click.option("--llm-rpm", type=int, help="Fake LLM requests-per-minute limit.")
+@click.option("--memory", is_flag=True, help="Trace peak memory (slower).")
+@click.option("--skip-startup", is_flag=True, help="Skip startup measurements.")
+@click.option("--save", type=click.Path(dir_okay=False), help="Write results here.")
+@click.option(
+    "--compare",
+    "baseline_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Compare against saved results.",
+)
+def cli(
+    channels: int,
+    messages: int,
+    page_latency: float,
+    resolve_latency: float,
+    llm_latency: float,
+    llm_rpm: Optional[int],
+    memory: bool,
+    skip_startup: bool,
+    save: Optional[str],
+    baseline_path: Optional[str],
+) -> None:
+    """Benchmark `tshell summarize` end to end against local fakes."""
+    results: Dict[str, Any] = {}
+    if not skip_startup:
+        results.update(bench_startup())
+    results.update(bench_message_formats(messages))
+    results.update(
+        bench_summarize(
+            channels,
+            messages,
+            page_latency,
+            resolve_latency,
+            llm_latency,
+            llm_rpm,
+            memory,
+        )
+    )
+
+    click.echo(json.dumps(results, indent=2))
+    if save:
+        Path(save).write_text(json.dumps(results, indent=2) + "\n")
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text())
+        for key, change in compare(results, baseline).items():
+            click.echo(f"{key}: {change}")
+
+
+if __name__ == "__main__":
+    cli()
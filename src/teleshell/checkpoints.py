@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from typing import Any, Dict
+from teleshell.sqlite_db import SQLiteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    channel TEXT PRIMARY KEY,
+    last_message_id INTEGER NOT NULL,
+    last_message_date TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+class CheckpointStore(SQLiteDatabase):
+    """
+    Per-channel checkpoints in a dedicated SQLite (WAL) database, so updates
+    are atomic, batched and safe across concurrent tshell processes.
+    """
+
+    FILENAME = "checkpoints.db"
+    SCHEMA = SCHEMA
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        """Return all checkpoints in the config.yaml checkpoint format."""
+        rows = self.conn.execute(
+            "SELECT channel, last_message_id, last_message_date FROM checkpoints"
+        )
+        return {
+            channel: {"last_message_id": msg_id, "last_message_date": msg_date}
+            for channel, msg_id, msg_date in rows
+        }
+
+    def update_many(self, checkpoints: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Commit checkpoints for many channels in a single transaction.
+        A checkpoint never moves backwards, so a slower concurrent run cannot
+        overwrite a newer checkpoint written by another process.
+        """
+        if not checkpoints:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO checkpoints "
+                "(channel, last_message_id, last_message_date, updated_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(channel) DO UPDATE SET "
+                "last_message_id = excluded.last_message_id, "
+                "last_message_date = excluded.last_message_date, "
+                "updated_at = excluded.updated_at "
+                "WHERE excluded.last_message_id >= checkpoints.last_message_id",
+                [
+                    (
+                        channel,
+                        int(cp["last_message_id"]),
+                        str(cp["last_message_date"]),
+                        now,
+                    )
+                    for channel, cp in checkpoints.items()
+                ],
+            )
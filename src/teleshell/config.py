@@ -1,10 +1,26 @@
+import os
+import tempfile
 import yaml
 from typing import Any, Dict, Optional
 from pathlib import Path
+from teleshell.checkpoints import CheckpointStore
+from teleshell.preprocess import DEFAULT_PREPROCESSING
+from teleshell.templates import DEFAULT_MESSAGE_FORMAT, validate_templates
 
 DEFAULT_CONFIG = {
     "default_channels": [],
-    "summary_config": {"length": "medium"},
+    "summary_config": {
+        "length": "medium",
+        "stream": True,
+        "message_format": DEFAULT_MESSAGE_FORMAT,
+        "preprocessing": dict(DEFAULT_PREPROCESSING),
+        "token_budget": {
+            "per_channel": None,
+            "per_run": None,
+            "strategy": "newest",
+            "tokenizer": "estimate",
+        },
+    },
     "prompt_templates": {
         "default_summary": (
             "Summarize the following Telegram messages from the channel '{{channel_name}}' "
@@ -15,6 +31,20 @@ DEFAULT_CONFIG = {
     },
     "checkpoints": {},
     "channel_titles": {},
+    "concurrency": {"telegram_fetches": 4, "llm_calls": 4},
+    "llm_limits": {
+        "requests_per_minute": None,
+        "tokens_per_minute": None,
+        "max_retries": 5,
+    },
+    "message_cache": True,
+    "entity_cache": True,
+    "summary_cache": {"enabled": True, "max_entries": 500, "max_age_days": 7},
+    "digest": {"max_tokens": 8000, "max_channel_tokens": 2000},
+    "ask": {"top_k": 50, "max_tokens": 6000},
+    "watch": {"max_messages": 20, "max_wait": 600},
+    "dialog_index": {"enabled": True, "ttl_hours": 24},
+    "metrics": {"enabled": False, "path": None},
 }
 
 
@@ -29,10 +59,17 @@ class ConfigManager:
 
         self.config_path = self.base_dir / "config.yaml"
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_store = CheckpointStore(self.base_dir)
         self._config: Dict[str, Any] = {}
 
     def load(self) -> Dict[str, Any]:
-        """Load configuration from disk, creating default if missing."""
+        """
+        Load configuration from disk, creating default if missing.
+        Checkpoints are read from the checkpoint store; any legacy checkpoints
+        still present in config.yaml are migrated into it. Prompt templates
+        are validated here, so a misspelled placeholder fails before any
+        Telegram or LLM call is made.
+        """
         if not self.config_path.exists():
             self._config = DEFAULT_CONFIG.copy()
             self.save()
@@ -40,14 +77,32 @@ class ConfigManager:
             with open(self.config_path, "r") as f:
                 user_config = yaml.safe_load(f) or {}
                 self._config = self._merge_configs(DEFAULT_CONFIG, user_config)
+            validate_templates(self._config)
+
+        # Checkpoints written to config.yaml by older versions move to the store
+        legacy = self._config.get("checkpoints")
+        if isinstance(legacy, dict):
+            self.checkpoint_store.update_many(legacy)
+        self._config["checkpoints"] = self.checkpoint_store.get_all()
         return self._config
 
     def save(self, config: Optional[Dict[str, Any]] = None) -> None:
-        """Save configuration to disk."""
+        """
+        Atomically save configuration to disk (write to a temp file, then
+        rename). Checkpoints live in the checkpoint store and are not written.
+        """
         if config is not None:
             self._config = config
-        with open(self.config_path, "w") as f:
-            yaml.dump(self._config, f, default_flow_style=False)
+        data = {k: v for k, v in self._config.items() if k != "checkpoints"}
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".yaml.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                yaml.dump(data, f, default_flow_style=False)
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
 
     def _merge_configs(
         self, defaults: Dict[str, Any], user: Dict[str, Any]
@@ -65,12 +120,17 @@ class ConfigManager:
         self, channel: str, last_message_id: int, last_message_date: str
     ) -> None:
         """Update a checkpoint for a given channel."""
-        self.load()  # Ensure latest state
-        if "checkpoints" not in self._config:
-            self._config["checkpoints"] = {}
+        self.update_checkpoints(
+            {
+                channel: {
+                    "last_message_id": last_message_id,
+                    "last_message_date": last_message_date,
+                }
+            }
+        )
 
-        self._config["checkpoints"][channel] = {
-            "last_message_id": last_message_id,
-            "last_message_date": last_message_date,
-        }
-        self.save()
+    def update_checkpoints(self, checkpoints: Dict[str, Dict[str, Any]]) -> None:
+        """Commit checkpoints for many channels in one atomic transaction."""
+        self.checkpoint_store.update_many(checkpoints)
+        if self._config:
+            self._config.setdefault("checkpoints", {}).update(checkpoints)
@@ -0,0 +1,128 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from teleshell.message_store import to_timestamp
+from teleshell.sqlite_db import SQLiteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dialogs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    handle TEXT,
+    folder_id INTEGER,
+    is_channel INTEGER NOT NULL,
+    is_group INTEGER NOT NULL,
+    top_date INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL
+);
+
+-- Single row: when the dialog list was last fetched in full
+CREATE TABLE IF NOT EXISTS index_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    full_refresh_at REAL NOT NULL
+);
+"""
+
+
+class DialogIndex(SQLiteDatabase):
+    """
+    Local SQLite index of the user's channels, groups and folders, so
+    `channels manage` can open without pulling the whole dialog list.
+    """
+
+    FILENAME = "dialogs.db"
+    SCHEMA = SCHEMA
+
+    def load(self) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+        """Return the indexed dialogs and folders in the fetch_* formats."""
+        dialogs = [
+            {
+                "id": d_id,
+                "title": title,
+                "handle": handle,
+                "folder_id": folder_id,
+                "is_channel": bool(is_channel),
+                "is_group": bool(is_group),
+                "date": (
+                    datetime.fromtimestamp(top_date, tz=timezone.utc)
+                    if top_date is not None
+                    else None
+                ),
+            }
+            for d_id, title, handle, folder_id, is_channel, is_group, top_date in (
+                self.conn.execute(
+                    "SELECT id, title, handle, folder_id, is_channel, is_group, "
+                    "top_date FROM dialogs"
+                )
+            )
+        ]
+        folders = dict(self.conn.execute("SELECT id, title FROM folders"))
+        return dialogs, folders
+
+    def last_full_refresh(self) -> Optional[float]:
+        """Epoch seconds of the last full refresh, or None if never indexed."""
+        row = self.conn.execute(
+            "SELECT full_refresh_at FROM index_state WHERE id = 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def latest_date(self) -> Optional[datetime]:
+        """Top-message date of the most recently active indexed dialog."""
+        row = self.conn.execute("SELECT MAX(top_date) FROM dialogs").fetchone()
+        if row is None or row[0] is None:
+            return None
+        return datetime.fromtimestamp(row[0], tz=timezone.utc)
+
+    def is_stale(self, ttl_hours: float) -> bool:
+        """True if the index needs a full refresh rather than an incremental one."""
+        refreshed_at = self.last_full_refresh()
+        return refreshed_at is None or time.time() - refreshed_at > ttl_hours * 3600
+
+    def update(
+        self,
+        dialogs: List[Dict[str, Any]],
+        folders: Dict[int, str],
+        full: bool = False,
+    ) -> None:
+        """
+        Upsert fetched dialogs and replace the folders in one transaction.
+        A full refresh also drops dialogs the user has left.
+        """
+        rows = [
+            (
+                d["id"],
+                d["title"],
+                d["handle"],
+                d["folder_id"],
+                int(bool(d["is_channel"])),
+                int(bool(d["is_group"])),
+                (
+                    to_timestamp(d["date"])
+                    if isinstance(d.get("date"), datetime)
+                    else None
+                ),
+            )
+            for d in dialogs
+        ]
+        with self.conn:
+            if full:
+                self.conn.execute("DELETE FROM dialogs")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO index_state (id, full_refresh_at) "
+                    "VALUES (1, ?)",
+                    (time.time(),),
+                )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dialogs "
+                "(id, title, handle, folder_id, is_channel, is_group, top_date) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.execute("DELETE FROM folders")
+            self.conn.executemany(
+                "INSERT INTO folders (id, title) VALUES (?, ?)", list(folders.items())
+            )
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+from teleshell.utils import normalize_channel
+
+InputPeer = Union[InputPeerChannel, InputPeerChat, InputPeerUser]
+
+
+class EntityCache:
+    """
+    Persistent map of channel handles to resolved input peers
+    (peer type, id and access_hash), kept next to the Telegram session so
+    handles are not re-resolved over the network on every run.
+    """
+
+    def __init__(
+        self, base_dir: Optional[Path] = None, filename: str = "entities.json"
+    ) -> None:
+        if not base_dir:
+            base_dir = Path.home() / ".teleshell"
+        self.path = base_dir / filename
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Read the cache file lazily on first use."""
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, channel: Union[str, int]) -> Optional[InputPeer]:
+        """Return the cached input peer for a channel, or None."""
+        entry = self.entries.get(normalize_channel(channel))
+        if entry is None:
+            return None
+        if entry["type"] == "channel":
+            return InputPeerChannel(entry["id"], entry["access_hash"])
+        if entry["type"] == "chat":
+            return InputPeerChat(entry["id"])
+        if entry["type"] == "user":
+            return InputPeerUser(entry["id"], entry["access_hash"])
+        return None
+
+    def put(self, channel: Union[str, int], peer: Any) -> None:
+        """Remember a resolved input peer; other peer kinds are ignored."""
+        if isinstance(peer, InputPeerChannel):
+            entry = {
+                "type": "channel",
+                "id": peer.channel_id,
+                "access_hash": peer.access_hash,
+            }
+        elif isinstance(peer, InputPeerChat):
+            entry = {"type": "chat", "id": peer.chat_id, "access_hash": None}
+        elif isinstance(peer, InputPeerUser):
+            entry = {
+                "type": "user",
+                "id": peer.user_id,
+                "access_hash": peer.access_hash,
+            }
+        else:
+            return
+        key = normalize_channel(channel)
+        if self.entries.get(key) != entry:
+            self.entries[key] = entry
+            self._save()
+
+    def invalidate(self, channel: Union[str, int]) -> None:
+        """Forget a channel whose cached peer is no longer usable."""
+        if self.entries.pop(normalize_channel(channel), None) is not None:
+            self._save()
+
+    def _save(self) -> None:
+        """Atomically write the cache (temp file + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
@@ -1,23 +1,26 @@
 import click
 import asyncio
 import os
+import sys
 from datetime import datetime, timedelta
-from typing import Optional, List, Any, Dict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, List, Any, Dict, Set, TextIO, Tuple
 from dotenv import load_dotenv
 
 # Rich UI
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-
-# Interactive TUI
-from InquirerPy import inquirer
-from InquirerPy.base.control import Choice
-from InquirerPy.separator import Separator
 
 from teleshell.config import ConfigManager
-from teleshell.telegram_client import TelegramClientWrapper
-from teleshell.summarizer import Summarizer, SummarizationError
+from teleshell.models import MessageRecord
+from teleshell.output import OUTPUT_FORMATS, RecordWriter, outcome_record
+from teleshell.templates import TemplateError
+from teleshell.utils import normalize_channel, unique_channels
+
+if TYPE_CHECKING:
+    from teleshell.metrics import RunMetrics
+
+# Heavy dependencies (Telethon, LiteLLM, InquirerPy, Rich Markdown) are
+# imported inside the commands that need them to keep CLI startup fast.
 
 console = Console()
 
@@ -46,137 +49,886 @@ def parse_time_window(window: str) -> Optional[datetime]:
 
 
 async def run_summarize(
-    channels: List[str], time_window: str, verbose: bool, config_manager: ConfigManager
+    channels: List[str],
+    time_window: str,
+    verbose: bool,
+    config_manager: ConfigManager,
+    digest: bool = False,
+    metrics_out: Optional[str] = None,
+    output_format: str = "rich",
+    output_path: Optional[str] = None,
 ) -> None:
-    """Async core of the summarize command with optimized color scheme for readability."""
+    """
+    Async core of the summarize command with optimized color scheme for readability.
+    With a structured output_format, one record per channel is written to
+    output_path (or stdout) as soon as it completes, and progress messages
+    go to stderr instead of Rich panels.
+    """
     load_dotenv()
 
+    structured = output_format != "rich"
+    # Keep stdout clean for structured output
+    log = Console(stderr=True) if structured else console
+
     api_id = int(os.getenv("TELEGRAM_API_ID", 0))
     api_hash = os.getenv("TELEGRAM_API_HASH", "")
     gemini_key = os.getenv("GEMINI_API_KEY", "")
 
     if not api_id or not api_hash or not gemini_key:
-        console.print(
-            "[bold red]Error:[/bold red] Missing API credentials in .env file."
-        )
+        log.print("[bold red]Error:[/bold red] Missing API credentials in .env file.")
         return
 
+    from teleshell.entity_cache import EntityCache
+    from teleshell.message_store import MessageStore
+    from teleshell.metrics import RunMetrics, metrics_path
+    from teleshell.summary_cache import SummaryCache
+    from teleshell.summarizer import (
+        LLMScheduler,
+        Summarizer,
+        SummarizationError,
+        TokenBudget,
+        digest_groups,
+        estimate_tokens,
+    )
+    from teleshell.telegram_client import TelegramClientWrapper
+
     config = config_manager.load()
-    limit = 1000
+    # Optional safety cap on messages per channel; None streams the whole window
+    limit: Optional[int] = config.get("fetch_limit")
     titles = config.get("channel_titles", {})
+    templates = config.get("prompt_templates", {})
+    digest_config = config.get("digest", {})
+    metrics = RunMetrics("summarize")
+    metrics_file = (
+        Path(metrics_out)
+        if metrics_out
+        else metrics_path(config.get("metrics", {}), config_manager.base_dir)
+    )
+
+    offset_date = None
+    if time_window != "since_last_run":
+        offset_date = parse_time_window(time_window)
+        if not offset_date:
+            log.print(
+                f"[bold red]❌ Invalid time window format:[/bold red] {time_window}"
+            )
+            return
 
-    console.print("[bold cyan]📡 Connecting to Telegram...[/bold cyan]")
-    tg_client = TelegramClientWrapper(api_id, api_hash)
-    summarizer = Summarizer(api_key=gemini_key)
+    concurrency = config.get("concurrency", {})
+    fetch_slots = asyncio.Semaphore(max(1, int(concurrency.get("telegram_fetches", 4))))
+    llm_slots = asyncio.Semaphore(max(1, int(concurrency.get("llm_calls", 4))))
+
+    log.print("[bold cyan]📡 Connecting to Telegram...[/bold cyan]")
+    message_store = (
+        MessageStore(config_manager.base_dir) if config.get("message_cache") else None
+    )
+    entity_cache = (
+        EntityCache(config_manager.base_dir) if config.get("entity_cache") else None
+    )
+    tg_client = TelegramClientWrapper(
+        api_id, api_hash, message_store=message_store, entity_cache=entity_cache
+    )
+    cache_config = config.get("summary_cache", {})
+    summary_cache = (
+        SummaryCache(
+            config_manager.base_dir,
+            max_entries=cache_config.get("max_entries", 500),
+            max_age_days=cache_config.get("max_age_days", 7),
+        )
+        if cache_config.get("enabled")
+        else None
+    )
+    token_config = config.get("summary_config", {}).get("token_budget") or {}
+    summarizer = Summarizer(
+        api_key=gemini_key,
+        cache=summary_cache,
+        scheduler=LLMScheduler.from_config(config.get("llm_limits", {})),
+        tokenizer=token_config.get("tokenizer", "estimate"),
+    )
+    # Input tokens allowed across all channels of this run
+    run_budget = (
+        TokenBudget(int(token_config["per_run"]))
+        if token_config.get("per_run")
+        else None
+    )
 
     await tg_client.start()
 
-    for channel in channels:
+    async def fetch_channel(channel: str) -> Dict[str, Any]:
+        """
+        Fetch the messages of a single channel into an outcome. The outcome
+        gets a status only if there is nothing to summarize.
+        """
         title = titles.get(channel, channel)
-        offset_date = None
+        outcome: Dict[str, Any] = {"channel": channel, "title": title}
         offset_id = 0
-        since_label = ""
 
-        if time_window == "since_last_run":
+        if offset_date is None:
             checkpoint = config.get("checkpoints", {}).get(channel)
-            if checkpoint:
-                offset_id = checkpoint.get("last_message_id", 0)
-                since_label = f"last run (ID: {offset_id})"
-            else:
-                console.print(
-                    f"[bold yellow]⚠️ No checkpoint for {title}.[/bold yellow] Please specify a time window (e.g., -t 24h)."
-                )
-                continue
+            if not checkpoint:
+                outcome["status"] = "no_checkpoint"
+                return outcome
+            offset_id = checkpoint.get("last_message_id", 0)
+            outcome["since_label"] = f"last run (ID: {offset_id})"
         else:
-            offset_date = parse_time_window(time_window)
-            if not offset_date:
-                console.print(
-                    f"[bold red]❌ Invalid time window format:[/bold red] {time_window}"
+            outcome["since_label"] = offset_date.strftime("%Y-%m-%d %H:%M")
+
+        # Messages stream in oldest first; fetch limit + 1 to detect truncation
+        messages: List[MessageRecord] = []
+        async with fetch_slots:
+            try:
+                with metrics.timed(channel, "fetch_time"):
+                    async for message in tg_client.iter_messages(
+                        channel,
+                        limit=limit + 1 if limit else None,
+                        offset_id=offset_id,
+                        offset_date=offset_date,
+                    ):
+                        messages.append(message)
+            except Exception as e:
+                outcome["status"] = "fetch_failed"
+                outcome["error"] = str(e)
+                return outcome
+            finally:
+                metrics.record(
+                    channel,
+                    messages=len(messages),
+                    resolve_time=round(tg_client.resolve_time(channel), 4),
                 )
+
+        if not messages:
+            outcome["status"] = "empty"
+            return outcome
+
+        outcome["is_limited"] = limit is not None and 0 < limit < len(messages)
+        if outcome["is_limited"]:
+            del messages[limit:]
+        outcome["messages"] = messages
+
+        oldest_date = messages[0].date.strftime("%Y-%m-%d %H:%M")
+        newest_date = messages[-1].date.strftime("%Y-%m-%d %H:%M")
+        outcome["range"] = (oldest_date, newest_date)
+        return outcome
+
+    # Streamed summary text per channel, shown live while it is generated
+    partials: Dict[str, str] = {}
+    stream = (
+        bool(config.get("summary_config", {}).get("stream", True))
+        and console.is_terminal
+        and not structured
+    )
+
+    async def summarize_channel(outcome: Dict[str, Any]) -> None:
+        """Summarize a fetched channel on its own."""
+        oldest_date, newest_date = outcome["range"]
+        channel = outcome["channel"]
+
+        def on_text(text: str) -> None:
+            partials[channel] = text
+
+        # The summarizer takes a run slot per LLM call, chunk calls included
+        try:
+            outcome["result"] = await summarizer.summarize(
+                messages=outcome["messages"],
+                channel_name=outcome["title"],
+                time_period=f"{oldest_date} to {newest_date}",
+                config=config.get("summary_config", {}),
+                template=templates.get("default_summary"),
+                chunk_template=templates.get("chunk_summary"),
+                combine_template=templates.get("combine_summaries"),
+                budget=run_budget,
+                on_text=on_text if stream else None,
+                limit=llm_slots,
+            )
+        except SummarizationError as e:
+            outcome["status"] = "summary_failed"
+            outcome["error"] = str(e)
+            return
+        finally:
+            partials.pop(channel, None)
+
+        outcome["status"] = "ok"
+
+    async def process_channel(channel: str) -> Dict[str, Any]:
+        """Fetch and summarize a single channel, returning an outcome to render."""
+        outcome = await fetch_channel(channel)
+        if "status" not in outcome:
+            await summarize_channel(outcome)
+        return outcome
+
+    async def summarize_digest(group: List[Dict[str, Any]]) -> None:
+        """Summarize several fetched channels in one LLM call."""
+        entries = [
+            (o["title"], f"{o['range'][0]} to {o['range'][1]}", o["messages"])
+            for o in group
+        ]
+        async with llm_slots:
+            try:
+                results = await summarizer.summarize_digest(
+                    entries,
+                    config=config.get("summary_config", {}),
+                    template=templates.get("digest_summary"),
+                    budget=run_budget,
+                )
+            except SummarizationError as e:
+                for outcome in group:
+                    outcome["status"] = "summary_failed"
+                    outcome["error"] = str(e)
                 return
-            since_label = offset_date.strftime("%Y-%m-%d %H:%M")
 
-        console.print(
-            f"[bold white]🔍 Channel {title}:[/bold white] Fetching messages since [cyan]{since_label}[/cyan] (Limit: {limit})..."
+        for outcome, result in zip(group, results):
+            if result is None:
+                outcome["status"] = "summary_failed"
+                outcome["error"] = "The digest answer had no section for this channel."
+            else:
+                outcome["status"] = "ok"
+                outcome["result"] = result
+
+    async def process_digest() -> List[Dict[str, Any]]:
+        """
+        Fetch all channels, then pack low-volume ones into shared digest
+        calls. Channels that do not fit a digest are summarized on their own.
+        """
+        outcomes = list(await asyncio.gather(*(fetch_channel(c) for c in channels)))
+        fetched = [o for o in outcomes if "status" not in o]
+        groups = digest_groups(
+            [
+                sum(estimate_tokens(m.text) for m in o["messages"] if m.text)
+                for o in fetched
+            ],
+            max_tokens=int(digest_config.get("max_tokens", 8000)),
+            max_channel_tokens=int(digest_config.get("max_channel_tokens", 2000)),
+        )
+        grouped = {i for group in groups for i in group}
+        await asyncio.gather(
+            *(summarize_digest([fetched[i] for i in group]) for group in groups),
+            *(summarize_channel(o) for i, o in enumerate(fetched) if i not in grouped),
         )
+        return outcomes
+
+    async def write_records(output: TextIO) -> None:
+        """Write each channel's record as soon as the channel is done."""
+        writer = RecordWriter(output, output_format)
+
+        def emit(outcome: Dict[str, Any]) -> None:
+            record_outcome_metrics(outcome, metrics)
+            checkpoint = None
+            if outcome["status"] == "ok":
+                checkpoint = checkpoint_outcome(outcome, config_manager, metrics)
+            writer.write(outcome_record(outcome, checkpoint))
+
+        if digest:
+            for outcome in await process_digest():
+                emit(outcome)
+        else:
+            tasks = [asyncio.create_task(process_channel(c)) for c in channels]
+            for next_done in asyncio.as_completed(tasks):
+                emit(await next_done)
+        writer.close()
+
+    # One Telegram connection is shared by every fetch of this run
+    async with tg_client:
+        if structured:
+            if output_path:
+                with open(output_path, "w", encoding="utf-8") as output:
+                    await write_records(output)
+            else:
+                await write_records(sys.stdout)
+        elif digest:
+            # Digests need every channel fetched before they can be packed
+            with console.status(
+                f"[bold yellow]🤖 Fetching and summarizing digest using {summarizer.model}...[/bold yellow]"
+            ):
+                outcomes = await process_digest()
+            for outcome in outcomes:
+                render_channel_outcome(outcome, limit, config_manager, metrics)
+        else:
+            # All channels run concurrently (bounded by the semaphores above),
+            # but are rendered strictly in the requested order.
+            tasks = [asyncio.create_task(process_channel(c)) for c in channels]
+
+            for channel, task in zip(channels, tasks):
+                if task.done():
+                    outcome = task.result()
+                elif stream:
+                    from rich.live import Live
+
+                    # Replaced by the final panel once the summary is complete
+                    with Live(
+                        get_renderable=lambda: render_live_summary(
+                            titles.get(channel, channel),
+                            partials.get(channel),
+                            summarizer.model,
+                        ),
+                        console=console,
+                        refresh_per_second=8,
+                        transient=True,
+                    ):
+                        outcome = await task
+                else:
+                    with console.status(
+                        f"[bold yellow]🤖 Fetching and summarizing using {summarizer.model}...[/bold yellow]"
+                    ):
+                        outcome = await task
+                render_channel_outcome(outcome, limit, config_manager, metrics)
+
+    if message_store is not None:
+        message_store.close()
+
+    if metrics_file is not None:
+        metrics.write(metrics_file)
+        if not structured:
+            render_metrics_summary(metrics)
+        log.print(f"[dim]📈 Metrics written to {metrics_file}[/dim]")
+
+
+async def run_watch(channels: List[str], config_manager: ConfigManager) -> None:
+    """Async core of the watch command: summarize channels as new messages arrive."""
+    load_dotenv()
+
+    api_id = int(os.getenv("TELEGRAM_API_ID", 0))
+    api_hash = os.getenv("TELEGRAM_API_HASH", "")
+    gemini_key = os.getenv("GEMINI_API_KEY", "")
 
-        # Fetch limit + 1
-        messages = await tg_client.fetch_messages(
-            channel, limit=limit + 1, offset_id=offset_id, offset_date=offset_date
+    if not api_id or not api_hash or not gemini_key:
+        console.print(
+            "[bold red]Error:[/bold red] Missing API credentials in .env file."
         )
+        return
 
-        if not messages:
-            console.print(f"[dim]ℹ️ No new messages found for {title}.[/dim]")
-            continue
+    from teleshell.entity_cache import EntityCache
+    from teleshell.summarizer import LLMScheduler, Summarizer, SummarizationError
+    from teleshell.telegram_client import TelegramClientWrapper
+    from teleshell.watch import WatchBuffer
+
+    config = config_manager.load()
+    titles = config.get("channel_titles", {})
+    templates = config.get("prompt_templates", {})
+    watch_config = config.get("watch", {})
+
+    buffer = WatchBuffer(
+        max_messages=int(watch_config.get("max_messages", 20)),
+        max_wait=float(watch_config.get("max_wait", 600)),
+    )
+    llm_slots = asyncio.Semaphore(
+        max(1, int(config.get("concurrency", {}).get("llm_calls", 4)))
+    )
+    # Push updates need the connection to stay up, so never drop it when idle
+    entity_cache = (
+        EntityCache(config_manager.base_dir) if config.get("entity_cache") else None
+    )
+    tg_client = TelegramClientWrapper(
+        api_id, api_hash, idle_timeout=None, entity_cache=entity_cache
+    )
+    token_config = config.get("summary_config", {}).get("token_budget") or {}
+    summarizer = Summarizer(
+        api_key=gemini_key,
+        scheduler=LLMScheduler.from_config(config.get("llm_limits", {})),
+        tokenizer=token_config.get("tokenizer", "estimate"),
+    )
+    flushes: Set[asyncio.Task] = set()
+    # Flushes of a channel run one at a time, so a failed batch can be
+    # retried with the next one before its checkpoint moves past it
+    channel_locks: Dict[str, asyncio.Lock] = {}
+    failed: Dict[str, List[MessageRecord]] = {}
+
+    async def flush(channel: str, batch: List[MessageRecord]) -> None:
+        """Summarize a batch of buffered messages, with any failed before it."""
+        async with channel_locks.setdefault(channel, asyncio.Lock()):
+            messages = failed.pop(channel, []) + batch
+            await summarize_batch(channel, messages)
+
+    async def summarize_batch(channel: str, messages: List[MessageRecord]) -> None:
+        """Summarize messages and checkpoint them, or keep them for a retry."""
+        title = titles.get(channel, channel)
+        oldest_date = messages[0].date.strftime("%Y-%m-%d %H:%M")
+        newest_date = messages[-1].date.strftime("%Y-%m-%d %H:%M")
+        outcome: Dict[str, Any] = {
+            "channel": channel,
+            "title": title,
+            "messages": messages,
+            "is_limited": False,
+            "range": (oldest_date, newest_date),
+        }
 
-        actual_count = len(messages)
-        is_limited = actual_count > limit
+        try:
+            outcome["result"] = await summarizer.summarize(
+                messages=messages,
+                channel_name=title,
+                time_period=f"{oldest_date} to {newest_date}",
+                config=config.get("summary_config", {}),
+                template=templates.get("default_summary"),
+                chunk_template=templates.get("chunk_summary"),
+                combine_template=templates.get("combine_summaries"),
+                limit=llm_slots,
+            )
+            outcome["status"] = "ok"
+        except SummarizationError as e:
+            outcome["status"] = "summary_failed"
+            outcome["error"] = str(e)
+            failed[channel] = messages
 
-        if is_limited:
-            messages = messages[:limit]
-            actual_count = limit
+        render_channel_outcome(outcome, None, config_manager)
 
-        newest_date = messages[0]["date"].strftime("%Y-%m-%d %H:%M")
-        oldest_date = messages[-1]["date"].strftime("%Y-%m-%d %H:%M")
+    def schedule_flush(channel: str) -> None:
+        # Take the batch now so messages arriving meanwhile start a new one
+        messages = buffer.pop(channel)
+        if not messages:
+            return
+        task = asyncio.create_task(flush(channel, messages))
+        flushes.add(task)
+        task.add_done_callback(flushes.discard)
+
+    # Newest message ID buffered per channel, starting from its checkpoint, so
+    # messages missed before startup or during a reconnect are fetched first
+    checkpoints = config.get("checkpoints", {})
+    last_ids: Dict[str, int] = {
+        channel: checkpoints[channel]["last_message_id"]
+        for channel in channels
+        if checkpoints.get(channel, {}).get("last_message_id")
+    }
+    # Live messages of channels being backfilled, buffered once it completes
+    held: Dict[str, List[MessageRecord]] = {}
+    backfills: Dict[str, asyncio.Task] = {}
+
+    def add(channel: str, message: MessageRecord) -> None:
+        if message.id <= last_ids.get(channel, 0):
+            return
+        last_ids[channel] = message.id
+        if buffer.add(channel, message):
+            schedule_flush(channel)
 
-        if is_limited:
+    async def on_message(channel: str, message: MessageRecord) -> None:
+        if channel in held:
+            held[channel].append(message)
+        else:
+            add(channel, message)
+
+    async def backfill(channel: str) -> None:
+        """Buffer the messages posted since the channel's newest known ID."""
+        try:
+            async for message in tg_client.iter_messages(
+                channel, offset_id=last_ids[channel]
+            ):
+                add(channel, message)
+        except Exception as e:
+            # Live messages stay held, so nothing is checkpointed past the
+            # gap; the backfill is retried on the next tick
             console.print(
-                f"[bold yellow]⚠️ Warning:[/bold yellow] Limit reached! Only {limit} messages fetched."
+                f"[bold yellow]⚠️ Could not fetch missed messages of "
+                f"{titles.get(channel, channel)}:[/bold yellow] {e}"
             )
-            console.print(f"[yellow]Range: {oldest_date} to {newest_date}[/yellow]")
-        else:
+            return
+        for message in held.pop(channel):
+            add(channel, message)
+
+    def schedule_backfill(channel: str) -> None:
+        if channel in backfills or channel not in last_ids:
+            return
+        held.setdefault(channel, [])
+        task = asyncio.create_task(backfill(channel))
+        backfills[channel] = task
+        task.add_done_callback(lambda _: backfills.pop(channel, None))
+
+    async def flush_due() -> None:
+        """Periodically flush channels that reached the time threshold."""
+        interval = min(max(buffer.max_wait / 4, 0.5), 30)
+        while True:
+            await asyncio.sleep(interval)
+            for channel in list(held):
+                schedule_backfill(channel)
+            for channel in buffer.due():
+                schedule_flush(channel)
+
+    console.print("[bold cyan]📡 Connecting to Telegram...[/bold cyan]")
+    await tg_client.start()
+
+    async with tg_client:
+        skipped = await tg_client.subscribe_new_messages(channels, on_message)
+        for channel, error in skipped.items():
             console.print(
-                f"[bold bright_blue]📥 Found {actual_count} messages[/bold bright_blue] (Range: {oldest_date} to {newest_date})."
+                f"[bold yellow]⚠️ Skipping {titles.get(channel, channel)}:"
+                f"[/bold yellow] {error}"
             )
+        watched = [c for c in channels if c not in skipped]
+        if not watched:
+            console.print("[bold red]Error:[/bold red] No channels could be watched.")
+            return
+
+        def catch_up() -> None:
+            for channel in watched:
+                schedule_backfill(channel)
 
+        catch_up()
         console.print(
-            f"[bold yellow]🤖 Generating AI summary using {summarizer.model}...[/bold yellow]"
+            f"[bold cyan]👀 Watching {len(watched)} channels[/bold cyan] "
+            f"(summary every {buffer.max_messages} messages or "
+            f"{int(buffer.max_wait)}s). Press Ctrl+C to stop."
         )
-
+        ticker = asyncio.create_task(flush_due())
         try:
-            result = await summarizer.summarize(
-                messages=messages,
-                channel_name=title,
-                time_period=f"{oldest_date} to {newest_date}",
+            await tg_client.run_until_disconnected(on_reconnect=catch_up)
+        finally:
+            ticker.cancel()
+            for task in list(backfills.values()):
+                task.cancel()
+            # Let summaries that are already running finish; anything still
+            # buffered, held or failed is never checkpointed, so the next
+            # `summarize` picks it up
+            await asyncio.gather(*flushes, return_exceptions=True)
+
+
+async def run_ask(
+    question: str,
+    channels: List[str],
+    time_window: str,
+    top_k: Optional[int],
+    offline: bool,
+    config_manager: ConfigManager,
+) -> None:
+    """
+    Async core of the ask command: sync the window into the local message
+    store, rank stored messages by relevance to the question and answer it
+    from the top matches only.
+    """
+    load_dotenv()
+
+    api_id = int(os.getenv("TELEGRAM_API_ID", 0))
+    api_hash = os.getenv("TELEGRAM_API_HASH", "")
+    gemini_key = os.getenv("GEMINI_API_KEY", "")
+
+    if not gemini_key or (not offline and (not api_id or not api_hash)):
+        console.print(
+            "[bold red]Error:[/bold red] Missing API credentials in .env file."
+        )
+        return
+
+    since = parse_time_window(time_window)
+    if not since:
+        console.print(
+            f"[bold red]❌ Invalid time window format:[/bold red] {time_window}"
+        )
+        return
+
+    config = config_manager.load()
+    if not offline and not config.get("message_cache"):
+        console.print(
+            "[bold red]Error:[/bold red] `ask` ranks locally stored messages; "
+            "enable `message_cache` or use --offline."
+        )
+        return
+
+    from teleshell.entity_cache import EntityCache
+    from teleshell.message_store import MessageStore
+    from teleshell.summarizer import LLMScheduler, Summarizer, SummarizationError
+    from teleshell.telegram_client import TelegramClientWrapper
+
+    titles = config.get("channel_titles", {})
+    ask_config = config.get("ask", {})
+    message_store = MessageStore(config_manager.base_dir)
+
+    if not offline:
+        console.print("[bold cyan]📡 Syncing messages from Telegram...[/bold cyan]")
+        entity_cache = (
+            EntityCache(config_manager.base_dir) if config.get("entity_cache") else None
+        )
+        tg_client = TelegramClientWrapper(
+            api_id, api_hash, message_store=message_store, entity_cache=entity_cache
+        )
+        await tg_client.start()
+        async with tg_client:
+            for channel in channels:
+                # Only messages above the stored high-water mark are fetched
+                try:
+                    async for _ in tg_client.iter_messages(channel, offset_date=since):
+                        pass
+                except Exception as e:
+                    console.print(
+                        f"[bold yellow]⚠️ Syncing {titles.get(channel, channel)} failed:[/bold yellow] {e}"
+                    )
+
+    hits = message_store.search(
+        question,
+        channels,
+        since=since,
+        limit=int(top_k or ask_config.get("top_k", 50)),
+        any_word=True,
+    )
+    message_store.close()
+
+    names = ", ".join(titles.get(c, c) for c in channels)
+    if not hits:
+        console.print(
+            f"[yellow]No stored messages in {names} match the question.[/yellow]"
+        )
+        return
+
+    token_config = config.get("summary_config", {}).get("token_budget") or {}
+    summarizer = Summarizer(
+        api_key=gemini_key,
+        scheduler=LLMScheduler.from_config(config.get("llm_limits", {})),
+        tokenizer=token_config.get("tokenizer", "estimate"),
+    )
+    try:
+        with console.status(
+            f"[bold yellow]🤖 Answering from {len(hits)} relevant messages using {summarizer.model}...[/bold yellow]"
+        ):
+            result = await summarizer.ask(
+                question,
+                [hit.message for hit in hits],
+                channel_name=names,
+                time_period=f"last {time_window}",
                 config=config.get("summary_config", {}),
-                template=config.get("prompt_templates", {}).get("default_summary"),
+                template=config.get("prompt_templates", {}).get("ask"),
+                max_tokens=ask_config.get("max_tokens"),
             )
-        except SummarizationError as e:
-            console.print(f"[bold red]❌ Summarization failed for {title}:[/bold red] {str(e)}")
-            continue
+    except SummarizationError as e:
+        console.print(f"[bold red]❌ Answering failed:[/bold red] {e}")
+        return
+
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    meta = result["metadata"]
+    retrieval = meta["retrieval"]
+    subtitle = (
+        f"[dim]Relevant: {retrieval['selected']}/{retrieval['candidates']} msgs | "
+        f"Model: {meta.get('model', 'N/A')} | "
+        f"Tokens: {meta.get('input_tokens', 0)}in/{meta.get('output_tokens', 0)}out | "
+        f"Time: {meta.get('latency', 0)}s[/dim]"
+    )
+    if meta.get("retries"):
+        subtitle += f"[dim] | Retries: {meta['retries']}[/dim]"
+    console.print(
+        Panel(
+            Markdown(result["content"]),
+            title=f"[bold green]📡 TeleShell Answer: {question}[/bold green]",
+            subtitle=subtitle,
+            border_style="green",
+            padding=(1, 2),
+        )
+    )
 
-        summary_text = result["content"]
-        meta = result["metadata"]
 
-        # Rich Markdown Rendering
-        md = Markdown(summary_text)
-        console.print("\n")
+def render_live_summary(title: str, text: Optional[str], model: str) -> Any:
+    """Renderable for a summary that is still being generated."""
+    if not text:
+        from rich.spinner import Spinner
 
-        subtitle = (
-            f"[dim]Analyzed: {actual_count} msgs | "
-            f"Model: {meta.get('model', 'N/A')} | "
-            f"Tokens: {meta.get('input_tokens', 0)}in/{meta.get('output_tokens', 0)}out | "
-            f"Time: {meta.get('latency', 0)}s[/dim]"
+        return Spinner(
+            "dots",
+            text=f"[bold yellow]🤖 Fetching and summarizing using {model}...[/bold yellow]",
         )
 
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    return Panel(
+        Markdown(text),
+        title=f"[bold yellow]📡 TeleShell Summary: {title}[/bold yellow]",
+        subtitle="[dim]Generating...[/dim]",
+        border_style="yellow",
+        padding=(1, 2),
+    )
+
+
+def render_channel_outcome(
+    outcome: Dict[str, Any],
+    limit: Optional[int],
+    config_manager: ConfigManager,
+    metrics: Optional["RunMetrics"] = None,
+) -> None:
+    """Print the result of a processed channel and checkpoint it on success."""
+    channel = outcome["channel"]
+    title = outcome["title"]
+    status = outcome["status"]
+
+    record_outcome_metrics(outcome, metrics)
+
+    if status == "no_checkpoint":
         console.print(
-            Panel(
-                md,
-                title=f"[bold green]📡 TeleShell Summary: {title}[/bold green]",
-                subtitle=subtitle,
-                border_style="green",
-                padding=(1, 2),
+            f"[bold yellow]⚠️ No checkpoint for {title}.[/bold yellow] Please specify a time window (e.g., -t 24h)."
+        )
+        return
+
+    if "since_label" in outcome:
+        limit_label = f" (Limit: {limit})" if limit else ""
+        console.print(
+            f"[bold white]🔍 Channel {title}:[/bold white] Fetching messages since [cyan]{outcome['since_label']}[/cyan]{limit_label}..."
+        )
+    else:
+        console.print(f"[bold white]🔔 Channel {title}:[/bold white] New messages")
+
+    if status == "fetch_failed":
+        console.print(
+            f"[bold red]❌ Fetching messages failed for {title}:[/bold red] {outcome['error']}"
+        )
+        return
+
+    if status == "empty":
+        console.print(f"[dim]ℹ️ No new messages found for {title}.[/dim]")
+        return
+
+    messages = outcome["messages"]
+    actual_count = len(messages)
+    oldest_date, newest_date = outcome["range"]
+
+    if outcome["is_limited"]:
+        console.print(
+            f"[bold yellow]⚠️ Warning:[/bold yellow] Limit reached! Only the oldest {limit} messages were fetched."
+        )
+        console.print(f"[yellow]Range: {oldest_date} to {newest_date}[/yellow]")
+    else:
+        console.print(
+            f"[bold bright_blue]📥 Found {actual_count} messages[/bold bright_blue] (Range: {oldest_date} to {newest_date})."
+        )
+
+    if status == "summary_failed":
+        console.print(
+            f"[bold red]❌ Summarization failed for {title}:[/bold red] {outcome['error']}"
+        )
+        return
+
+    result = outcome["result"]
+    summary_text = result["content"]
+    meta = result["metadata"]
+
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    # Rich Markdown Rendering
+    md = Markdown(summary_text)
+    console.print("\n")
+
+    subtitle = (
+        f"[dim]Analyzed: {actual_count} msgs | "
+        f"Model: {meta.get('model', 'N/A')} | "
+        f"Tokens: {meta.get('input_tokens', 0)}in/{meta.get('output_tokens', 0)}out | "
+        f"Time: {meta.get('latency', 0)}s[/dim]"
+    )
+    if meta.get("estimated_input_tokens"):
+        subtitle += f"[dim] | Estimated: ~{meta['estimated_input_tokens']}in[/dim]"
+    if meta.get("ttft") is not None:
+        subtitle += f"[dim] | First token: {meta['ttft']}s[/dim]"
+    if meta.get("cached"):
+        subtitle += "[dim] | Cached[/dim]"
+    if meta.get("chunks", 1) > 1:
+        subtitle += f"[dim] | Chunks: {meta['chunks']}[/dim]"
+    if meta.get("digest"):
+        subtitle += f"[dim] | Digest of {meta['digest']} channels[/dim]"
+    if meta.get("retries"):
+        subtitle += f"[dim] | Retries: {meta['retries']}[/dim]"
+    trimming = meta.get("trimming")
+    if trimming:
+        subtitle += (
+            f"[dim] | Trimmed: {trimming['trimmed_messages']} msgs "
+            f"to fit {trimming['limit']} token budget[/dim]"
+        )
+    prep = meta.get("preprocessing")
+    if prep and prep["kept_messages"] < prep["input_messages"]:
+        subtitle += (
+            f"[dim] | Filtered: {prep['input_messages'] - prep['kept_messages']} msgs "
+            f"(~{prep['tokens_saved']} tokens saved)[/dim]"
+        )
+
+    console.print(
+        Panel(
+            md,
+            title=f"[bold green]📡 TeleShell Summary: {title}[/bold green]",
+            subtitle=subtitle,
+            border_style="green",
+            padding=(1, 2),
+        )
+    )
+
+    checkpoint_outcome(outcome, config_manager, metrics)
+    console.print(f"[green]✅ Checkpoint updated for {channel}[/green]\n")
+
+
+def record_outcome_metrics(
+    outcome: Dict[str, Any], metrics: Optional["RunMetrics"]
+) -> None:
+    """Record a processed channel's status and LLM usage in the run metrics."""
+    if metrics is None:
+        return
+    metrics.record(outcome["channel"], status=outcome["status"])
+    if outcome["status"] == "ok":
+        metrics.record_result(outcome["channel"], outcome["result"]["metadata"])
+
+
+def checkpoint_outcome(
+    outcome: Dict[str, Any],
+    config_manager: ConfigManager,
+    metrics: Optional["RunMetrics"] = None,
+) -> Dict[str, Any]:
+    """Advance a summarized channel's checkpoint to its newest message."""
+    channel = outcome["channel"]
+    last_message = outcome["messages"][-1]
+    checkpoint = {
+        "last_message_id": last_message.id,
+        "last_message_date": last_message.date.isoformat(),
+    }
+    if metrics is not None:
+        with metrics.timed(channel, "checkpoint_time"):
+            config_manager.update_checkpoint(
+                channel, last_message.id, checkpoint["last_message_date"]
             )
+    else:
+        config_manager.update_checkpoint(
+            channel, last_message.id, checkpoint["last_message_date"]
         )
+    return checkpoint
+
+
+def render_metrics_summary(metrics: "RunMetrics") -> None:
+    """Print an end-of-run table of per-channel timings and usage."""
+    from rich.table import Table
+
+    table = Table(title="📈 Run Metrics", title_justify="left")
+    table.add_column("Channel")
+    table.add_column("Status")
+    table.add_column("Msgs", justify="right")
+    table.add_column("Fetch", justify="right")
+    table.add_column("LLM", justify="right")
+    table.add_column("TTFT", justify="right")
+    table.add_column("Tokens in/out", justify="right")
+    table.add_column("Retries", justify="right")
+
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.2f}s" if value is not None else "-"
+
+    for record in metrics.channels.values():
+        table.add_row(
+            record["channel"],
+            record.get("status", "-"),
+            str(record.get("messages", 0)),
+            seconds(record.get("fetch_time")),
+            seconds(record.get("llm_latency")),
+            seconds(record.get("ttft")),
+            f"{record.get('input_tokens', 0)}/{record.get('output_tokens', 0)}",
+            str(record.get("retries", 0)),
+        )
+
+    totals = metrics.totals()
+    table.caption = (
+        f"{totals['channels']} channels, {totals['messages']} messages, "
+        f"{totals['input_tokens']}/{totals['output_tokens']} tokens "
+        f"in {totals['run_time']}s"
+    )
+    console.print(table)
 
-        # Update checkpoint
-        last_msg_id = messages[0]["id"]
-        last_msg_date = messages[0]["date"].isoformat()
-        config_manager.update_checkpoint(channel, last_msg_id, last_msg_date)
-        console.print(f"[green]✅ Checkpoint updated for {channel}[/green]\n")
 
+class TeleShellGroup(click.Group):
+    """Command group that reports configuration errors without a traceback."""
 
-@click.group()
+    def invoke(self, ctx: click.Context) -> Any:
+        try:
+            return super().invoke(ctx)
+        except TemplateError as e:
+            raise click.ClickException(f"Invalid config.yaml: {e}") from e
+
+
+@click.group(cls=TeleShellGroup)
 @click.pass_context
 def cli(ctx: click.Context) -> None:
     """TeleShell: AI-driven Telegram automation and intelligence CLI tool."""
@@ -285,14 +1037,18 @@ def prepare_channel_choices(
     Transform Telegram dialogs into InquirerPy Choice objects,
     grouped by folder separators and pre-selected if already tracked.
     """
+    from InquirerPy.base.control import Choice
+    from InquirerPy.separator import Separator
+
+    # Normalize tracked channels once: stringify, remove @, lowercase
+    tracked_keys = {normalize_channel(t) for t in tracked}
+
     # Group by folder
     grouped: Dict[int, List[Dict[str, Any]]] = {}
     for d in all_dialogs:
         # Handle None as folder ID 0 (Main/Unsorted)
         f_id = d["folder_id"] if d["folder_id"] is not None else 0
-        if f_id not in grouped:
-            grouped[f_id] = []
-        grouped[f_id].append(d)
+        grouped.setdefault(f_id, []).append(d)
 
     choices = []
     # Process folders in order (Main first, then others)
@@ -308,17 +1064,9 @@ def prepare_channel_choices(
             value = d["handle"] if d["handle"] else str(d["id"])
             handle_display = f" (@{d['handle']})" if d["handle"] else f" (ID: {d['id']})"
 
-            # Ultra-robust pre-selection check
-            # Normalize tracked list: stringify, remove @, lowercase
-            normalized_tracked = [str(t).lstrip("@").lower() for t in tracked]
-            
-            # Candidates for matching
-            raw_id = str(d["id"])
-            handle = d["handle"].lower() if d["handle"] else None
-            
-            is_enabled = (
-                raw_id in normalized_tracked or
-                (handle and handle in normalized_tracked)
+            # Pre-select if tracked by either ID or handle
+            is_enabled = normalize_channel(d["id"]) in tracked_keys or bool(
+                d["handle"] and normalize_channel(d["handle"]) in tracked_keys
             )
 
             choices.append(
@@ -345,68 +1093,158 @@ def manage_channels(ctx: click.Context) -> None:
         console.print("[bold red]Error:[/bold red] TELEGRAM_API_ID/HASH missing in .env")
         return
 
+    from InquirerPy import inquirer
+    from InquirerPy.base.control import Choice
+    from teleshell.dialog_index import DialogIndex
+    from teleshell.telegram_client import TelegramClientWrapper
+
     config_manager = ctx.obj["config_manager"]
     config = config_manager.load()
     tracked = config.get("default_channels", [])
+    index_config = config.get("dialog_index", {})
 
     tg_client = TelegramClientWrapper(api_id, api_hash)
+    index = (
+        DialogIndex(config_manager.base_dir) if index_config.get("enabled") else None
+    )
+
+    async def refresh_dialogs(
+        full: bool,
+    ) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+        """Fetch dialogs and folders from Telegram and update the index."""
+        since = None if full or index is None else index.latest_date()
+        async with tg_client:
+            fetched = await tg_client.fetch_dialogs(since=since)
+            folders = await tg_client.fetch_folders()
+        if index is None:
+            return fetched, folders
+        index.update(fetched, folders, full=since is None)
+        return index.load()
 
     async def run_manage():
-        with console.status(
-            "[bold cyan]📡 Fetching your Telegram channels and folders...[/bold cyan]"
-        ):
-            await tg_client.start()
-            all_dialogs = await tg_client.fetch_dialogs()
-            folders = await tg_client.fetch_folders()
+        # Log in before the checklist opens: an interactive login prompt
+        # must not compete with the TUI for the terminal
+        await tg_client.start()
+        refresh = None
+        if index is not None and index.last_full_refresh() is not None:
+            # Open instantly from the index and reconcile in the background
+            all_dialogs, folders = index.load()
+            refresh = asyncio.create_task(
+                refresh_dialogs(full=index.is_stale(index_config.get("ttl_hours", 24)))
+            )
+        else:
+            with console.status(
+                "[bold cyan]📡 Fetching your Telegram channels and folders...[/bold cyan]"
+            ):
+                all_dialogs, folders = await refresh_dialogs(full=True)
 
         choices = prepare_channel_choices(all_dialogs, folders, tracked)
 
         # Check for actual choices (excluding separators)
         has_choices = any(isinstance(c, Choice) for c in choices)
-        if not has_choices:
+        if not has_choices and refresh is None:
             console.print(
                 "[yellow]No channels or groups found on your Telegram account to manage.[/yellow]"
             )
             return
 
-        selection = await inquirer.checkbox(
-            message="Select channels to track (Space to toggle, Enter to confirm):",
-            choices=choices,
-            transformer=lambda result: f"{len(result)} channels selected",
-        ).execute_async()
+        selection = None
+        if has_choices:
+            selection = await inquirer.checkbox(
+                message="Select channels to track (Space to toggle, Enter to confirm):",
+                choices=choices,
+                transformer=lambda result: f"{len(result)} channels selected",
+            ).execute_async()
+
+        if refresh is not None:
+            known_ids = {d["id"] for d in all_dialogs}
+            with console.status(
+                "[bold cyan]🔄 Syncing channel list with Telegram...[/bold cyan]"
+            ):
+                try:
+                    all_dialogs, folders = await refresh
+                except Exception as e:
+                    console.print(
+                        f"[bold yellow]⚠️ Could not refresh channel list:[/bold yellow] {e}"
+                    )
+            new_count = sum(1 for d in all_dialogs if d["id"] not in known_ids)
+            if new_count:
+                console.print(
+                    f"[dim]Found {new_count} new channels on Telegram; "
+                    "run `tshell channels manage` again to select them.[/dim]"
+                )
+
+        # Build title lookup from all_dialogs
+        title_lookup = {}
+        for d in all_dialogs:
+            val = f"@{d['handle']}" if d["handle"] else str(d["id"])
+            title_lookup[val] = d["title"]
+
+        if "channel_titles" not in config:
+            config["channel_titles"] = {}
+        titles = config["channel_titles"]
+
+        # Keep titles of tracked channels in sync with Telegram
+        titles_changed = False
+        for s in list(titles) + (selection if selection is not None else tracked):
+            if s in title_lookup and titles.get(s) != title_lookup[s]:
+                titles[s] = title_lookup[s]
+                titles_changed = True
 
         if selection is not None:
             config["default_channels"] = selection
-            
-            # Update title mapping for selected channels
-            if "channel_titles" not in config:
-                config["channel_titles"] = {}
-            
-            # Build title lookup from all_dialogs
-            title_lookup = {}
-            for d in all_dialogs:
-                val = f"@{d['handle']}" if d["handle"] else str(d["id"])
-                title_lookup[val] = d["title"]
-            
-            for s in selection:
-                if s in title_lookup:
-                    config["channel_titles"][s] = title_lookup[s]
-
             config_manager.save(config)
             console.print(
                 f"[bold green]✅ Success![/bold green] Updated tracking list with {len(selection)} channels."
             )
+        elif titles_changed:
+            config_manager.save(config)
 
-    asyncio.run(run_manage())
+    try:
+        asyncio.run(run_manage())
+    finally:
+        if index is not None:
+            index.close()
 
 
 @cli.command()
 @click.option("-c", "--channels", help="Channels to summarize (comma separated).")
 @click.option("-t", "--time-window", default="since_last_run", help="Time period.")
 @click.option("-v", "--verbose", is_flag=True, help="Verbose output.")
+@click.option(
+    "--digest",
+    is_flag=True,
+    help="Summarize low-volume channels together in shared LLM calls.",
+)
+@click.option(
+    "--metrics-out",
+    type=click.Path(dir_okay=False),
+    help="Append per-channel run metrics as JSON lines to this file.",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="rich",
+    show_default=True,
+    help="Write one record per channel instead of panels.",
+)
+@click.option(
+    "--output",
+    "output_path",
+    type=click.Path(dir_okay=False),
+    help="Write structured output to this file instead of stdout.",
+)
 @click.pass_context
 def summarize(
-    ctx: click.Context, channels: Optional[str], time_window: str, verbose: bool
+    ctx: click.Context,
+    channels: Optional[str],
+    time_window: str,
+    verbose: bool,
+    digest: bool,
+    metrics_out: Optional[str],
+    output_format: str,
+    output_path: Optional[str],
 ) -> None:
     """Summarize Telegram channels within a defined timeframe."""
     config_manager = ctx.obj["config_manager"]
@@ -417,6 +1255,157 @@ def summarize(
         channel_list = [c.strip() for c in channels.split(",")]
     else:
         channel_list = config.get("default_channels", [])
+    # `-c @News,news` or a repeated config entry must not be summarized twice
+    channel_list = unique_channels(channel_list)
+
+    if not channel_list:
+        log = console if output_format == "rich" else Console(stderr=True)
+        log.print(
+            "[bold red]Error:[/bold red] No channels provided and no default channels found in config.yaml."
+        )
+        return
+
+    asyncio.run(
+        run_summarize(
+            channel_list,
+            time_window,
+            verbose,
+            config_manager,
+            digest,
+            metrics_out,
+            output_format,
+            output_path,
+        )
+    )
+
+
+@cli.command()
+@click.argument("query")
+@click.option("-c", "--channels", help="Only search these channels (comma separated).")
+@click.option(
+    "-t", "--time-window", help="Only search messages since (e.g. 24h, 7d, today)."
+)
+@click.option(
+    "--until",
+    type=click.DateTime(),
+    help="Only search messages before this date.",
+)
+@click.option("-n", "--limit", default=20, show_default=True, help="Maximum results.")
+@click.pass_context
+def search(
+    ctx: click.Context,
+    query: str,
+    channels: Optional[str],
+    time_window: Optional[str],
+    until: Optional[datetime],
+    limit: int,
+) -> None:
+    """Search locally cached messages, without calling Telegram or the LLM."""
+    from rich.text import Text
+
+    from teleshell.message_store import MATCH_END, MATCH_START, MessageStore
+
+    config_manager = ctx.obj["config_manager"]
+    config = config_manager.load()
+    titles = config.get("channel_titles", {})
+
+    since = None
+    if time_window:
+        since = parse_time_window(time_window)
+        if not since:
+            console.print(
+                f"[bold red]❌ Invalid time window format:[/bold red] {time_window}"
+            )
+            return
+
+    channel_list = (
+        unique_channels(c.strip() for c in channels.split(",")) if channels else None
+    )
+    store = MessageStore(config_manager.base_dir)
+    try:
+        hits = store.search(query, channel_list, since, until, limit)
+    finally:
+        store.close()
+
+    if not hits:
+        console.print(f"[yellow]No cached messages match '{query}'.[/yellow]")
+        if not config.get("message_cache"):
+            console.print(
+                "[dim]The message cache is disabled, so new messages are not indexed.[/dim]"
+            )
+        return
+
+    for hit in hits:
+        date = hit.message.date.astimezone().strftime("%Y-%m-%d %H:%M")
+        console.print(
+            f"[bold white]{titles.get(hit.channel, hit.channel)}[/bold white] "
+            f"[dim]{date} · #{hit.message.id}[/dim]"
+        )
+        snippet = Text("  ")
+        for i, part in enumerate(hit.snippet.split(MATCH_START)):
+            matched, _, rest = part.partition(MATCH_END) if i else ("", "", part)
+            snippet.append(matched, style="bold yellow")
+            snippet.append(rest)
+        console.print(snippet)
+    console.print(f"[dim]{len(hits)} result(s)[/dim]")
+
+
+@cli.command()
+@click.argument("question")
+@click.option("-c", "--channels", help="Channels to ask about (comma separated).")
+@click.option(
+    "-t", "--time-window", default="30d", show_default=True, help="Time period."
+)
+@click.option("-k", "--top-k", type=int, help="Messages to answer from (ask.top_k).")
+@click.option(
+    "--offline", is_flag=True, help="Use stored messages without syncing Telegram."
+)
+@click.pass_context
+def ask(
+    ctx: click.Context,
+    question: str,
+    channels: Optional[str],
+    time_window: str,
+    top_k: Optional[int],
+    offline: bool,
+) -> None:
+    """Answer a question from the channel messages most relevant to it."""
+    config_manager = ctx.obj["config_manager"]
+    config = config_manager.load()
+
+    channel_list = []
+    if channels:
+        channel_list = [c.strip() for c in channels.split(",")]
+    else:
+        channel_list = config.get("default_channels", [])
+    channel_list = unique_channels(channel_list)
+
+    if not channel_list:
+        console.print(
+            "[bold red]Error:[/bold red] No channels provided and no default channels found in config.yaml."
+        )
+        return
+
+    asyncio.run(
+        run_ask(question, channel_list, time_window, top_k, offline, config_manager)
+    )
+
+
+@cli.command()
+@click.option("-c", "--channels", help="Channels to watch (comma separated).")
+@click.pass_context
+def watch(ctx: click.Context, channels: Optional[str]) -> None:
+    """Continuously summarize channels as new messages arrive."""
+    config_manager = ctx.obj["config_manager"]
+    config = config_manager.load()
+
+    channel_list = []
+    if channels:
+        channel_list = [c.strip() for c in channels.split(",")]
+    else:
+        channel_list = config.get("default_channels", [])
+    # `-c @News,news` or a repeated config entry must not be summarized twice
+    channel_list = unique_channels(channel_list)
 
     if not channel_list:
         console.print(
@@ -424,7 +1413,10 @@ def summarize(
         )
         return
 
-    asyncio.run(run_summarize(channel_list, time_window, verbose, config_manager))
+    try:
+        asyncio.run(run_watch(channel_list, config_manager))
+    except KeyboardInterrupt:
+        console.print("[dim]Stopped watching.[/dim]")
 
 
 if __name__ == "__main__":
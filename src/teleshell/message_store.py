@@ -0,0 +1,344 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Union
+from teleshell.models import MessageRecord
+from teleshell.sqlite_db import SQLiteDatabase
+from teleshell.utils import normalize_channel
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    channel TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    sender_id INTEGER,
+    text TEXT NOT NULL,
+    forward_key TEXT,
+    reply_to INTEGER,
+    PRIMARY KEY (channel, id)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_channel_date ON messages (channel, date);
+
+-- Per channel: every message with date >= since_date and id <= high_id is
+-- stored, and low_id is the first of them.
+CREATE TABLE IF NOT EXISTS sync_state (
+    channel TEXT PRIMARY KEY,
+    since_date INTEGER NOT NULL,
+    low_id INTEGER NOT NULL,
+    high_id INTEGER NOT NULL
+);
+"""
+
+# Full-text index over message texts, kept in sync with `messages` by triggers
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF text ON messages
+BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+# Stores a message, keeping its rowid (and so its index entry) on re-fetch
+UPSERT_MESSAGE = """
+INSERT INTO messages (channel, id, date, sender_id, text, forward_key, reply_to)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (channel, id) DO UPDATE SET
+    date = excluded.date,
+    sender_id = excluded.sender_id,
+    text = excluded.text,
+    forward_key = excluded.forward_key,
+    reply_to = excluded.reply_to
+"""
+
+# Marks around matched terms in search snippets
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+
+class SearchHit(NamedTuple):
+    """A stored message matching a search, with the matched terms marked."""
+
+    channel: str
+    message: MessageRecord
+    snippet: str
+
+
+def to_timestamp(value: datetime) -> int:
+    """Convert a datetime to epoch seconds (naive values are local time)."""
+    return int(value.timestamp())
+
+
+class MessageStore(SQLiteDatabase):
+    """Local SQLite cache of fetched Telegram messages with sync high-water marks."""
+
+    FILENAME = "messages.db"
+    SCHEMA = SCHEMA
+    TIMEOUT = 5.0
+
+    def migrate(self, conn: sqlite3.Connection) -> None:
+        """Add the columns and search index missing from older databases."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(messages)")}
+        if "forward_key" not in columns:
+            # Databases created before forwards were tracked
+            conn.execute("ALTER TABLE messages ADD COLUMN forward_key TEXT")
+        if "reply_to" not in columns:
+            # Databases created before replies were tracked
+            conn.execute("ALTER TABLE messages ADD COLUMN reply_to INTEGER")
+        indexed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+        ).fetchone()
+        conn.executescript(SEARCH_SCHEMA)
+        if not indexed:
+            # Index the messages stored before search existed
+            with conn:
+                conn.execute(
+                    "INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')"
+                )
+
+    def covered_high_id(
+        self,
+        channel: str,
+        offset_id: int = 0,
+        offset_date: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """
+        Return the stored high-water mark if the start of the requested window
+        is already synced locally, or None if it must be fetched from Telegram.
+        """
+        row = self.conn.execute(
+            "SELECT since_date, low_id, high_id FROM sync_state WHERE channel = ?",
+            (channel,),
+        ).fetchone()
+        if row is None:
+            return None
+        since_date, low_id, high_id = row
+
+        if offset_id > 0:
+            covered = low_id <= offset_id <= high_id
+        elif offset_date is not None:
+            covered = to_timestamp(offset_date) >= since_date
+        else:
+            covered = False
+        return high_id if covered else None
+
+    def iter_messages(
+        self,
+        channel: str,
+        after_id: int = 0,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        until_id: Optional[int] = None,
+    ) -> Iterator[MessageRecord]:
+        """
+        Yield stored message records in ascending ID order. until_id bounds
+        the result to the synced range, leaving out rows of older ranges and
+        messages stored outside of any sync.
+        """
+        query = (
+            "SELECT id, text, date, sender_id, forward_key, reply_to FROM messages "
+            "WHERE channel = ?"
+        )
+        params: List[Any] = [channel]
+        if after_id > 0:
+            query += " AND id > ?"
+            params.append(after_id)
+        if until_id is not None:
+            query += " AND id <= ?"
+            params.append(until_id)
+        if since is not None:
+            query += " AND date >= ?"
+            params.append(to_timestamp(since))
+        query += " ORDER BY id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        for msg_id, text, date, sender_id, forward_key, reply_to in self.conn.execute(
+            query, params
+        ):
+            yield MessageRecord(
+                msg_id,
+                text,
+                datetime.fromtimestamp(date, tz=timezone.utc),
+                sender_id,
+                forward_key,
+                reply_to,
+            )
+
+    def record_sync(
+        self,
+        channel: str,
+        records: List[MessageRecord],
+        extend: bool,
+        since: Optional[datetime] = None,
+    ) -> None:
+        """
+        Store a batch of contiguous, ascending records fetched from Telegram and
+        advance the channel's sync state. With extend=False the batch starts a
+        new synced range (from `since`, or from its first message); otherwise it
+        continues the existing range.
+        """
+        if not records:
+            return
+
+        with self.conn:
+            self._store(channel, records)
+
+            high_id = records[-1].id
+            if extend:
+                self.conn.execute(
+                    "UPDATE sync_state SET high_id = MAX(high_id, ?) WHERE channel = ?",
+                    (high_id, channel),
+                )
+                return
+
+            if since is None:
+                # Nothing older than the first message is known to be stored
+                since = records[0].date + timedelta(seconds=1)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state "
+                "(channel, since_date, low_id, high_id) VALUES (?, ?, ?, ?)",
+                (channel, to_timestamp(since), records[0].id, high_id),
+            )
+
+    def store_messages(self, channel: str, records: Iterable[MessageRecord]) -> None:
+        """
+        Store records outside of any synced range, e.g. a page of recent
+        messages, so they can be searched without affecting the sync state.
+        """
+        with self.conn:
+            self._store(channel, records)
+
+    def _store(self, channel: str, records: Iterable[MessageRecord]) -> None:
+        self.conn.executemany(
+            UPSERT_MESSAGE,
+            [
+                (
+                    channel,
+                    r.id,
+                    to_timestamp(r.date),
+                    r.sender_id,
+                    r.text,
+                    r.forward_key,
+                    r.reply_to,
+                )
+                for r in records
+            ],
+        )
+
+    def channels(self) -> List[str]:
+        """Channels with stored messages."""
+        # Walks the (channel, date) index one channel at a time instead of
+        # scanning every message like SELECT DISTINCT would
+        rows = self.conn.execute(
+            "WITH RECURSIVE c(channel) AS ("
+            "SELECT MIN(channel) FROM messages UNION ALL "
+            "SELECT (SELECT MIN(channel) FROM messages WHERE channel > c.channel) "
+            "FROM c WHERE c.channel IS NOT NULL"
+            ") SELECT channel FROM c WHERE channel IS NOT NULL"
+        )
+        return [row[0] for row in rows]
+
+    def search(
+        self,
+        query: str,
+        channels: Optional[Iterable[Union[str, int]]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        any_word: bool = False,
+    ) -> List[SearchHit]:
+        """
+        Stored messages matching a full-text query, best match (BM25) first.
+        Channels are matched regardless of how they are spelled (`@Handle`,
+        `handle`, t.me link); dates limit the messages to [since, until).
+        With any_word, messages containing any of the words match, ranked by
+        how many and how rare the contained words are.
+        """
+        match = fts_query(query, any_word)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT m.channel, m.id, m.text, m.date, m.sender_id, m.forward_key, "
+            "m.reply_to, "
+            "snippet(messages_fts, 0, ?, ?, '…', 16) "
+            "FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid "
+            "WHERE messages_fts MATCH ?"
+        )
+        params: List[Any] = [MATCH_START, MATCH_END, match]
+        if channels is not None:
+            wanted = {normalize_channel(c) for c in channels}
+            keys = [c for c in self.channels() if normalize_channel(c) in wanted]
+            if not keys:
+                return []
+            sql += f" AND m.channel IN ({', '.join('?' * len(keys))})"
+            params += keys
+        if since is not None:
+            sql += " AND m.date >= ?"
+            params.append(to_timestamp(since))
+        if until is not None:
+            sql += " AND m.date < ?"
+            params.append(to_timestamp(until))
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        return [
+            SearchHit(
+                channel,
+                MessageRecord(
+                    msg_id,
+                    text,
+                    datetime.fromtimestamp(date, tz=timezone.utc),
+                    sender_id,
+                    forward_key,
+                    reply_to,
+                ),
+                snippet,
+            )
+            for (
+                channel,
+                msg_id,
+                text,
+                date,
+                sender_id,
+                forward_key,
+                reply_to,
+                snippet,
+            ) in self.conn.execute(sql, params)
+        ]
+
+
+def fts_query(query: str, any_word: bool = False) -> str:
+    """
+    FTS5 query matching messages that contain every word of a plain search,
+    or any of them with any_word. Words are quoted so punctuation is not read
+    as query syntax; a trailing `*` keeps its meaning as a prefix match, and
+    `OR` between words is kept.
+    """
+    terms: List[str] = []
+    for word in query.split():
+        if word == "OR":
+            if terms and terms[-1] != "OR":
+                terms.append(word)
+            continue
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    while terms and terms[-1] == "OR":
+        terms.pop()
+    if any_word:
+        return " OR ".join(t for t in terms if t != "OR")
+    return " ".join(terms)
@@ -0,0 +1,101 @@
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Summary metadata copied into a channel's metrics record, renamed where the
+# metrics name is more specific
+RESULT_FIELDS = {
+    "model": "model",
+    "latency": "llm_latency",
+    "ttft": "ttft",
+    "input_tokens": "input_tokens",
+    "output_tokens": "output_tokens",
+    "estimated_input_tokens": "estimated_input_tokens",
+    "retries": "retries",
+    "chunks": "chunks",
+    "cached": "cached",
+    "digest": "digest",
+    "prompt_build_time": "prompt_build_time",
+}
+
+
+class RunMetrics:
+    """
+    Per-channel timings, message counts and LLM usage of one run, written
+    as one JSON line per channel so runs can be compared over time.
+    """
+
+    def __init__(self, command: str, clock: Any = time.perf_counter) -> None:
+        self.command = command
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now(timezone.utc)
+        self.channels: Dict[str, Dict[str, Any]] = {}
+        self._clock = clock
+        self._start = clock()
+
+    def channel(self, channel: str) -> Dict[str, Any]:
+        """The metrics record of a channel, created on first use."""
+        return self.channels.setdefault(channel, {"channel": channel})
+
+    def record(self, channel: str, **values: Any) -> None:
+        """Set values on a channel's record."""
+        self.channel(channel).update(values)
+
+    @contextmanager
+    def timed(self, channel: str, name: str) -> Iterator[None]:
+        """Add the seconds spent in the block to a channel's `name` timing."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            record = self.channel(channel)
+            record[name] = round(record.get(name, 0.0) + self._clock() - start, 4)
+
+    def record_result(self, channel: str, metadata: Dict[str, Any]) -> None:
+        """Copy the usage reported by the summarizer into a channel's record."""
+        record = self.channel(channel)
+        for key, name in RESULT_FIELDS.items():
+            if metadata.get(key) is not None:
+                record[name] = metadata[key]
+
+    def records(self) -> List[Dict[str, Any]]:
+        """All channel records, tagged with the run they belong to."""
+        run = {
+            "run_id": self.run_id,
+            "command": self.command,
+            "started_at": self.started_at.isoformat(),
+            "run_time": round(self._clock() - self._start, 4),
+        }
+        return [{**run, **record} for record in self.channels.values()]
+
+    def write(self, path: Path) -> None:
+        """Append the records of this run to a JSON lines file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.records():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def totals(self) -> Dict[str, Any]:
+        """Aggregates over all channels for the end-of-run summary."""
+        records = list(self.channels.values())
+        return {
+            "channels": len(records),
+            "messages": sum(r.get("messages", 0) for r in records),
+            "input_tokens": sum(r.get("input_tokens", 0) for r in records),
+            "output_tokens": sum(r.get("output_tokens", 0) for r in records),
+            "retries": sum(r.get("retries", 0) for r in records),
+            "run_time": round(self._clock() - self._start, 2),
+        }
+
+
+def metrics_path(config: Dict[str, Any], base_dir: Path) -> Optional[Path]:
+    """Where metrics are written per the `metrics` config section, if enabled."""
+    if not config.get("enabled"):
+        return None
+    if config.get("path"):
+        return Path(config["path"]).expanduser()
+    return base_dir / "metrics.jsonl"
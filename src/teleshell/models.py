@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Any, Optional
+
+
+class MessageRecord:
+    """
+    Compact Telegram message shared by the fetch, cache and summarize layers.
+    Slotted instances carry no per-instance __dict__, so they take a fraction
+    of the memory of the 4-key dicts used before, and slicing a list of them
+    only copies references.
+    """
+
+    __slots__ = ("id", "text", "date", "sender_id", "forward_key", "reply_to")
+
+    def __init__(
+        self,
+        id: int,
+        text: str,
+        date: datetime,
+        sender_id: Optional[int] = None,
+        forward_key: Optional[str] = None,
+        reply_to: Optional[int] = None,
+    ) -> None:
+        self.id = id
+        self.text = text
+        self.date = date
+        self.sender_id = sender_id
+        # Identifies the original post of a forwarded message
+        self.forward_key = forward_key
+        # ID of the message this one replies to
+        self.reply_to = reply_to
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MessageRecord):
+            return NotImplemented
+        return (
+            self.id,
+            self.text,
+            self.date,
+            self.sender_id,
+            self.forward_key,
+            self.reply_to,
+        ) == (
+            other.id,
+            other.text,
+            other.date,
+            other.sender_id,
+            other.forward_key,
+            other.reply_to,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"MessageRecord(id={self.id!r}, text={self.text!r}, "
+            f"date={self.date!r}, sender_id={self.sender_id!r}, "
+            f"forward_key={self.forward_key!r}, reply_to={self.reply_to!r})"
+        )
@@ -0,0 +1,84 @@
+import json
+from typing import Any, Dict, Optional, TextIO
+
+# Formats of `tshell summarize -o`; "rich" renders panels for humans
+OUTPUT_FORMATS = ("rich", "json", "ndjson", "markdown")
+
+
+def outcome_record(
+    outcome: Dict[str, Any], checkpoint: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Structured record of a processed channel for machine consumption."""
+    result = outcome.get("result") or {}
+    messages = outcome.get("messages")
+    record: Dict[str, Any] = {
+        "channel": outcome["channel"],
+        "title": outcome["title"],
+        "status": outcome["status"],
+        "error": outcome.get("error"),
+        "summary": result.get("content"),
+        "metadata": result.get("metadata", {}),
+        "messages": None,
+        "checkpoint": checkpoint,
+    }
+    if messages:
+        record["messages"] = {
+            "count": len(messages),
+            "first_id": messages[0].id,
+            "last_id": messages[-1].id,
+            "from": messages[0].date.isoformat(),
+            "to": messages[-1].date.isoformat(),
+            "is_limited": outcome.get("is_limited", False),
+        }
+    return record
+
+
+def markdown_record(record: Dict[str, Any]) -> str:
+    """A channel record as a Markdown section."""
+    lines = [f"## {record['title']}", ""]
+    messages = record["messages"]
+    if messages:
+        lines += [
+            f"_{messages['count']} messages, {messages['from']} to {messages['to']}_",
+            "",
+        ]
+    if record["summary"] is not None:
+        lines.append(record["summary"].strip())
+    else:
+        status = record["status"]
+        lines.append(
+            f"_{status}: {record['error']}_" if record["error"] else f"_{status}_"
+        )
+    return "\n".join(lines) + "\n\n"
+
+
+class RecordWriter:
+    """
+    Streams channel records to a text stream as they complete: a JSON array,
+    one JSON object per line (ndjson) or Markdown sections.
+    """
+
+    def __init__(self, stream: TextIO, output_format: str) -> None:
+        self.stream = stream
+        self.output_format = output_format
+        self.count = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Write one record and flush it, so consumers see it immediately."""
+        if self.output_format == "markdown":
+            self.stream.write(markdown_record(record))
+        else:
+            data = json.dumps(record, ensure_ascii=False, default=str)
+            if self.output_format == "json":
+                data = ("[\n" if self.count == 0 else ",\n") + data
+            else:
+                data += "\n"
+            self.stream.write(data)
+        self.count += 1
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Terminate the output; a JSON array is closed here."""
+        if self.output_format == "json":
+            self.stream.write("\n]\n" if self.count else "[]\n")
+            self.stream.flush()
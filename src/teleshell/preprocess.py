@@ -0,0 +1,157 @@
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+from teleshell.models import MessageRecord
+
+# Host, path, then query string and fragment, which are dropped
+URL_PATTERN = re.compile(
+    r"(?:https?://(?:www\.)?|www\.)([^\s/?#<>]+)([^\s?#<>]*)[^\s<>]*",
+    re.IGNORECASE,
+)
+
+# Pictographs, dingbats, symbols, flags, variation selectors and ZWJ
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001f000-\U0001faff"
+    "\U00002600-\U000027bf"
+    "\U0001f1e6-\U0001f1ff"
+    "\U0000fe0f"
+    "\U0000200d"
+    "]+"
+)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Word n-gram size used as shingles for near-duplicate detection
+SHINGLE_WORDS = 3
+
+# Number of smallest shingle hashes kept per message (bottom-k MinHash)
+SKETCH_SIZE = 32
+
+DEFAULT_PREPROCESSING: Dict[str, Any] = {
+    "enabled": True,
+    "min_chars": 3,
+    "min_words": 1,
+    # Opt-in: a shortened link no longer tells the model which page it was
+    "normalize_urls": False,
+    "strip_emoji": True,
+    "collapse_forwards": True,
+    "near_duplicates": True,
+    "similarity_threshold": 0.8,
+}
+
+
+def normalize_text(
+    text: str, normalize_urls: bool = False, strip_emoji: bool = True
+) -> str:
+    """
+    Shrink a message to what matters for summarization: emoji are dropped
+    and whitespace is collapsed. With normalize_urls, links lose their
+    scheme, query string and fragment but keep host and path.
+    """
+    if normalize_urls:
+        text = URL_PATTERN.sub(
+            lambda m: f"<{m.group(1).lower()}{m.group(2).rstrip('/')}>", text
+        )
+    if strip_emoji:
+        text = EMOJI_PATTERN.sub("", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def minhash_sketch(text: str, size: int = SKETCH_SIZE) -> Set[int]:
+    """Bottom-k MinHash sketch over the word shingles of a normalized text."""
+    words = text.casefold().split()
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {
+            " ".join(words[i : i + SHINGLE_WORDS])
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        }
+    hashes = {
+        int.from_bytes(
+            hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for s in shingles
+    }
+    return set(heapq.nsmallest(size, hashes))
+
+
+def estimate_similarity(a: Set[int], b: Set[int], size: int = SKETCH_SIZE) -> float:
+    """Estimate the Jaccard similarity of two texts from their sketches."""
+    union = heapq.nsmallest(size, a | b)
+    if not union:
+        return 0.0
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+def preprocess_messages(
+    messages: List[MessageRecord], config: Dict[str, Any]
+) -> Tuple[List[MessageRecord], Dict[str, int]]:
+    """
+    Normalize messages and drop noise before they reach the prompt: messages
+    below the minimum length, repeated forwards of the same post, exact
+    duplicates and near-duplicates. The earliest occurrence is kept.
+    Returns the kept messages (with normalized text) and counts per reason.
+    """
+    settings = {**DEFAULT_PREPROCESSING, **config}
+    min_chars = int(settings["min_chars"])
+    min_words = int(settings["min_words"])
+    threshold = float(settings["similarity_threshold"])
+
+    dropped = Counter({"short": 0, "forward": 0, "duplicate": 0, "near_duplicate": 0})
+    kept: List[MessageRecord] = []
+    seen_forwards: Set[str] = set()
+    seen_texts: Set[str] = set()
+    sketches: List[Set[int]] = []
+    sketch_index: Dict[int, List[int]] = {}
+
+    for msg in messages:
+        text = normalize_text(
+            msg.text,
+            normalize_urls=settings["normalize_urls"],
+            strip_emoji=settings["strip_emoji"],
+        )
+        if len(text) < min_chars or len(text.split()) < min_words:
+            dropped["short"] += 1
+            continue
+
+        if settings["collapse_forwards"] and msg.forward_key:
+            if msg.forward_key in seen_forwards:
+                dropped["forward"] += 1
+                continue
+            seen_forwards.add(msg.forward_key)
+
+        key = text.casefold()
+        if key in seen_texts:
+            dropped["duplicate"] += 1
+            continue
+        seen_texts.add(key)
+
+        if settings["near_duplicates"]:
+            sketch = minhash_sketch(text)
+            # Sketches of near-duplicates share most of their minima; messages
+            # sharing fewer than this many are not worth comparing
+            min_shared = max(1, math.ceil(len(sketch) * threshold / 2))
+            shared = Counter(i for h in sketch for i in sketch_index.get(h, ()))
+            if any(
+                count >= min_shared
+                and estimate_similarity(sketch, sketches[i]) >= threshold
+                for i, count in shared.items()
+            ):
+                dropped["near_duplicate"] += 1
+                continue
+            for h in sketch:
+                sketch_index.setdefault(h, []).append(len(sketches))
+            sketches.append(sketch)
+
+        kept.append(
+            MessageRecord(
+                msg.id, text, msg.date, msg.sender_id, msg.forward_key, msg.reply_to
+            )
+        )
+
+    return kept, dict(dropped)
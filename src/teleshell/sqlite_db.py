@@ -0,0 +1,44 @@
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+
+class SQLiteDatabase:
+    """
+    A SQLite (WAL) database in ~/.teleshell, opened lazily on first use.
+    Subclasses set FILENAME and SCHEMA, and extend migrate() to upgrade
+    databases created by older versions.
+    """
+
+    FILENAME = ""
+    SCHEMA = ""
+    # Seconds to wait for a lock held by a concurrent tshell process
+    TIMEOUT = 10.0
+
+    def __init__(
+        self, base_dir: Optional[Path] = None, filename: Optional[str] = None
+    ) -> None:
+        if not base_dir:
+            base_dir = Path.home() / ".teleshell"
+        self.db_path = base_dir / (filename or self.FILENAME)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the database lazily on first use."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.db_path), timeout=self.TIMEOUT)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            self.migrate(self._conn)
+        return self._conn
+
+    def migrate(self, conn: sqlite3.Connection) -> None:
+        """Upgrade a database created by an older version, once it is opened."""
+        pass
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
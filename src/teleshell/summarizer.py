@@ -1,15 +1,411 @@
 import os
+import re
 import litellm
 import litellm.exceptions
 import time
 import logging
 import asyncio
 import random
-from typing import List, Dict, Any, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from teleshell.models import MessageRecord
+from teleshell.preprocess import preprocess_messages
+from teleshell.summary_cache import SummaryCache, make_cache_key
+from teleshell.templates import (
+    DEFAULT_MESSAGE_FORMAT,
+    MESSAGE_FORMATS,
+    Value,
+    compile_template,
+    message_format_legend,
+)
 
 # Suppress litellm logging unless requested
 logging.getLogger("LiteLLM").setLevel(logging.WARNING)
 
+# Rough characters-per-token ratio used for fast local estimates
+CHARS_PER_TOKEN = 4
+
+# Max estimated input tokens of messages per LLM call before chunking kicks in
+DEFAULT_CHUNK_TOKENS = 30000
+
+# Appended to every prompt
+FORMAT_GUIDELINE = (
+    "\n\nFormat the output using Markdown. Use bold for key terms and bullet "
+    "points for highlights where appropriate."
+)
+
+# Length guideline for intermediate (map/reduce) summaries
+PARTIAL_GUIDELINE = "as a detailed bullet list of all key points, facts and names"
+
+# Transient provider errors retried by the scheduler with shared backoff
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    litellm.exceptions.RateLimitError,
+    litellm.exceptions.ServiceUnavailableError,
+    litellm.exceptions.InternalServerError,
+    litellm.exceptions.Timeout,
+    litellm.exceptions.APIConnectionError,
+)
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_TEMPLATE = (
+    "The following Telegram messages are one part of a longer conversation "
+    "from the channel '{{channel_name}}' for the period '{{time_period}}'. "
+    "Extract the key topics and highlights {{summary_length_guideline}}.\n\n"
+    "Messages:\n{{messages}}"
+)
+
+DEFAULT_COMBINE_TEMPLATE = (
+    "The following are partial summaries of consecutive parts of the Telegram "
+    "channel '{{channel_name}}' for the period '{{time_period}}'. Combine them "
+    "into a single coherent summary, merging overlapping topics, and provide "
+    "the summary {{summary_length_guideline}}.\n\n"
+    "Partial summaries:\n{{messages}}"
+)
+
+
+DEFAULT_DIGEST_TEMPLATE = (
+    "Summarize the recent Telegram messages of each channel below. Every "
+    "channel starts with a header line '### [n] name (period)'. For each "
+    "channel, write a section that starts with the exact line "
+    "'=== CHANNEL n ===' (using its number n), followed by its key topics and "
+    "highlights {{summary_length_guideline}}. Write exactly one section per "
+    "channel, in the given order, and nothing outside the sections.\n\n"
+    "Channels:\n{{messages}}"
+)
+
+DEFAULT_ASK_TEMPLATE = (
+    "Answer the question below using only the following Telegram messages "
+    "from '{{channel_name}}' for the period '{{time_period}}'. They are the "
+    "messages most relevant to the question, in chronological order. If they "
+    "do not answer it, say so. Answer {{summary_length_guideline}}.\n\n"
+    "Question: {{question}}\n\n"
+    "Messages:\n{{messages}}"
+)
+
+# Section marker the digest template asks the model to emit per channel
+DIGEST_SECTION_PATTERN = re.compile(
+    r"^\W*=+\s*CHANNEL\s+\[?(\d+)\]?\s*=+\W*$", re.IGNORECASE | re.MULTILINE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local approximation of the token count of a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def fit_to_budget(
+    lines: List[str],
+    max_tokens: int,
+    count: Callable[[str], int] = estimate_tokens,
+    strategy: str = "newest",
+) -> List[str]:
+    """
+    Select lines in their original order whose token count stays within
+    max_tokens. "newest" keeps the most recent contiguous run of lines;
+    "sample" keeps lines spread evenly across the whole window.
+    """
+    sizes = [count(line) for line in lines]
+    total = sum(sizes)
+    if total <= max_tokens:
+        return lines
+
+    if strategy == "sample":
+        # Take every n-th line so the kept share matches the budget share
+        ratio = max_tokens / total
+        picked = [i for i in range(len(lines)) if int((i + 1) * ratio) > int(i * ratio)]
+        used = sum(sizes[i] for i in picked)
+        # Integer rounding may overshoot; drop the oldest picks until it fits
+        while picked and used > max_tokens:
+            used -= sizes[picked.pop(0)]
+        return [lines[i] for i in picked]
+
+    used = 0
+    start = len(lines)
+    while start > 0 and used + sizes[start - 1] <= max_tokens:
+        start -= 1
+        used += sizes[start]
+    return lines[start:]
+
+
+def digest_groups(
+    sizes: List[int], max_tokens: int, max_channel_tokens: int
+) -> List[List[int]]:
+    """
+    Pack channels, given by their estimated token sizes, into digest groups
+    of at most max_tokens, in order. Channels above max_channel_tokens are
+    left out and summarized on their own, as are groups of one.
+    """
+    groups: List[List[int]] = []
+    group: List[int] = []
+    group_size = 0
+    for i, size in enumerate(sizes):
+        if size > max_channel_tokens:
+            continue
+        if group and group_size + size > max_tokens:
+            groups.append(group)
+            group = []
+            group_size = 0
+        group.append(i)
+        group_size += size
+    if group:
+        groups.append(group)
+    return [g for g in groups if len(g) > 1]
+
+
+def parse_digest(text: str) -> Dict[int, str]:
+    """Split a digest answer into its numbered per-channel sections."""
+    markers = list(DIGEST_SECTION_PATTERN.finditer(text))
+    sections: Dict[int, str] = {}
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following is not None else len(text)
+        content = text[marker.end() : end].strip()
+        if content:
+            sections.setdefault(int(marker.group(1)), content)
+    return sections
+
+
+def relative_time(seconds: float) -> str:
+    """Shortest readable form of an offset: +45m, +3h05, +2d4h."""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"+{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"+{hours}h{minutes:02d}"
+    days, hours = divmod(hours, 24)
+    return f"+{days}d{hours}h"
+
+
+def sender_alias(index: int) -> str:
+    """Short alias of the index-th sender: A..Z, then AA, AB, ..."""
+    alias = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        alias = chr(ord("A") + rest) + alias
+    return alias
+
+
+class MessageFormatter:
+    """
+    Formats messages as prompt lines per the `message_format` summary
+    setting. Times are relative to the earliest of the given messages and
+    senders get short aliases in order of appearance, so a line carries who
+    said what and when in a few tokens, consistently across all chunks.
+    """
+
+    def __init__(self, config: Dict[str, Any], messages: List[MessageRecord]) -> None:
+        message_format = config.get("message_format") or DEFAULT_MESSAGE_FORMAT
+        message_format = MESSAGE_FORMATS.get(message_format, message_format)
+        self.plain = message_format == DEFAULT_MESSAGE_FORMAT
+        self.template = compile_template(message_format)
+        if self.plain:
+            return
+
+        self.start = min((msg.date for msg in messages), default=None)
+        self.aliases: Dict[Optional[int], str] = {}
+        self.senders: Dict[int, Optional[int]] = {}
+        for msg in messages:
+            self.senders[msg.id] = msg.sender_id
+            if msg.sender_id not in self.aliases:
+                self.aliases[msg.sender_id] = sender_alias(len(self.aliases))
+
+    def __call__(self, msg: MessageRecord) -> str:
+        if self.plain:
+            return f"- {msg.text}"
+        reply = ""
+        if msg.reply_to is not None:
+            if msg.reply_to in self.senders:
+                reply = " >" + self.aliases[self.senders[msg.reply_to]]
+            else:
+                reply = " >?"
+        time_offset = ""
+        if self.start is not None:
+            time_offset = relative_time((msg.date - self.start).total_seconds())
+        return self.template.render(
+            {
+                "text": msg.text,
+                "id": str(msg.id),
+                "time": time_offset,
+                "sender": self.aliases.get(msg.sender_id, ""),
+                "reply": reply,
+            }
+        )
+
+
+def chunk_lines(lines: Iterable[str], max_tokens: int) -> Iterator[List[str]]:
+    """
+    Group lines into consecutive chunks whose estimated size stays within
+    max_tokens. A single line larger than the budget forms its own chunk.
+    """
+    chunk: List[str] = []
+    chunk_size = 0
+    for line in lines:
+        size = estimate_tokens(line)
+        if chunk and chunk_size + size > max_tokens:
+            yield chunk
+            chunk = []
+            chunk_size = 0
+        chunk.append(line)
+        chunk_size += size
+    if chunk:
+        yield chunk
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` units per minute.
+    Reservations may overdraw the bucket; the caller then waits until the
+    debt is refilled, so concurrent callers are served first come, first served.
+    """
+
+    def __init__(
+        self, per_minute: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket and return the seconds to wait for it."""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier reservation by amount (negative refunds)."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class LLMScheduler:
+    """
+    Schedules LLM calls against requests-per-minute and tokens-per-minute
+    budgets. Rate-limited calls are retried with jittered exponential backoff
+    that is shared by all in-flight calls, so one 429 pauses every caller
+    instead of each hammering the provider on its own schedule.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests = (
+            TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        )
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+        self._clock = clock
+        self._resume_at = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LLMScheduler":
+        """Build a scheduler from the `llm_limits` config section."""
+        return cls(
+            requests_per_minute=config.get("requests_per_minute"),
+            tokens_per_minute=config.get("tokens_per_minute"),
+            max_retries=int(config.get("max_retries", 5)),
+        )
+
+    async def run(
+        self, call: Callable[[], Awaitable[T]], tokens: int = 0
+    ) -> Tuple[T, int]:
+        """
+        Run call once the budgets allow it, retrying transient errors.
+        Returns the call's result and the number of retries it needed.
+        """
+        retries = 0
+        while True:
+            # Honour a backoff started by any other call
+            while (pause := self._resume_at - self._clock()) > 0:
+                await asyncio.sleep(pause)
+
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens))
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                return await call(), retries
+            except self.retry_on as e:
+                if retries >= self.max_retries:
+                    raise
+                retry_after = _retry_after(e)
+                if retry_after:
+                    # Never retry before the provider asked; only wait longer
+                    delay = retry_after * random.uniform(1.0, 1.2)
+                else:
+                    delay = min(self.max_delay, self.base_delay * 2**retries)
+                    delay *= random.uniform(0.5, 1.5)
+                retries += 1
+                self._resume_at = max(self._resume_at, self._clock() + delay)
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Reconcile a call's estimated token reservation with its real usage."""
+        if self.tokens is not None and actual:
+            self.tokens.adjust(actual - estimated)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by the provider's Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBudget:
+    """
+    Input-token allowance shared by all summaries of one run. Summaries are
+    trimmed to the remaining allowance before their LLM calls are made.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.remaining = total
+
+    def consume(self, tokens: int) -> None:
+        """Deduct the estimated input tokens of a summary."""
+        self.remaining = max(0, self.remaining - tokens)
+
 
 class SummarizationError(Exception):
     """Custom exception for errors during the summarization process."""
@@ -17,15 +413,45 @@ class SummarizationError(Exception):
     pass
 
 
+def _nothing_left(preprocessing: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Result for a channel whose messages were all filtered out."""
+    return {
+        "content": "Only noise and duplicates in this period; nothing to summarize.",
+        "metadata": {"preprocessing": preprocessing},
+    }
+
+
 class Summarizer:
     """Handles AI-powered summarization using LiteLLM."""
 
-    def __init__(self, api_key: str, model: str = "gemini/gemini-flash-latest") -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini/gemini-flash-latest",
+        cache: Optional[SummaryCache] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        tokenizer: str = "estimate",
+    ) -> None:
         self.api_key = api_key
         self.model = model
+        self.cache = cache
+        self.scheduler = scheduler or LLMScheduler()
+        self.tokenizer = tokenizer
         # Configure LiteLLM
         os.environ["GEMINI_API_KEY"] = api_key
 
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text with the model's tokenizer when configured
+        ("model"), or with the fast local approximation otherwise.
+        """
+        if self.tokenizer == "model":
+            try:
+                return litellm.token_counter(model=self.model, text=text)
+            except Exception:
+                pass
+        return estimate_tokens(text)
+
     def get_length_guideline(self, length: Union[str, int]) -> str:
         """Translate configuration length into a textual guideline for the LLM."""
         if length == "short":
@@ -44,57 +470,542 @@ class Summarizer:
         channel_name: str,
         time_period: str,
         summary_length_guideline: str,
-        messages: str,
+        messages: Value,
+        question: str = "",
+        message_count: Optional[int] = None,
+        separator: str = "\n",
+        legend: str = "",
     ) -> str:
-        """Replace placeholders in the template with actual values."""
-        prompt = template
-        prompt = prompt.replace("{{channel_name}}", channel_name)
-        prompt = prompt.replace("{{time_period}}", time_period)
-        prompt = prompt.replace(
-            "{{summary_length_guideline}}", summary_length_guideline
+        """
+        Fill the template's placeholders in a single pass over its compiled
+        form. messages may be a list of lines, joined with separator as part
+        of the same pass; message_count defaults to the number of lines.
+        legend, which explains the message format, is put before the messages.
+        """
+        if message_count is None:
+            message_count = len(messages) if not isinstance(messages, str) else 0
+        if legend:
+            if isinstance(messages, str):
+                messages = [legend, messages] if messages else [legend]
+            else:
+                messages = [legend, *messages]
+        return compile_template(template).render(
+            {
+                "channel_name": channel_name,
+                "time_period": time_period,
+                "summary_length_guideline": summary_length_guideline,
+                "messages": messages,
+                "message_count": str(message_count),
+                "question": question,
+            },
+            separator=separator,
+            # Internal formatting guidelines
+            suffix=FORMAT_GUIDELINE,
         )
-        prompt = prompt.replace("{{messages}}", messages)
-
-        # Add internal formatting guidelines
-        prompt += "\n\nFormat the output using Markdown. Use bold for key terms and bullet points for highlights where appropriate."
-        return prompt
 
     async def summarize(
         self,
-        messages: List[Dict[str, Any]],
+        messages: List[MessageRecord],
         channel_name: str,
         time_period: str,
         config: Dict[str, Any],
         template: str,
+        chunk_template: Optional[str] = None,
+        combine_template: Optional[str] = None,
+        budget: Optional[TokenBudget] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        limit: Optional[asyncio.Semaphore] = None,
     ) -> Dict[str, Any]:
-        """Generate a summary for the given messages and return with metadata."""
+        """
+        Generate a summary for the given messages and return with metadata.
+        Message sets larger than the chunk token budget are summarized
+        map-reduce style: chunks in parallel, then partial summaries combined.
+        Messages are trimmed beforehand to fit the per-channel token budget
+        and the remaining run budget, if any.
+        With on_text, the final call is streamed and on_text receives the
+        summary text generated so far after every received token.
+        limit is the run-level LLM call limiter; every call of every stage
+        holds a slot of it, so chunk_concurrency only bounds the fan-out of
+        this channel within the run limit.
+        Results are served from the summary cache when the same messages were
+        already summarized with the same model and prompt.
+        """
         if not messages:
             return {
                 "content": "No messages to summarize for this period.",
                 "metadata": {},
             }
 
-        # Prepare messages text
-        formatted_messages = "\n".join(
-            [f"- {msg.get('text', '')}" for msg in messages if msg.get("text")]
+        token_config = config.get("token_budget") or {}
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(
+                self.model,
+                template,
+                chunk_template,
+                combine_template,
+                channel_name,
+                time_period,
+                self.get_length_guideline(config.get("length", "medium")),
+                config.get("chunk_tokens", DEFAULT_CHUNK_TOKENS),
+                config.get("preprocessing"),
+                config.get("message_format") or DEFAULT_MESSAGE_FORMAT,
+                {k: v for k, v in token_config.items() if k != "per_run"},
+                messages=messages,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                # Timings and per-call stages of the original run never happened
+                metadata = {
+                    k: v
+                    for k, v in cached["metadata"].items()
+                    if k not in ("ttft", "prompt_build_time", "stages")
+                }
+                metadata.update(
+                    {
+                        "cached": True,
+                        "latency": 0.0,
+                        "input_tokens": 0,
+                        "output_tokens": 0,
+                        "estimated_input_tokens": 0,
+                        "retries": 0,
+                    }
+                )
+                return {"content": cached["content"], "metadata": metadata}
+
+        # Preprocessing, budgeting and prompt construction, before any LLM call
+        build_start = time.perf_counter()
+        lines, preprocessing = self._prepare_lines(messages, config)
+        if not lines and preprocessing is not None:
+            return _nothing_left(preprocessing)
+
+        length_guideline = self.get_length_guideline(config.get("length", "medium"))
+        legend = message_format_legend(config.get("message_format"))
+
+        # Pre-flight: trim messages to the per-channel and remaining run budget
+        trimming = None
+        limits = []
+        if token_config.get("per_channel"):
+            limits.append(int(token_config["per_channel"]))
+        if budget is not None:
+            limits.append(budget.remaining)
+        if limits:
+            overhead = self.count_tokens(
+                self.build_prompt(
+                    template,
+                    channel_name,
+                    time_period,
+                    length_guideline,
+                    "",
+                    legend=legend,
+                )
+            )
+            max_tokens = min(limits) - overhead
+            if max_tokens <= 0:
+                raise SummarizationError(
+                    "Token budget exhausted; no messages fit into the prompt."
+                )
+            selected = fit_to_budget(
+                lines,
+                max_tokens,
+                self.count_tokens,
+                token_config.get("strategy", "newest"),
+            )
+            if not selected:
+                raise SummarizationError(
+                    "Token budget too small for even a single message."
+                )
+            if len(selected) < len(lines):
+                trimming = {
+                    "limit": min(limits),
+                    "trimmed_messages": len(lines) - len(selected),
+                    # Trimmed by what is left of the run budget, which depends
+                    # on the other channels of this run
+                    "run_limited": budget is not None
+                    and min(limits) == budget.remaining,
+                }
+            lines = selected
+            if budget is not None:
+                budget.consume(
+                    overhead + sum(self.count_tokens(line) for line in lines)
+                )
+
+        chunk_tokens = int(config.get("chunk_tokens", DEFAULT_CHUNK_TOKENS))
+        chunks = list(chunk_lines(lines, chunk_tokens))
+
+        start_time = time.time()
+        stages: List[Dict[str, Any]] = []
+
+        first_token_at: List[float] = []
+        relay: Optional[Callable[[str], None]] = None
+        if on_text is not None:
+            callback = on_text
+
+            def relay_text(text: str) -> None:
+                if not first_token_at:
+                    first_token_at.append(time.time())
+                callback(text)
+
+            relay = relay_text
+
+        if len(chunks) <= 1:
+            prompt = self.build_prompt(
+                template=template,
+                channel_name=channel_name,
+                time_period=time_period,
+                summary_length_guideline=length_guideline,
+                messages=lines,
+                legend=legend,
+            )
+            prompt_build_time = time.perf_counter() - build_start
+            outputs, model = await self._run_stage(
+                "single", [prompt], stages, run_limit=limit, on_text=relay
+            )
+            content = outputs[0]
+        else:
+            chunk_limit = asyncio.Semaphore(
+                max(1, int(config.get("chunk_concurrency", 4)))
+            )
+
+            # Map: summarize every chunk independently
+            prompts = [
+                self.build_prompt(
+                    template=chunk_template or DEFAULT_CHUNK_TEMPLATE,
+                    channel_name=channel_name,
+                    time_period=time_period,
+                    summary_length_guideline=PARTIAL_GUIDELINE,
+                    messages=chunk,
+                    legend=legend,
+                )
+                for chunk in chunks
+            ]
+            prompt_build_time = time.perf_counter() - build_start
+            partials, model = await self._run_stage(
+                "map", prompts, stages, chunk_limit, run_limit=limit
+            )
+
+            # Reduce: combine partial summaries until they fit a single call
+            level = 1
+            while True:
+                groups = list(chunk_lines(partials, chunk_tokens))
+                # Stop when everything fits, or when oversized partials can no
+                # longer be grouped any further
+                final = len(groups) == 1 or len(groups) >= len(partials)
+                if final:
+                    groups = [partials]
+                prompts = [
+                    self.build_prompt(
+                        template=combine_template or DEFAULT_COMBINE_TEMPLATE,
+                        channel_name=channel_name,
+                        time_period=time_period,
+                        summary_length_guideline=(
+                            length_guideline if final else PARTIAL_GUIDELINE
+                        ),
+                        messages=group,
+                        separator="\n\n",
+                    )
+                    for group in groups
+                ]
+                stage = "reduce" if final else f"reduce-{level}"
+                partials, model = await self._run_stage(
+                    stage,
+                    prompts,
+                    stages,
+                    chunk_limit,
+                    run_limit=limit,
+                    on_text=relay if final else None,
+                )
+                if final:
+                    break
+                level += 1
+            content = partials[0]
+
+        end_time = time.time()
+
+        metadata = {
+            "model": model,
+            "latency": round(end_time - start_time, 2),
+            "input_tokens": sum(s["input_tokens"] for s in stages),
+            "output_tokens": sum(s["output_tokens"] for s in stages),
+            "estimated_input_tokens": sum(s["estimated_input_tokens"] for s in stages),
+            "retries": sum(s["retries"] for s in stages),
+            "chunks": len(chunks),
+            "stages": stages,
+            "prompt_build_time": round(prompt_build_time, 4),
+        }
+        if first_token_at:
+            # Time until the first token of the final summary was shown
+            metadata["ttft"] = round(first_token_at[0] - start_time, 2)
+        if preprocessing is not None:
+            metadata["preprocessing"] = preprocessing
+        if trimming is not None:
+            metadata["trimming"] = trimming
+
+        result = {"content": content, "metadata": metadata}
+        run_limited = trimming is not None and trimming["run_limited"]
+        if self.cache is not None and cache_key is not None and not run_limited:
+            self.cache.put(cache_key, result)
+        return result
+
+    async def summarize_digest(
+        self,
+        channels: List[Tuple[str, str, List[MessageRecord]]],
+        config: Dict[str, Any],
+        template: Optional[str] = None,
+        budget: Optional[TokenBudget] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Summarize several low-volume channels, given as (name, time period,
+        messages), in a single LLM call. The model answers with one marked
+        section per channel, which is split back into per-channel results.
+        A channel whose section is missing from the answer gets None.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(channels)
+        blocks: List[str] = []
+        message_count = 0
+        packed: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+        for i, (name, time_period, messages) in enumerate(channels):
+            lines, preprocessing = self._prepare_lines(messages, config)
+            if not lines:
+                results[i] = _nothing_left(preprocessing)
+                continue
+            packed.append((i, preprocessing))
+            message_count += len(lines)
+            blocks.append(
+                f"### [{len(packed)}] {name} ({time_period})\n" + "\n".join(lines)
+            )
+        if not packed:
+            return results
+
+        prompt = self.build_prompt(
+            template=template or DEFAULT_DIGEST_TEMPLATE,
+            channel_name=", ".join(channels[i][0] for i, _ in packed),
+            time_period="given per channel",
+            summary_length_guideline=self.get_length_guideline(
+                config.get("length", "medium")
+            ),
+            messages=blocks,
+            message_count=message_count,
+            separator="\n\n",
+            legend=message_format_legend(config.get("message_format")),
         )
+        if budget is not None:
+            estimated = self.count_tokens(prompt)
+            if estimated > budget.remaining:
+                raise SummarizationError(
+                    "Token budget exhausted; the digest does not fit into the prompt."
+                )
+            budget.consume(estimated)
+
+        start_time = time.time()
+        stages: List[Dict[str, Any]] = []
+        outputs, model = await self._run_stage("digest", [prompt], stages)
+        end_time = time.time()
+
+        sections = parse_digest(outputs[0])
+        stage = stages[0]
+        for number, (i, preprocessing) in enumerate(packed, 1):
+            if number not in sections:
+                continue
+            # Usage is that of the one shared call
+            metadata = {
+                "model": model,
+                "latency": round(end_time - start_time, 2),
+                "input_tokens": stage["input_tokens"],
+                "output_tokens": stage["output_tokens"],
+                "estimated_input_tokens": stage["estimated_input_tokens"],
+                "retries": stage["retries"],
+                "digest": len(packed),
+            }
+            if preprocessing is not None:
+                metadata["preprocessing"] = preprocessing
+            results[i] = {"content": sections[number], "metadata": metadata}
+        return results
+
+    async def ask(
+        self,
+        question: str,
+        messages: List[MessageRecord],
+        channel_name: str,
+        time_period: str,
+        config: Dict[str, Any],
+        template: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Answer a question from the messages most relevant to it, given best
+        match first. The most relevant messages that fit max_tokens are sent
+        in chronological order in a single call, instead of the whole window.
+        """
+        if not messages:
+            return {
+                "content": "No stored messages match this question.",
+                "metadata": {},
+            }
 
+        build_start = time.perf_counter()
+        template = template or DEFAULT_ASK_TEMPLATE
         length_guideline = self.get_length_guideline(config.get("length", "medium"))
+        selected = [msg for msg in messages if msg.text]
+        format_message = MessageFormatter(config, selected)
+        legend = message_format_legend(config.get("message_format"))
+        if max_tokens:
+            overhead = self.count_tokens(
+                self.build_prompt(
+                    template,
+                    channel_name,
+                    time_period,
+                    length_guideline,
+                    "",
+                    question,
+                    legend=legend,
+                )
+            )
+            used = overhead
+            kept = []
+            for msg in selected:
+                tokens = self.count_tokens(format_message(msg))
+                if used + tokens > max_tokens:
+                    break
+                used += tokens
+                kept.append(msg)
+            selected = kept
+            if not selected:
+                raise SummarizationError(
+                    "Token budget too small for even a single message."
+                )
+        selected.sort(key=lambda msg: (msg.date, msg.id))
 
         prompt = self.build_prompt(
             template=template,
             channel_name=channel_name,
             time_period=time_period,
             summary_length_guideline=length_guideline,
-            messages=formatted_messages,
+            messages=[format_message(msg) for msg in selected],
+            question=question,
+            legend=legend,
         )
+        prompt_build_time = time.perf_counter() - build_start
 
         start_time = time.time()
-        try:
+        stages: List[Dict[str, Any]] = []
+        outputs, model = await self._run_stage("ask", [prompt], stages)
+        end_time = time.time()
+
+        stage = stages[0]
+        metadata = {
+            "model": model,
+            "latency": round(end_time - start_time, 2),
+            "input_tokens": stage["input_tokens"],
+            "output_tokens": stage["output_tokens"],
+            "estimated_input_tokens": stage["estimated_input_tokens"],
+            "retries": stage["retries"],
+            "prompt_build_time": round(prompt_build_time, 4),
+            "retrieval": {"candidates": len(messages), "selected": len(selected)},
+        }
+        return {"content": outputs[0], "metadata": metadata}
+
+    def _prepare_lines(
+        self, messages: List[MessageRecord], config: Dict[str, Any]
+    ) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """
+        Format messages as prompt lines, running the preprocessing stage when
+        enabled. Returns the lines and the preprocessing report, if any.
+        """
+        format_message = MessageFormatter(config, messages)
+        # Media-only messages never reach the prompt, preprocessed or not
+        with_text = [msg for msg in messages if msg.text]
+        lines = [format_message(msg) for msg in with_text]
+
+        prep_config = config.get("preprocessing") or {}
+        if not prep_config.get("enabled"):
+            return lines, None
+
+        tokens_before = sum(estimate_tokens(line) for line in lines)
+        kept, dropped = preprocess_messages(with_text, prep_config)
+        lines = [format_message(msg) for msg in kept]
+        return lines, {
+            "input_messages": len(with_text),
+            "kept_messages": len(kept),
+            "dropped": dropped,
+            "tokens_saved": tokens_before
+            - sum(estimate_tokens(line) for line in lines),
+        }
+
+    async def _run_stage(
+        self,
+        name: str,
+        prompts: List[str],
+        stages: List[Dict[str, Any]],
+        limit: Optional[asyncio.Semaphore] = None,
+        run_limit: Optional[asyncio.Semaphore] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[List[str], str]:
+        """
+        Run one summarization stage concurrently and record its usage.
+        limit bounds the calls of this summary, run_limit the calls of the
+        whole run; a call takes its run slot only once it may start.
+        on_text streams the output of a single-call stage.
+        """
+        if len(prompts) > 1:
+            on_text = None
+
+        async def complete(prompt: str) -> Dict[str, Any]:
+            if run_limit is None:
+                return await self._complete(prompt, on_text)
+            async with run_limit:
+                return await self._complete(prompt, on_text)
+
+        async def run(prompt: str) -> Dict[str, Any]:
+            if limit is None:
+                return await complete(prompt)
+            async with limit:
+                return await complete(prompt)
+
+        start_time = time.time()
+        results = await asyncio.gather(*(run(p) for p in prompts))
+        end_time = time.time()
+
+        stages.append(
+            {
+                "stage": name,
+                "calls": len(results),
+                "input_tokens": sum(r["input_tokens"] for r in results),
+                "output_tokens": sum(r["output_tokens"] for r in results),
+                "estimated_input_tokens": sum(r["estimated_tokens"] for r in results),
+                "retries": sum(r["retries"] for r in results),
+                "latency": round(end_time - start_time, 2),
+            }
+        )
+        return [r["content"] for r in results], results[-1]["model"]
+
+    async def _complete(
+        self, prompt: str, on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a single prompt to the LLM through the scheduler and return
+        content with usage. Rate-limit retries are left to the scheduler.
+        With on_text, the completion is streamed.
+        """
+        estimated = self.count_tokens(prompt)
+
+        async def call() -> Tuple[str, str, Any]:
+            if on_text is not None:
+                return await self._stream(prompt, on_text)
             response = await litellm.acompletion(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
-                num_retries=5,
+                num_retries=0,
+            )
+            return (
+                response.choices[0].message.content,
+                response.model,
+                getattr(response, "usage", None),
+            )
+
+        try:
+            (content, model, usage), retries = await self.scheduler.run(
+                call, tokens=estimated
             )
         except litellm.exceptions.ServiceUnavailableError as e:
             raise SummarizationError(
@@ -106,17 +1017,44 @@ class Summarizer:
             ) from e
         except Exception as e:
             raise SummarizationError(f"AI Summarization failed: {str(e)}") from e
-            
-        end_time = time.time()
 
-        content = response.choices[0].message.content
-        usage = getattr(response, "usage", None)
-
-        metadata = {
-            "model": response.model,
-            "latency": round(end_time - start_time, 2),
-            "input_tokens": getattr(usage, "prompt_tokens", 0) if usage else 0,
-            "output_tokens": getattr(usage, "completion_tokens", 0) if usage else 0,
+        input_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
+        output_tokens = getattr(usage, "completion_tokens", 0) if usage else 0
+        self.scheduler.record_usage(estimated, input_tokens + output_tokens)
+        return {
+            "content": content,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "estimated_tokens": estimated,
+            "retries": retries,
         }
 
-        return {"content": content, "metadata": metadata}
+    async def _stream(
+        self, prompt: str, on_text: Callable[[str], None]
+    ) -> Tuple[str, str, Any]:
+        """
+        Stream a completion, passing the text received so far to on_text.
+        A retried stream starts over, so on_text always sees a consistent text.
+        """
+        response = await litellm.acompletion(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            num_retries=0,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        text = ""
+        model = self.model
+        usage = None
+        async for chunk in response:
+            model = getattr(chunk, "model", None) or model
+            # Usage arrives with the last chunk
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                text += delta
+                on_text(text)
+        return text, model, usage
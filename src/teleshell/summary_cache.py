@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from teleshell.models import MessageRecord
+
+
+def make_cache_key(*parts: Any, messages: Iterable[MessageRecord] = ()) -> str:
+    """Content-addressed key over prompt inputs and the (id, text) of each message."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    for msg in messages:
+        digest.update(f"{msg.id}\0{msg.text}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """On-disk cache of summary results with size- and age-based eviction."""
+
+    def __init__(
+        self,
+        base_dir: Optional[Path] = None,
+        max_entries: int = 500,
+        max_age_days: float = 7,
+    ) -> None:
+        if not base_dir:
+            base_dir = Path.home() / ".teleshell"
+        self.cache_dir = base_dir / "summary_cache"
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result atomically and evict old entries."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the oldest ones beyond max_entries."""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
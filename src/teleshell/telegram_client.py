@@ -1,7 +1,30 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
-from telethon import TelegramClient, functions
-from telethon.tl.types import Message, DialogFilter
+from typing import List, Dict, Any, Optional, Union, AsyncIterator, Awaitable, Callable
+from telethon import TelegramClient, errors, events, functions, utils
+from telethon.tl.types import (
+    DialogFilter,
+    Message,
+    MessageFwdHeader,
+    MessageReplyHeader,
+)
+from teleshell.entity_cache import EntityCache
+from teleshell.message_store import MessageStore, to_timestamp
+from teleshell.models import MessageRecord
+
+# Number of fetched messages written to the message store per transaction
+STORE_BATCH_SIZE = 200
+
+# Errors after which a cached entity of a channel must not be used again
+STALE_ENTITY_ERRORS = (
+    errors.ChannelPrivateError,
+    errors.ChannelInvalidError,
+    errors.UsernameInvalidError,
+    errors.UsernameNotOccupiedError,
+)
 
 
 class TelegramClientWrapper:
@@ -13,9 +36,21 @@ class TelegramClientWrapper:
         api_hash: str,
         session_name: str = "telegram",
         base_dir: Optional[Path] = None,
+        idle_timeout: Optional[float] = 300.0,
+        reconnect_attempts: int = 3,
+        reconnect_delay: float = 1.0,
+        message_store: Optional[MessageStore] = None,
+        entity_cache: Optional[EntityCache] = None,
     ) -> None:
         self.api_id = api_id
         self.api_hash = api_hash
+        self.idle_timeout = idle_timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.message_store = message_store
+        self.entity_cache = entity_cache
+        # Seconds spent resolving each target to an input peer
+        self.resolve_times: Dict[str, float] = {}
 
         if not base_dir:
             base_dir = Path.home() / ".teleshell"
@@ -25,34 +60,123 @@ class TelegramClientWrapper:
 
         self.client = TelegramClient(str(session_path), api_id, api_hash)
 
-    async def fetch_dialogs(self) -> List[Dict[str, Any]]:
-        """Fetch all channels and megagroups the user is subscribed to."""
+        # Long-lived connection state (see open()/close())
+        self._persistent = False
+        self._in_flight = 0
+        self._last_used = 0.0
+        self._connect_lock = asyncio.Lock()
+        self._idle_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "TelegramClientWrapper":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Keep one connection open across fetch calls until close() is called.
+        An idle connection is dropped after idle_timeout seconds and
+        transparently re-established on the next call.
+        """
+        self._persistent = True
+        self._last_used = time.monotonic()
+        await self._ensure_connected()
+        if self.idle_timeout and self._idle_task is None:
+            self._idle_task = asyncio.create_task(self._idle_watchdog())
+
+    async def close(self) -> None:
+        """Close the long-lived connection opened by open()."""
+        self._persistent = False
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            self._idle_task = None
+        if self.client.is_connected():
+            await self.client.disconnect()
+
+    async def _ensure_connected(self) -> None:
+        """Connect if needed, retrying with exponential backoff."""
+        async with self._connect_lock:
+            if self.client.is_connected():
+                return
+            for attempt in range(self.reconnect_attempts):
+                try:
+                    await self.client.connect()
+                    return
+                except (OSError, ConnectionError):
+                    if attempt == self.reconnect_attempts - 1:
+                        raise
+                    await asyncio.sleep(self.reconnect_delay * 2**attempt)
+
+    async def _idle_watchdog(self) -> None:
+        """Disconnect the long-lived connection once it has been idle too long."""
+        assert self.idle_timeout
+        while self._persistent:
+            await asyncio.sleep(self.idle_timeout / 2)
+            idle_for = time.monotonic() - self._last_used
+            if (
+                not self._in_flight
+                and idle_for >= self.idle_timeout
+                and self.client.is_connected()
+            ):
+                await self.client.disconnect()
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[TelegramClient]:
+        """
+        Yield a connected client. Reuses the long-lived connection when open,
+        otherwise connects and disconnects around the call.
+        """
+        if not self._persistent:
+            async with self.client:
+                yield self.client
+            return
+
+        await self._ensure_connected()
+        self._in_flight += 1
+        try:
+            yield self.client
+        finally:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    async def fetch_dialogs(
+        self, since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch all channels and megagroups the user is subscribed to.
+        With since, only dialogs with activity at or after that date are
+        fetched; Telegram returns dialogs newest-first, so iteration stops at
+        the first (non-pinned) dialog older than since.
+        """
         dialogs = []
-        async with self.client:
-            # Get all dialogs (channels, groups, users)
-            all_dialogs = await self.client.get_dialogs()
-            for d in all_dialogs:
-                # Filter for channels and megagroups
-                if d.is_channel or d.is_group:
-                    dialogs.append(
-                        {
-                            "id": d.id,
-                            "title": d.name,
-                            "handle": getattr(d.entity, "username", None),
-                            "folder_id": getattr(d.dialog, "folder_id", 0),
-                            "is_channel": d.is_channel,
-                            "is_group": d.is_group,
-                        }
-                    )
+        async with self._connection():
+            if since is None:
+                # Get all dialogs (channels, groups, users)
+                all_dialogs = await self.client.get_dialogs()
+                for d in all_dialogs:
+                    # Filter for channels and megagroups
+                    if d.is_channel or d.is_group:
+                        dialogs.append(self._to_dialog_record(d))
+            else:
+                async for d in self.client.iter_dialogs():
+                    # Pinned dialogs come first regardless of their date
+                    if not d.pinned and d.date is not None and d.date < since:
+                        break
+                    if d.is_channel or d.is_group:
+                        dialogs.append(self._to_dialog_record(d))
         return dialogs
 
     async def fetch_folders(self) -> Dict[int, str]:
         """Fetch custom Telegram folders (filters) and their IDs."""
         folders = {0: "Main"}  # Default folder
-        async with self.client:
+        async with self._connection():
             # Fetch user-defined folders (filters)
             try:
-                filters = await self.client(functions.messages.GetDialogFiltersRequest())
+                filters = await self.client(
+                    functions.messages.GetDialogFiltersRequest()
+                )
                 for f in filters:
                     # Use attribute checking for robustness and testability
                     if hasattr(f, "id") and hasattr(f, "title"):
@@ -69,24 +193,16 @@ class TelegramClientWrapper:
         limit: Optional[int] = 1000,
         offset_id: int = 0,
         offset_date: Optional[Any] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> List[MessageRecord]:
         """
         Fetch messages from a specific Telegram channel.
         If offset_date is provided, fetches messages AFTER that date (newer).
         If offset_id is provided, fetches messages AFTER that ID.
         """
-        # Resolve numeric IDs passed as strings
-        target = channel
-        if isinstance(channel, str):
-            # Check for digits or negative numbers (IDs)
-            if channel.isdigit() or (channel.startswith("-") and channel[1:].isdigit()):
-                try:
-                    target = int(channel)
-                except ValueError:
-                    pass
+        target = self._parse_target(channel)
 
         messages_data = []
-        async with self.client:
+        async with self._connection():
             kwargs = {
                 "limit": limit,
             }
@@ -98,7 +214,11 @@ class TelegramClientWrapper:
                 kwargs["reverse"] = True
 
             try:
-                messages = await self.client.get_messages(target, **kwargs)
+                entity = await self._resolve(target)
+                messages = await self.client.get_messages(entity, **kwargs)
+            except STALE_ENTITY_ERRORS:
+                self._forget(target)
+                raise
             except ValueError:
                 # If target is ID and not found, try to resolve entity first
                 # This helps with small groups or old cached IDs
@@ -111,19 +231,259 @@ class TelegramClientWrapper:
 
             for msg in messages:
                 if isinstance(msg, Message):
-                    messages_data.append(
-                        {
-                            "id": msg.id,
-                            "text": msg.text or "",
-                            "date": msg.date,
-                            "sender_id": msg.sender_id,
-                        }
-                    )
+                    messages_data.append(self._to_record(msg))
+
+        if self.message_store is not None:
+            # Searchable locally, without extending the synced range
+            self.message_store.store_messages(str(channel), messages_data)
 
         # Sort newest first
-        messages_data.sort(key=lambda x: x["id"], reverse=True)
+        messages_data.sort(key=lambda x: x.id, reverse=True)
         return messages_data
 
+    async def iter_messages(
+        self,
+        channel: Union[str, int],
+        limit: Optional[int] = None,
+        offset_id: int = 0,
+        offset_date: Optional[Any] = None,
+    ) -> AsyncIterator[MessageRecord]:
+        """
+        Stream messages from a Telegram channel in ascending ID order (oldest
+        first) as they arrive, without building the whole list in memory.
+        If offset_id is provided, yields messages AFTER that ID; otherwise if
+        offset_date is provided, yields messages AFTER that date.
+        A limit of None streams the whole window.
+
+        With a message store, the already-synced part of the window is served
+        locally and only messages above the stored high-water mark are
+        requested from Telegram.
+        """
+        target = self._parse_target(channel)
+        store = self.message_store
+        if store is None:
+            async for record in self._iter_remote(
+                target, limit, offset_id, offset_date
+            ):
+                yield record
+            return
+
+        key = str(channel)
+        high_id = store.covered_high_id(key, offset_id, offset_date)
+        count = 0
+        since_ts = None
+        if high_id is not None:
+            # Only the synced range is complete; remote fetching resumes above it
+            for record in store.iter_messages(
+                key, offset_id, offset_date, limit, until_id=high_id
+            ):
+                count += 1
+                yield record
+            if limit and count >= limit:
+                return
+            # Continue from the high-water mark; offset_id takes precedence over
+            # offset_date in Telegram, so the date filter is applied locally
+            if offset_id <= 0 and offset_date:
+                since_ts = to_timestamp(offset_date)
+            offset_id, offset_date = high_id, None
+
+        extend = high_id is not None
+        batch: List[MessageRecord] = []
+        try:
+            async for record in self._iter_remote(
+                target, limit - count if limit else None, offset_id, offset_date
+            ):
+                batch.append(record)
+                if len(batch) >= STORE_BATCH_SIZE:
+                    store.record_sync(key, batch, extend, offset_date)
+                    extend = True
+                    batch = []
+                if since_ts is None or to_timestamp(record.date) >= since_ts:
+                    yield record
+        finally:
+            store.record_sync(key, batch, extend, offset_date)
+
+    async def _iter_remote(
+        self,
+        target: Union[str, int],
+        limit: Optional[int],
+        offset_id: int,
+        offset_date: Optional[Any],
+    ) -> AsyncIterator[MessageRecord]:
+        """Stream message records from Telegram in ascending ID order."""
+        kwargs: Dict[str, Any] = {"limit": limit, "reverse": True}
+        if offset_id > 0:
+            kwargs["min_id"] = offset_id
+        elif offset_date:
+            kwargs["offset_date"] = offset_date
+
+        async with self._connection():
+            yielded = False
+            try:
+                entity = await self._resolve(target)
+                async for msg in self.client.iter_messages(entity, **kwargs):
+                    if isinstance(msg, Message):
+                        yielded = True
+                        yield self._to_record(msg)
+            except STALE_ENTITY_ERRORS:
+                self._forget(target)
+                raise
+            except ValueError:
+                # If target is ID and not found, try to resolve entity first
+                # This helps with small groups or old cached IDs
+                if yielded:
+                    raise
+                entity = await self.client.get_input_entity(target)
+                async for msg in self.client.iter_messages(entity, **kwargs):
+                    if isinstance(msg, Message):
+                        yield self._to_record(msg)
+
+    async def _resolve(self, target: Union[str, int]) -> Any:
+        """
+        Resolve a handle to an input peer, using the entity cache, if any,
+        before any network lookup. Resolution is timed either way. Numeric
+        IDs are resolved by Telethon from its session.
+        """
+        if isinstance(target, int):
+            return target
+        start = time.perf_counter()
+        cache = self.entity_cache
+        peer = cache.get(target) if cache is not None else None
+        if peer is None:
+            peer = await self.client.get_input_entity(target)
+            if cache is not None:
+                cache.put(target, peer)
+        self.resolve_times[target] = (
+            self.resolve_times.get(target, 0.0) + time.perf_counter() - start
+        )
+        return peer
+
+    def resolve_time(self, channel: Union[str, int]) -> float:
+        """Seconds spent resolving a channel's entity so far."""
+        return self.resolve_times.get(str(self._parse_target(channel)), 0.0)
+
+    def _forget(self, target: Union[str, int]) -> None:
+        """Drop a cached entity that Telegram rejected."""
+        if self.entity_cache is not None:
+            self.entity_cache.invalidate(target)
+
+    @staticmethod
+    def _parse_target(channel: Union[str, int]) -> Union[str, int]:
+        """Resolve numeric IDs passed as strings."""
+        if isinstance(channel, str):
+            # Check for digits or negative numbers (IDs)
+            if channel.isdigit() or (channel.startswith("-") and channel[1:].isdigit()):
+                try:
+                    return int(channel)
+                except ValueError:
+                    pass
+        return channel
+
+    @staticmethod
+    def _to_dialog_record(dialog: Any) -> Dict[str, Any]:
+        """Convert a Telethon dialog into a compact dialog record."""
+        return {
+            "id": dialog.id,
+            "title": dialog.name,
+            "handle": getattr(dialog.entity, "username", None),
+            "folder_id": getattr(dialog.dialog, "folder_id", 0),
+            "is_channel": dialog.is_channel,
+            "is_group": dialog.is_group,
+            "date": dialog.date,
+        }
+
+    @staticmethod
+    def _to_record(msg: Message) -> MessageRecord:
+        """Convert a Telethon message into a compact message record."""
+        return MessageRecord(
+            msg.id,
+            msg.text or "",
+            msg.date,
+            msg.sender_id,
+            TelegramClientWrapper._forward_key(msg),
+            TelegramClientWrapper._reply_to(msg),
+        )
+
+    @staticmethod
+    def _reply_to(msg: Message) -> Optional[int]:
+        """ID of the message that a message replies to, if any."""
+        reply = getattr(msg, "reply_to", None)
+        if not isinstance(reply, MessageReplyHeader):
+            return None
+        return reply.reply_to_msg_id
+
+    @staticmethod
+    def _forward_key(msg: Message) -> Optional[str]:
+        """Identify the original post of a forwarded message, if any."""
+        fwd = getattr(msg, "fwd_from", None)
+        if not isinstance(fwd, MessageFwdHeader):
+            return None
+        if fwd.from_id is not None:
+            origin = str(utils.get_peer_id(fwd.from_id))
+        elif fwd.from_name:
+            origin = fwd.from_name
+        else:
+            return None
+        if fwd.channel_post:
+            return f"{origin}:{fwd.channel_post}"
+        return f"{origin}@{int(fwd.date.timestamp())}"
+
+    async def subscribe_new_messages(
+        self,
+        channels: List[str],
+        callback: Callable[[str, MessageRecord], Awaitable[None]],
+    ) -> Dict[str, str]:
+        """
+        Push new messages of the given channels to callback(channel, record)
+        as Telegram delivers them. Updates are processed while
+        run_until_disconnected() is running.
+        Returns the channels that could not be resolved, with the error;
+        the others are still subscribed.
+        """
+        peers: Dict[int, str] = {}
+        skipped: Dict[str, str] = {}
+        async with self._connection():
+            for channel in channels:
+                target = self._parse_target(channel)
+                try:
+                    entity = await self._resolve(target)
+                    peer_id = await self.client.get_peer_id(entity)
+                except STALE_ENTITY_ERRORS as e:
+                    self._forget(target)
+                    skipped[channel] = str(e)
+                    continue
+                except (ValueError, errors.RPCError) as e:
+                    skipped[channel] = str(e)
+                    continue
+                peers[peer_id] = channel
+
+        async def on_new_message(event: Any) -> None:
+            channel = peers.get(event.chat_id)
+            if channel is not None and isinstance(event.message, Message):
+                await callback(channel, self._to_record(event.message))
+
+        if peers:
+            self.client.add_event_handler(
+                on_new_message, events.NewMessage(chats=list(peers))
+            )
+        return skipped
+
+    async def run_until_disconnected(
+        self, on_reconnect: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Receive updates until close() is called, reconnecting on drops.
+        on_reconnect is called after every reconnection, since updates sent
+        while disconnected are not delivered.
+        """
+        connected = False
+        while self._persistent:
+            async with self._connection():
+                if connected and on_reconnect is not None:
+                    on_reconnect()
+                connected = True
+                await self.client.run_until_disconnected()
+
     async def start(self) -> None:
         """Start the client and handle interactive login if necessary."""
         await self.client.start()
@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# `{{name}}` placeholders; whitespace inside the braces is allowed
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Placeholders filled by Summarizer.build_prompt
+PROMPT_PLACEHOLDERS = frozenset(
+    {
+        "channel_name",
+        "time_period",
+        "summary_length_guideline",
+        "messages",
+        "message_count",
+        "question",
+    }
+)
+
+# Placeholders of the per-message format, `summary_config.message_format`
+MESSAGE_PLACEHOLDERS = frozenset({"text", "id", "time", "sender", "reply"})
+
+DEFAULT_MESSAGE_FORMAT = "- {{text}}"
+
+# Named message formats accepted in place of a template
+MESSAGE_FORMATS = {
+    "plain": DEFAULT_MESSAGE_FORMAT,
+    # e.g. "+3h05 B >A: text": time since the first message, sender alias,
+    # and the alias of the sender replied to
+    "compact": "{{time}} {{sender}}{{reply}}: {{text}}",
+}
+
+# How the terse message placeholders read, for the legend line of a prompt
+MESSAGE_LEGEND = {
+    "time": "`+3h05` is the time since the first message",
+    "sender": "`B` is an alias of the sender",
+    "reply": "`>A` marks a reply to sender `A` (`>?`: to an earlier message)",
+}
+
+# A placeholder value; a sequence of lines is joined while rendering
+Value = Union[str, Sequence[str]]
+
+
+class TemplateError(ValueError):
+    """A prompt or message template uses a placeholder that is never filled."""
+
+    pass
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal text and placeholders, so rendering
+    is a single join over its segments instead of a string copy per
+    placeholder.
+    """
+
+    __slots__ = ("literals", "names")
+
+    def __init__(self, template: str) -> None:
+        parts = PLACEHOLDER_PATTERN.split(template)
+        # Literals and names alternate: literals[i] precedes names[i]
+        self.literals: Tuple[str, ...] = tuple(parts[0::2])
+        self.names: Tuple[str, ...] = tuple(parts[1::2])
+
+    @property
+    def placeholders(self) -> FrozenSet[str]:
+        """Names of the placeholders used by the template."""
+        return frozenset(self.names)
+
+    def render(
+        self, values: Mapping[str, Value], separator: str = "\n", suffix: str = ""
+    ) -> str:
+        """
+        Fill the placeholders in one pass. Missing values render empty; a
+        sequence value is joined with separator as part of the same join.
+        """
+        out: List[str] = []
+        for literal, name in zip(self.literals, self.names):
+            out.append(literal)
+            value = values.get(name, "")
+            if isinstance(value, str):
+                out.append(value)
+            elif value:
+                out.append(value[0])
+                for line in value[1:]:
+                    out.append(separator)
+                    out.append(line)
+        out.append(self.literals[-1])
+        out.append(suffix)
+        return "".join(out)
+
+
+@lru_cache(maxsize=64)
+def compile_template(template: str) -> CompiledTemplate:
+    """Compiled form of a template, parsed once per distinct template text."""
+    return CompiledTemplate(template)
+
+
+def message_format_legend(message_format: Optional[str]) -> str:
+    """
+    A line explaining the compact placeholders used by a message format,
+    given by name or as a template; empty when it uses none of them.
+    """
+    message_format = message_format or DEFAULT_MESSAGE_FORMAT
+    message_format = MESSAGE_FORMATS.get(message_format, message_format)
+    names = compile_template(message_format).placeholders
+    parts = [text for name, text in MESSAGE_LEGEND.items() if name in names]
+    if not parts:
+        return ""
+    return "Message lines: " + "; ".join(parts) + "."
+
+
+def validate_templates(config: Dict[str, Any]) -> None:
+    """
+    Check the placeholders of the configured prompt templates and message
+    format, raising TemplateError for any name that would never be filled.
+    """
+    checks = [
+        (f"prompt_templates.{name}", template, PROMPT_PLACEHOLDERS)
+        for name, template in (config.get("prompt_templates") or {}).items()
+    ]
+    message_format = (config.get("summary_config") or {}).get("message_format")
+    if message_format is not None and not (
+        isinstance(message_format, str) and message_format in MESSAGE_FORMATS
+    ):
+        checks.append(
+            ("summary_config.message_format", message_format, MESSAGE_PLACEHOLDERS)
+        )
+
+    for key, template, allowed in checks:
+        if not isinstance(template, str):
+            raise TemplateError(f"{key} must be a string.")
+        unknown = compile_template(template).placeholders - allowed
+        if unknown:
+            names = ", ".join("{{" + name + "}}" for name in sorted(unknown))
+            raise TemplateError(
+                f"{key} uses unknown placeholder(s) {names}; "
+                f"available: {', '.join(sorted(allowed))}."
+            )
@@ -0,0 +1,31 @@
+from typing import Iterable, List, Set, TypeVar, Union
+
+# Prefixes of public channel links accepted in place of a handle
+LINK_PREFIXES = ("https://t.me/", "http://t.me/", "t.me/")
+
+ChannelRef = TypeVar("ChannelRef", bound=Union[str, int])
+
+
+def normalize_channel(channel: Union[str, int]) -> str:
+    """
+    Canonical identity of a channel reference, so `@Handle`, `handle`,
+    `https://t.me/handle` and a numeric ID (int or str) compare equal.
+    """
+    value = str(channel).strip()
+    for prefix in LINK_PREFIXES:
+        if value.lower().startswith(prefix):
+            value = value[len(prefix) :]
+            break
+    return value.lstrip("@").rstrip("/").lower()
+
+
+def unique_channels(channels: Iterable[ChannelRef]) -> List[ChannelRef]:
+    """Drop repeated references to the same channel, keeping the first spelling."""
+    seen: Set[str] = set()
+    result: List[ChannelRef] = []
+    for channel in channels:
+        key = normalize_channel(channel)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(channel)
+    return result
@@ -0,0 +1,51 @@
+import time
+from typing import Callable, Dict, List, Optional
+from teleshell.models import MessageRecord
+
+
+class WatchBuffer:
+    """
+    Per-channel buffers of newly arrived messages for `tshell watch`.
+    A channel is ready to be summarized once it has buffered max_messages,
+    or once its oldest buffered message has waited max_wait seconds.
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 20,
+        max_wait: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_messages = max(1, max_messages)
+        self.max_wait = max_wait
+        self._clock = clock
+        self._messages: Dict[str, List[MessageRecord]] = {}
+        self._first_seen: Dict[str, float] = {}
+
+    def add(self, channel: str, message: MessageRecord) -> bool:
+        """Buffer a message; return True if the channel reached max_messages."""
+        if channel not in self._messages:
+            self._messages[channel] = []
+            self._first_seen[channel] = self._clock()
+        self._messages[channel].append(message)
+        return len(self._messages[channel]) >= self.max_messages
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Channels whose oldest buffered message has waited at least max_wait."""
+        if now is None:
+            now = self._clock()
+        return [
+            channel
+            for channel, first_seen in self._first_seen.items()
+            if now - first_seen >= self.max_wait
+        ]
+
+    def pop(self, channel: str) -> List[MessageRecord]:
+        """Take all buffered messages of a channel, oldest first."""
+        self._first_seen.pop(channel, None)
+        messages = self._messages.pop(channel, [])
+        messages.sort(key=lambda m: m.id)
+        return messages
+
+    def __len__(self) -> int:
+        return sum(len(m) for m in self._messages.values())
@@ -0,0 +1,64 @@
+from click.testing import CliRunner
+from unittest.mock import patch, AsyncMock
+from teleshell.main import cli
+from teleshell.message_store import MessageStore
+from teleshell.models import MessageRecord
+from datetime import datetime, timedelta, timezone
+
+
+def test_ask_answers_from_relevant_stored_messages(tmp_path):
+    """ask ranks stored messages and sends only the relevant ones to the LLM."""
+    now = datetime.now(timezone.utc)
+    store = MessageStore(tmp_path)
+    store.record_sync(
+        "@news",
+        [
+            MessageRecord(1, "Merger talks with Acme", now - timedelta(days=40)),
+            MessageRecord(2, "Lunch menu for Friday", now - timedelta(days=2)),
+            MessageRecord(3, "The merger was approved", now - timedelta(days=1)),
+        ],
+        extend=False,
+    )
+    store.close()
+
+    with (
+        patch("teleshell.main.ConfigManager") as mock_config_cls,
+        patch("teleshell.telegram_client.TelegramClientWrapper") as mock_tg_cls,
+        patch("teleshell.summarizer.Summarizer") as mock_sum_cls,
+        patch.dict("os.environ", {"GEMINI_API_KEY": "key"}),
+    ):
+        mock_config = mock_config_cls.return_value
+        mock_config.base_dir = tmp_path
+        mock_config.load.return_value = {
+            "default_channels": ["@news"],
+            "channel_titles": {"@news": "News"},
+            "summary_config": {"length": "short"},
+            "prompt_templates": {},
+            "message_cache": True,
+            "ask": {"top_k": 10, "max_tokens": 1000},
+        }
+        mock_sum = mock_sum_cls.return_value
+        mock_sum.ask = AsyncMock(
+            return_value={
+                "content": "The merger was approved yesterday.",
+                "metadata": {
+                    "model": "test-model",
+                    "input_tokens": 20,
+                    "output_tokens": 8,
+                    "retrieval": {"candidates": 1, "selected": 1},
+                },
+            }
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["ask", "what about the merger?", "-t", "30d", "--offline"]
+        )
+
+    assert result.exit_code == 0
+    assert "The merger was approved yesterday." in result.output
+    mock_tg_cls.assert_not_called()
+    question, messages = mock_sum.ask.call_args[0]
+    assert question == "what about the merger?"
+    # The 40 day old message is outside the window; lunch is irrelevant
+    assert [m.id for m in messages] == [3]
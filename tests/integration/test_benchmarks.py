@@ -0,0 +1,41 @@
+from benchmarks.run import bench_message_formats, bench_summarize, compare
+
+
+def test_benchmark_runs_summarize_end_to_end():
+    """The benchmark drives run_summarize against the fake Telegram and LLM."""
+    results = bench_summarize(
+        channels=2,
+        messages=20,
+        page_latency=0,
+        resolve_latency=0,
+        llm_latency=0,
+        llm_rpm=None,
+        trace_memory=True,
+    )
+
+    assert results["llm_calls"] == 2
+    assert results["checkpointed_channels"] == 2
+    assert results["telegram_requests"] == 4
+    assert results["peak_memory_mb"] > 0
+
+
+def test_compare_marks_direction():
+    """Throughput gains and wall-time losses are labelled correctly."""
+    changes = compare(
+        {"wall_time": 2.0, "messages_per_second": 200, "channels": 5},
+        {"wall_time": 1.0, "messages_per_second": 100, "channels": 5},
+    )
+
+    assert changes["wall_time"].endswith("(+100.0%, worse)")
+    assert changes["messages_per_second"].endswith("(+100.0%, better)")
+    assert "channels" not in changes
+
+
+def test_compact_message_format_costs_few_tokens():
+    """Compact context costs a few tokens per message, far fewer than raw IDs."""
+    results = bench_message_formats(messages=50)
+
+    plain = results["tokens_per_message_plain"]
+    compact = results["tokens_per_message_compact"]
+    assert plain < compact < results["tokens_per_message_verbose"]
+    assert compact - plain < 8
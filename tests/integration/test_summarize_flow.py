@@ -1,7 +1,11 @@
+import asyncio
+import json
 import pytest
 from click.testing import CliRunner
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from teleshell.main import cli
+from teleshell.models import MessageRecord
+from teleshell.summarizer import SummarizationError
 from datetime import datetime
 
 
@@ -10,8 +14,8 @@ def mock_infrastructure():
     """Fixture to mock both Telegram and AI components."""
     with (
         patch("teleshell.main.ConfigManager") as mock_config_cls,
-        patch("teleshell.main.TelegramClientWrapper") as mock_tg_cls,
-        patch("teleshell.main.Summarizer") as mock_sum_cls,
+        patch("teleshell.telegram_client.TelegramClientWrapper") as mock_tg_cls,
+        patch("teleshell.summarizer.Summarizer") as mock_sum_cls,
     ):
 
         # Mock Config
@@ -26,14 +30,12 @@ def mock_infrastructure():
 
         # Mock Telegram
         mock_tg = mock_tg_cls.return_value
-        mock_msg_data = {
-            "id": 123,
-            "text": "Hello from Telegram",
-            "date": datetime.now(),
-        }
+        mock_msg_data = MessageRecord(123, "Hello from Telegram", datetime.now())
+
+        async def iter_messages(*args, **kwargs):
+            yield mock_msg_data
 
-        # New reliable counting: we must return messages if limit check happens
-        mock_tg.fetch_messages = AsyncMock(return_value=[mock_msg_data])
+        mock_tg.iter_messages = MagicMock(side_effect=iter_messages)
         mock_tg.start = AsyncMock()
 
         # Mock Summarizer returns dict
@@ -76,3 +78,192 @@ def test_full_summarize_flow(mock_infrastructure):
         mock_infrastructure["telegram"].start.assert_called_once()
         mock_infrastructure["summarizer"].summarize.assert_called_once()
         mock_infrastructure["config"].update_checkpoint.assert_called_once()
+
+
+def test_concurrent_summarize_keeps_channel_order(mock_infrastructure):
+    """Channels finishing out of order are still rendered in the requested order."""
+
+    async def slow_first(messages, channel_name, **kwargs):
+        # The first channel finishes last
+        await asyncio.sleep(0.05 if channel_name == "@first" else 0)
+        return {"content": f"Summary of {channel_name}", "metadata": {}}
+
+    mock_infrastructure["summarizer"].summarize.side_effect = slow_first
+    runner = CliRunner()
+
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_API_ID": "123",
+            "TELEGRAM_API_HASH": "hash",
+            "GEMINI_API_KEY": "key",
+        },
+    ):
+        result = runner.invoke(cli, ["summarize", "-c", "@first,@second", "-t", "24h"])
+
+    assert result.exit_code == 0
+    assert result.output.index("Summary of @first") < result.output.index(
+        "Summary of @second"
+    )
+    assert mock_infrastructure["config"].update_checkpoint.call_count == 2
+
+
+def test_failed_summary_skips_checkpoint(mock_infrastructure):
+    """A channel whose summary fails is not checkpointed; the others still are."""
+
+    async def fail_first(messages, channel_name, **kwargs):
+        if channel_name == "@first":
+            raise SummarizationError("boom")
+        return {"content": "OK", "metadata": {}}
+
+    mock_infrastructure["summarizer"].summarize.side_effect = fail_first
+    runner = CliRunner()
+
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_API_ID": "123",
+            "TELEGRAM_API_HASH": "hash",
+            "GEMINI_API_KEY": "key",
+        },
+    ):
+        result = runner.invoke(cli, ["summarize", "-c", "@first,@second", "-t", "24h"])
+
+    assert result.exit_code == 0
+    assert "Summarization failed for @first" in result.output
+    mock_infrastructure["config"].update_checkpoint.assert_called_once()
+    assert mock_infrastructure["config"].update_checkpoint.call_args[0][0] == "@second"
+
+
+def test_fetch_limit_checkpoints_oldest_batch(mock_infrastructure):
+    """With a fetch_limit, the oldest messages are summarized and checkpointed."""
+    config = mock_infrastructure["config"].load.return_value
+    config["fetch_limit"] = 2
+    now = datetime.now()
+
+    async def iter_messages(*args, **kwargs):
+        assert kwargs["limit"] == 3
+        for msg_id in (1, 2, 3):
+            yield MessageRecord(msg_id, f"msg {msg_id}", now)
+
+    mock_infrastructure["telegram"].iter_messages.side_effect = iter_messages
+    runner = CliRunner()
+
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_API_ID": "123",
+            "TELEGRAM_API_HASH": "hash",
+            "GEMINI_API_KEY": "key",
+        },
+    ):
+        result = runner.invoke(cli, ["summarize", "-c", "@test", "-t", "today"])
+
+    assert result.exit_code == 0
+    assert "Limit reached" in result.output
+    summarized = mock_infrastructure["summarizer"].summarize.call_args[1]["messages"]
+    assert [m.id for m in summarized] == [1, 2]
+    assert mock_infrastructure["config"].update_checkpoint.call_args[0][1] == 2
+
+
+def test_digest_checkpoints_each_channel(mock_infrastructure):
+    """Digest mode summarizes small channels in one call, checkpointed per channel."""
+    mock_sum = mock_infrastructure["summarizer"]
+    mock_sum.summarize_digest = AsyncMock(
+        return_value=[
+            {"content": "Digest of @first", "metadata": {"digest": 3}},
+            None,
+            {"content": "Digest of @third", "metadata": {"digest": 3}},
+        ]
+    )
+    runner = CliRunner()
+
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_API_ID": "123",
+            "TELEGRAM_API_HASH": "hash",
+            "GEMINI_API_KEY": "key",
+        },
+    ):
+        result = runner.invoke(
+            cli,
+            ["summarize", "-c", "@first,@second,@third", "-t", "24h", "--digest"],
+        )
+
+    assert result.exit_code == 0
+    mock_sum.summarize_digest.assert_called_once()
+    mock_sum.summarize.assert_not_called()
+    assert "Digest of @first" in result.output
+    assert "Summarization failed for @second" in result.output
+    checkpointed = [
+        c[0][0] for c in mock_infrastructure["config"].update_checkpoint.call_args_list
+    ]
+    assert checkpointed == ["@first", "@third"]
+
+
+def test_metrics_out_writes_channel_records(mock_infrastructure, tmp_path):
+    """--metrics-out appends one JSON record per channel and prints a summary."""
+    mock_infrastructure["telegram"].resolve_time.return_value = 0.25
+    metrics_file = tmp_path / "metrics.jsonl"
+    runner = CliRunner()
+
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_API_ID": "123",
+            "TELEGRAM_API_HASH": "hash",
+            "GEMINI_API_KEY": "key",
+        },
+    ):
+        result = runner.invoke(
+            cli,
+            [
+                "summarize",
+                "-c",
+                "@test",
+                "-t",
+                "24h",
+                "--metrics-out",
+                str(metrics_file),
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert "Run Metrics" in result.output
+    (record,) = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    assert record["channel"] == "@test"
+    assert record["status"] == "ok"
+    assert record["messages"] == 1
+    assert record["resolve_time"] == 0.25
+    assert record["input_tokens"] == 10
+    assert "fetch_time" in record
+    assert "checkpoint_time" in record
+
+
+def test_ndjson_output_writes_one_record_per_channel(mock_infrastructure):
+    """-o ndjson prints one JSON record per channel and no Rich panels."""
+    runner = CliRunner()
+
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_API_ID": "123",
+            "TELEGRAM_API_HASH": "hash",
+            "GEMINI_API_KEY": "key",
+        },
+    ):
+        result = runner.invoke(
+            cli, ["summarize", "-c", "@test,@other", "-t", "24h", "-o", "ndjson"]
+        )
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted(r["channel"] for r in records) == ["@other", "@test"]
+    record = next(r for r in records if r["channel"] == "@test")
+    assert record["title"] == "Test Title"
+    assert record["summary"] == "AI Summary Result"
+    assert record["metadata"]["input_tokens"] == 10
+    assert record["messages"]["last_id"] == 123
+    assert record["checkpoint"]["last_message_id"] == 123
+    assert mock_infrastructure["config"].update_checkpoint.call_count == 2
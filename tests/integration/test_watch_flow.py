@@ -0,0 +1,214 @@
+import asyncio
+from click.testing import CliRunner
+from unittest.mock import patch, AsyncMock, MagicMock
+from teleshell.main import cli
+from teleshell.models import MessageRecord
+from teleshell.summarizer import SummarizationError
+from datetime import datetime
+
+
+def test_watch_summarizes_when_count_threshold_reached():
+    """New messages are buffered and summarized once the count threshold is hit."""
+    with (
+        patch("teleshell.main.ConfigManager") as mock_config_cls,
+        patch("teleshell.telegram_client.TelegramClientWrapper") as mock_tg_cls,
+        patch("teleshell.summarizer.Summarizer") as mock_sum_cls,
+        patch.dict(
+            "os.environ",
+            {
+                "TELEGRAM_API_ID": "123",
+                "TELEGRAM_API_HASH": "hash",
+                "GEMINI_API_KEY": "key",
+            },
+        ),
+    ):
+        mock_config = mock_config_cls.return_value
+        mock_config.load.return_value = {
+            "default_channels": ["@live"],
+            "channel_titles": {"@live": "Live Channel"},
+            "summary_config": {"length": "short"},
+            "prompt_templates": {"default_summary": "Template {{messages}}"},
+            "watch": {"max_messages": 2, "max_wait": 600},
+        }
+
+        mock_tg = mock_tg_cls.return_value
+        mock_tg.start = AsyncMock()
+        subscriptions = {}
+
+        async def subscribe(channels, callback):
+            subscriptions["channels"] = channels
+            subscriptions["callback"] = callback
+            return {}
+
+        async def run_until_disconnected(on_reconnect=None):
+            # Simulate Telegram pushing three messages, then disconnecting
+            for msg_id in (1, 2, 3):
+                await subscriptions["callback"](
+                    "@live",
+                    MessageRecord(msg_id, f"news {msg_id}", datetime.now()),
+                )
+
+        mock_tg.subscribe_new_messages = AsyncMock(side_effect=subscribe)
+        mock_tg.run_until_disconnected = AsyncMock(side_effect=run_until_disconnected)
+
+        mock_sum = mock_sum_cls.return_value
+        mock_sum.summarize = AsyncMock(
+            return_value={"content": "Live Summary", "metadata": {}}
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["watch"])
+
+    assert result.exit_code == 0
+    assert subscriptions["channels"] == ["@live"]
+    assert "TeleShell Summary: Live Channel" in result.output
+    mock_sum.summarize.assert_called_once()
+    summarized = mock_sum.summarize.call_args[1]["messages"]
+    assert [m.id for m in summarized] == [1, 2]
+    mock_config.update_checkpoint.assert_called_once()
+    assert mock_config.update_checkpoint.call_args[0][:2] == ("@live", 2)
+
+
+def test_watch_retries_failed_batch_before_checkpointing():
+    """A batch that failed is summarized with the next one, never skipped."""
+    with (
+        patch("teleshell.main.ConfigManager") as mock_config_cls,
+        patch("teleshell.telegram_client.TelegramClientWrapper") as mock_tg_cls,
+        patch("teleshell.summarizer.Summarizer") as mock_sum_cls,
+        patch.dict(
+            "os.environ",
+            {
+                "TELEGRAM_API_ID": "123",
+                "TELEGRAM_API_HASH": "hash",
+                "GEMINI_API_KEY": "key",
+            },
+        ),
+    ):
+        mock_config = mock_config_cls.return_value
+        mock_config.load.return_value = {
+            "default_channels": ["@live"],
+            "channel_titles": {"@live": "Live Channel"},
+            "summary_config": {"length": "short"},
+            "prompt_templates": {"default_summary": "Template {{messages}}"},
+            "watch": {"max_messages": 2, "max_wait": 600},
+        }
+
+        mock_tg = mock_tg_cls.return_value
+        mock_tg.start = AsyncMock()
+        subscriptions = {}
+
+        async def subscribe(channels, callback):
+            subscriptions["callback"] = callback
+            return {}
+
+        async def run_until_disconnected(on_reconnect=None):
+            # Two batches of two messages; the first one fails
+            for msg_id in (1, 2, 3, 4):
+                await subscriptions["callback"](
+                    "@live",
+                    MessageRecord(msg_id, f"news {msg_id}", datetime.now()),
+                )
+
+        mock_tg.subscribe_new_messages = AsyncMock(side_effect=subscribe)
+        mock_tg.run_until_disconnected = AsyncMock(side_effect=run_until_disconnected)
+
+        mock_sum = mock_sum_cls.return_value
+        mock_sum.summarize = AsyncMock(
+            side_effect=[
+                SummarizationError("boom"),
+                {"content": "Live Summary", "metadata": {}},
+            ]
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["watch"])
+
+    assert result.exit_code == 0
+    assert "Summarization failed for Live Channel" in result.output
+    batches = [
+        [m.id for m in call[1]["messages"]]
+        for call in mock_sum.summarize.call_args_list
+    ]
+    assert batches == [[1, 2], [1, 2, 3, 4]]
+    mock_config.update_checkpoint.assert_called_once()
+    assert mock_config.update_checkpoint.call_args[0][:2] == ("@live", 4)
+
+
+def test_watch_backfills_from_checkpoint_and_after_reconnect():
+    """Messages missed before startup or while disconnected are summarized."""
+    with (
+        patch("teleshell.main.ConfigManager") as mock_config_cls,
+        patch("teleshell.telegram_client.TelegramClientWrapper") as mock_tg_cls,
+        patch("teleshell.summarizer.Summarizer") as mock_sum_cls,
+        patch.dict(
+            "os.environ",
+            {
+                "TELEGRAM_API_ID": "123",
+                "TELEGRAM_API_HASH": "hash",
+                "GEMINI_API_KEY": "key",
+            },
+        ),
+    ):
+        mock_config = mock_config_cls.return_value
+        mock_config.load.return_value = {
+            "default_channels": ["@live", "@gone"],
+            "channel_titles": {"@live": "Live Channel"},
+            "summary_config": {"length": "short"},
+            "prompt_templates": {"default_summary": "Template {{messages}}"},
+            "watch": {"max_messages": 3, "max_wait": 600},
+            "checkpoints": {"@live": {"last_message_id": 10}},
+        }
+
+        mock_tg = mock_tg_cls.return_value
+        mock_tg.start = AsyncMock()
+        subscriptions = {}
+        history = [11, 12]
+        offsets = []
+
+        async def subscribe(channels, callback):
+            subscriptions["callback"] = callback
+            return {"@gone": "No user has 'gone' as username"}
+
+        def iter_messages(channel, offset_id):
+            offsets.append((channel, offset_id))
+
+            async def gen():
+                for msg_id in history:
+                    if msg_id > offset_id:
+                        yield MessageRecord(msg_id, f"news {msg_id}", datetime.now())
+
+            return gen()
+
+        async def run_until_disconnected(on_reconnect=None):
+            # A live message arrives while the startup backfill is pending
+            history.append(13)
+            await subscriptions["callback"](
+                "@live", MessageRecord(13, "news 13", datetime.now())
+            )
+            await asyncio.sleep(0.05)
+            # Message 14 is posted while disconnected and never pushed
+            history.append(14)
+            on_reconnect()
+            await asyncio.sleep(0.05)
+
+        mock_tg.subscribe_new_messages = AsyncMock(side_effect=subscribe)
+        mock_tg.iter_messages = MagicMock(side_effect=iter_messages)
+        mock_tg.run_until_disconnected = AsyncMock(side_effect=run_until_disconnected)
+
+        mock_sum = mock_sum_cls.return_value
+        mock_sum.summarize = AsyncMock(
+            return_value={"content": "Live Summary", "metadata": {}}
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["watch"])
+
+    assert result.exit_code == 0
+    assert "Skipping @gone" in result.output
+    assert "Watching 1 channels" in result.output
+    assert offsets == [("@live", 10), ("@live", 13)]
+    summarized = mock_sum.summarize.call_args[1]["messages"]
+    assert [m.id for m in summarized] == [11, 12, 13]
+    # Message 14 is still buffered, so the checkpoint stops at 13
+    mock_config.update_checkpoint.assert_called_once()
+    assert mock_config.update_checkpoint.call_args[0][:2] == ("@live", 13)
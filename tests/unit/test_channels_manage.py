@@ -1,7 +1,9 @@
+import asyncio
 import pytest
 from click.testing import CliRunner
 from unittest.mock import patch, MagicMock, AsyncMock
 from teleshell.main import cli
+import InquirerPy.inquirer  # noqa: F401 - loaded so it can be patched
 import os
 
 @pytest.fixture
@@ -9,8 +11,8 @@ def mock_manage_infra():
     """Mock the infrastructure required for the manage command."""
     with (
         patch("teleshell.main.ConfigManager") as mock_config_cls,
-        patch("teleshell.main.TelegramClientWrapper") as mock_tg_cls,
-        patch("teleshell.main.inquirer") as mock_inquirer,
+        patch("teleshell.telegram_client.TelegramClientWrapper") as mock_tg_cls,
+        patch("InquirerPy.inquirer") as mock_inquirer,
         patch.dict("os.environ", {"TELEGRAM_API_ID": "123", "TELEGRAM_API_HASH": "hash"})
     ):
         # Mock Config
@@ -66,3 +68,86 @@ def test_channels_manage_flow(mock_manage_infra):
     saved_config = mock_manage_infra["config"].save.call_args[0][0]
     assert saved_config["default_channels"] == ["@a"]
     assert saved_config["channel_titles"]["@a"] == "Channel A"
+
+
+def test_channels_manage_opens_from_dialog_index(mock_manage_infra, tmp_path):
+    """
+    With a populated dialog index the TUI opens from the cache, the refresh is
+    incremental, and titles of tracked channels are synced from Telegram.
+    """
+    from datetime import datetime, timezone
+    from teleshell.dialog_index import DialogIndex
+
+    index = DialogIndex(tmp_path)
+    index.update(
+        [
+            {"title": "Old Title", "handle": "old", "folder_id": 0, "id": 2,
+             "is_channel": True, "is_group": False,
+             "date": datetime(2026, 2, 1, tzinfo=timezone.utc)},
+        ],
+        {0: "Main"},
+        full=True,
+    )
+    index.close()
+
+    mock_config = mock_manage_infra["config"]
+    mock_config.base_dir = tmp_path
+    mock_config.load.return_value = {
+        "default_channels": ["@old"],
+        "channel_titles": {"@old": "Old Title"},
+        "dialog_index": {"enabled": True, "ttl_hours": 24},
+    }
+    mock_tg = mock_manage_infra["telegram"]
+    mock_tg.fetch_dialogs = AsyncMock(return_value=[
+        {"title": "Renamed", "handle": "old", "folder_id": 0, "id": 2,
+         "is_channel": True, "is_group": False,
+         "date": datetime(2026, 2, 3, tzinfo=timezone.utc)},
+    ])
+    calls = []
+    mock_tg.start = AsyncMock(side_effect=lambda: calls.append("login"))
+
+    async def select():
+        calls.append("tui")
+        await asyncio.sleep(0.01)  # the background refresh runs meanwhile
+        calls.append("selected")
+        return ["@old"]
+
+    mock_manage_infra["inquirer"].checkbox.return_value.execute_async = select
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["channels", "manage"])
+
+    assert result.exit_code == 0
+    # Any login prompt is finished before the TUI takes the terminal
+    assert calls == ["login", "tui", "selected"]
+    # The TUI was built from the indexed dialog
+    choices = mock_manage_infra["inquirer"].checkbox.call_args[1]["choices"]
+    assert any("Old Title" in str(getattr(c, "name", "")) for c in choices)
+    # Only dialogs active since the newest indexed one were requested
+    since = mock_tg.fetch_dialogs.call_args[1]["since"]
+    assert since == datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+    saved_config = mock_config.save.call_args[0][0]
+    assert saved_config["channel_titles"]["@old"] == "Renamed"
+    dialogs, _ = DialogIndex(tmp_path).load()
+    assert dialogs[0]["title"] == "Renamed"
+
+
+def test_channels_manage_closes_index_without_channels(mock_manage_infra, tmp_path):
+    """The dialog index is closed even when there is nothing to manage."""
+    from teleshell.dialog_index import DialogIndex
+
+    mock_config = mock_manage_infra["config"]
+    mock_config.base_dir = tmp_path
+    mock_config.load.return_value = {
+        "default_channels": [],
+        "dialog_index": {"enabled": True},
+    }
+    mock_manage_infra["telegram"].fetch_dialogs = AsyncMock(return_value=[])
+
+    with patch.object(DialogIndex, "close", autospec=True) as mock_close:
+        result = CliRunner().invoke(cli, ["channels", "manage"])
+
+    assert result.exit_code == 0
+    assert "No channels or groups found" in result.output
+    mock_close.assert_called_once()
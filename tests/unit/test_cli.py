@@ -1,4 +1,5 @@
 from click.testing import CliRunner
+from unittest.mock import patch
 from teleshell.main import cli
 
 
@@ -12,3 +13,46 @@ def test_cli_summarize_options():
     runner = CliRunner()
     result = runner.invoke(cli, ["summarize", "--help"])
     assert "--channels" in result.output
+
+
+def test_cli_search_cached_messages(tmp_path):
+    from datetime import datetime, timezone
+    from teleshell.message_store import MessageStore
+    from teleshell.models import MessageRecord
+
+    store = MessageStore(tmp_path)
+    date = datetime(2026, 2, 18, 10, 0, tzinfo=timezone.utc)
+    store.record_sync(
+        "@news",
+        [MessageRecord(1, "The merger was approved", date)],
+        extend=False,
+    )
+    store.close()
+
+    runner = CliRunner()
+    with patch("teleshell.main.ConfigManager") as mock_cls:
+        mock_cls.return_value.base_dir = tmp_path
+        mock_cls.return_value.load.return_value = {
+            "channel_titles": {"@news": "News"},
+            "message_cache": True,
+        }
+        result = runner.invoke(cli, ["search", "merger", "-c", "@news"])
+        missing = runner.invoke(cli, ["search", "weather"])
+
+    assert result.exit_code == 0
+    assert "News" in result.output
+    assert "merger was approved" in result.output
+    assert "1 result(s)" in result.output
+    assert "No cached messages match 'weather'" in missing.output
+
+
+def test_cli_reports_invalid_templates():
+    from teleshell.templates import TemplateError
+
+    runner = CliRunner()
+    with patch("teleshell.main.ConfigManager") as mock_cls:
+        mock_cls.return_value.load.side_effect = TemplateError("bad placeholder")
+        result = runner.invoke(cli, ["channels", "list"])
+
+    assert result.exit_code == 1
+    assert "Invalid config.yaml: bad placeholder" in result.output
@@ -1,5 +1,7 @@
+import pytest
 import yaml
 from teleshell.config import ConfigManager
+from teleshell.templates import TemplateError
 
 
 def test_load_default_config(tmp_path):
@@ -64,3 +66,67 @@ def test_save_with_argument(tmp_path):
     # Reload to verify
     loaded = manager.load()
     assert loaded["default_channels"] == ["@passed_arg"]
+
+
+def test_checkpoints_are_not_written_to_yaml(tmp_path):
+    """Checkpoints live in the checkpoint store, not in config.yaml."""
+    config_dir = tmp_path / ".teleshell"
+    manager = ConfigManager(config_dir=str(config_dir))
+    manager.load()
+    manager.update_checkpoint("@test", 5, "2024-02-18T10:30:00Z")
+    manager.save()
+
+    with open(config_dir / "config.yaml") as f:
+        assert "checkpoints" not in yaml.safe_load(f)
+    assert manager.load()["checkpoints"]["@test"]["last_message_id"] == 5
+    assert not list(config_dir.glob("*.tmp"))
+
+
+def test_legacy_yaml_checkpoints_are_migrated(tmp_path):
+    """Checkpoints from an older config.yaml are imported into the store."""
+    config_dir = tmp_path / ".teleshell"
+    config_dir.mkdir()
+    legacy = {
+        "checkpoints": {
+            "@old": {"last_message_id": 42, "last_message_date": "2024-02-18"}
+        }
+    }
+    with open(config_dir / "config.yaml", "w") as f:
+        yaml.dump(legacy, f)
+
+    ConfigManager(config_dir=str(config_dir)).load()
+    (config_dir / "config.yaml").unlink()
+
+    config = ConfigManager(config_dir=str(config_dir)).load()
+    assert config["checkpoints"]["@old"]["last_message_id"] == 42
+
+
+def test_batched_checkpoints_never_move_backwards(tmp_path):
+    """Batch updates commit together and ignore older checkpoints."""
+    config_dir = tmp_path / ".teleshell"
+    first = ConfigManager(config_dir=str(config_dir))
+    second = ConfigManager(config_dir=str(config_dir))
+
+    first.update_checkpoints(
+        {
+            "@a": {"last_message_id": 10, "last_message_date": "d10"},
+            "@b": {"last_message_id": 20, "last_message_date": "d20"},
+        }
+    )
+    # A concurrent, slower process finishing with an older checkpoint
+    second.update_checkpoint("@a", 7, "d7")
+
+    checkpoints = ConfigManager(config_dir=str(config_dir)).load()["checkpoints"]
+    assert checkpoints["@a"]["last_message_id"] == 10
+    assert checkpoints["@b"]["last_message_id"] == 20
+
+
+def test_load_rejects_unknown_template_placeholders(tmp_path):
+    """A misspelled placeholder fails at load time, not in the LLM prompt."""
+    config_dir = tmp_path / ".teleshell"
+    config_dir.mkdir()
+    with open(config_dir / "config.yaml", "w") as f:
+        yaml.dump({"prompt_templates": {"default_summary": "{{channel}}"}}, f)
+
+    with pytest.raises(TemplateError, match="channel"):
+        ConfigManager(config_dir=str(config_dir)).load()
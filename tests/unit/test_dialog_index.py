@@ -0,0 +1,69 @@
+import time
+from datetime import datetime, timezone
+from teleshell.dialog_index import DialogIndex
+
+
+def _dialog(d_id, title, handle=None, day=1, folder_id=0):
+    return {
+        "id": d_id,
+        "title": title,
+        "handle": handle,
+        "folder_id": folder_id,
+        "is_channel": True,
+        "is_group": False,
+        "date": datetime(2026, 2, day, tzinfo=timezone.utc),
+    }
+
+
+def test_index_round_trip(tmp_path):
+    """Indexed dialogs and folders come back in the fetch_* formats."""
+    index = DialogIndex(tmp_path)
+    assert index.last_full_refresh() is None
+    assert index.is_stale(24)
+
+    index.update(
+        [_dialog(1, "News", "news", day=3), _dialog(2, "Chat", day=5, folder_id=7)],
+        {0: "Main", 7: "Work"},
+        full=True,
+    )
+
+    dialogs, folders = index.load()
+    assert folders == {0: "Main", 7: "Work"}
+    assert sorted(d["id"] for d in dialogs) == [1, 2]
+    news = next(d for d in dialogs if d["id"] == 1)
+    assert news["handle"] == "news"
+    assert news["is_channel"] is True
+    assert index.latest_date() == datetime(2026, 2, 5, tzinfo=timezone.utc)
+    assert not index.is_stale(24)
+    index.close()
+
+
+def test_incremental_update_keeps_other_dialogs(tmp_path):
+    """An incremental update upserts changed dialogs; a full one prunes left ones."""
+    index = DialogIndex(tmp_path)
+    index.update([_dialog(1, "News"), _dialog(2, "Chat")], {0: "Main"}, full=True)
+    refreshed_at = index.last_full_refresh()
+
+    index.update([_dialog(2, "Chat (renamed)", day=9)], {0: "Main"})
+    dialogs, _ = index.load()
+    assert {d["id"]: d["title"] for d in dialogs} == {1: "News", 2: "Chat (renamed)"}
+    assert index.last_full_refresh() == refreshed_at
+
+    index.update([_dialog(2, "Chat (renamed)", day=9)], {0: "Main"}, full=True)
+    dialogs, _ = index.load()
+    assert [d["id"] for d in dialogs] == [2]
+    index.close()
+
+
+def test_index_staleness(tmp_path):
+    """The index needs a full refresh once its TTL has passed."""
+    index = DialogIndex(tmp_path)
+    index.update([_dialog(1, "News")], {0: "Main"}, full=True)
+    with index.conn:
+        index.conn.execute(
+            "UPDATE index_state SET full_refresh_at = ?", (time.time() - 7200,)
+        )
+
+    assert index.is_stale(1)
+    assert not index.is_stale(3)
+    index.close()
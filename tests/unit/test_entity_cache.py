@@ -0,0 +1,28 @@
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerSelf
+from teleshell.entity_cache import EntityCache
+
+
+def test_entity_cache_persists_across_instances(tmp_path):
+    """Resolved peers are written to disk and shared by spelling of the handle."""
+    cache = EntityCache(tmp_path)
+    cache.put("@News", InputPeerChannel(channel_id=42, access_hash=-7))
+    cache.put("@group", InputPeerChat(chat_id=5))
+
+    reloaded = EntityCache(tmp_path)
+    peer = reloaded.get("https://t.me/news")
+    assert isinstance(peer, InputPeerChannel)
+    assert (peer.channel_id, peer.access_hash) == (42, -7)
+    assert reloaded.get("group") == InputPeerChat(chat_id=5)
+    assert reloaded.get("@unknown") is None
+
+
+def test_entity_cache_invalidate(tmp_path):
+    """Invalidated handles are forgotten on disk as well."""
+    cache = EntityCache(tmp_path)
+    cache.put("@news", InputPeerChannel(channel_id=42, access_hash=-7))
+    cache.put("@me", InputPeerSelf())  # not cacheable
+
+    cache.invalidate("@NEWS")
+
+    assert EntityCache(tmp_path).get("@news") is None
+    assert EntityCache(tmp_path).get("@me") is None
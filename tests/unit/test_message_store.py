@@ -0,0 +1,250 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from telethon.tl.types import Message
+from teleshell.message_store import MATCH_START, MessageStore, fts_query
+from teleshell.models import MessageRecord
+from teleshell.telegram_client import TelegramClientWrapper
+
+BASE = datetime(2026, 2, 18, 10, 0, tzinfo=timezone.utc)
+
+
+def _record(msg_id, minutes):
+    return MessageRecord(msg_id, f"msg {msg_id}", BASE + timedelta(minutes=minutes), 7)
+
+
+def test_store_round_trip(tmp_path):
+    """Stored records come back in ID order with UTC dates."""
+    store = MessageStore(tmp_path)
+    store.record_sync("@c", [_record(1, 0), _record(2, 5)], extend=False)
+
+    records = list(store.iter_messages("@c"))
+
+    assert [r.id for r in records] == [1, 2]
+    assert records[1].date == BASE + timedelta(minutes=5)
+    assert records[0].sender_id == 7
+    store.close()
+
+
+def test_store_keeps_reply_ids(tmp_path):
+    store = MessageStore(tmp_path)
+    reply = MessageRecord(2, "re", BASE, 7, reply_to=1)
+    store.record_sync("@c", [_record(1, 0), reply], extend=False)
+
+    assert [r.reply_to for r in store.iter_messages("@c")] == [None, 1]
+    store.close()
+
+
+def test_store_coverage_by_date_and_id(tmp_path):
+    """Windows starting inside the synced range are served from the store."""
+    store = MessageStore(tmp_path)
+    store.record_sync("@c", [_record(10, 0), _record(11, 5)], extend=False, since=BASE)
+    store.record_sync("@c", [_record(12, 10)], extend=True)
+
+    assert store.covered_high_id("@c", offset_date=BASE + timedelta(minutes=1)) == 12
+    assert store.covered_high_id("@c", offset_date=BASE - timedelta(hours=1)) is None
+    assert store.covered_high_id("@c", offset_id=11) == 12
+    assert store.covered_high_id("@c", offset_id=5) is None
+    assert store.covered_high_id("@other", offset_id=11) is None
+    store.close()
+
+
+def _text_record(msg_id, minutes, text):
+    return MessageRecord(msg_id, text, BASE + timedelta(minutes=minutes), 7)
+
+
+def test_search_ranks_and_filters_by_channel_and_date(tmp_path):
+    """Search matches words in stored texts, filtered by channel and date."""
+    store = MessageStore(tmp_path)
+    store.record_sync(
+        "@News",
+        [
+            _text_record(1, 0, "Merger talks with Acme"),
+            _text_record(2, 60, "Weather is fine"),
+            _text_record(3, 120, "Merger approved: merger closes soon"),
+        ],
+        extend=False,
+    )
+    store.record_sync(
+        "@other",
+        [
+            _text_record(
+                1, 0, "Rumours about a possible merger are circulating again today"
+            )
+        ],
+        extend=False,
+    )
+
+    hits = store.search("merger")
+    assert len(hits) == 3
+    # The message mentioning it twice ranks first
+    assert (hits[0].channel, hits[0].message.id) == ("@News", 3)
+    assert MATCH_START + "merger" in hits[0].snippet
+
+    by_channel = store.search("merger", channels=["news"])
+    assert [h.message.id for h in by_channel] == [3, 1]
+    assert store.search("merger", channels=["@missing"]) == []
+
+    since = store.search("merger", since=BASE + timedelta(minutes=30))
+    assert [h.message.id for h in since] == [3]
+    until = store.search("merger", until=BASE + timedelta(minutes=30))
+    assert sorted(h.channel for h in until) == ["@News", "@other"]
+    store.close()
+
+
+def test_search_index_follows_updates(tmp_path):
+    """Re-fetched, edited messages are re-indexed instead of duplicated."""
+    store = MessageStore(tmp_path)
+    store.record_sync("@c", [_text_record(1, 0, "old wording")], extend=False)
+    store.store_messages("@c", [_text_record(1, 0, "new wording")])
+
+    assert store.search("old") == []
+    assert [h.message.text for h in store.search("wording")] == ["new wording"]
+    store.close()
+
+
+def test_search_indexes_messages_stored_before_search(tmp_path):
+    """Databases created before the index existed are indexed on open."""
+    store = MessageStore(tmp_path)
+    store.record_sync("@c", [_text_record(1, 0, "legacy merger")], extend=False)
+    store.conn.executescript(
+        "DROP TRIGGER messages_fts_insert; DROP TRIGGER messages_fts_delete; "
+        "DROP TRIGGER messages_fts_update; DROP TABLE messages_fts;"
+    )
+    store.close()
+
+    reopened = MessageStore(tmp_path)
+    assert [h.message.id for h in reopened.search("merger")] == [1]
+    reopened.close()
+
+
+def test_search_any_word_ranks_questions(tmp_path):
+    """Questions match messages with any of their words, best first."""
+    store = MessageStore(tmp_path)
+    store.record_sync(
+        "@c",
+        [
+            _text_record(1, 0, "What a day"),
+            _text_record(2, 5, "Merger approved by the board"),
+            _text_record(3, 10, "Lunch menu"),
+        ],
+        extend=False,
+    )
+
+    hits = store.search("what about the merger?", any_word=True)
+
+    assert [h.message.id for h in hits][0] == 2
+    assert 3 not in [h.message.id for h in hits]
+    assert store.search("what about the merger?") == []
+    store.close()
+
+
+def test_fts_query_quotes_words():
+    """Plain searches are not parsed as FTS5 syntax, except prefix and OR."""
+    assert fts_query('merger "acme-corp"') == '"merger" """acme-corp"""'
+    assert fts_query("merg* OR acme") == '"merg"* OR "acme"'
+    assert fts_query("OR ") == ""
+    assert fts_query("merger OR acme deal", any_word=True) == (
+        '"merger" OR "acme" OR "deal"'
+    )
+
+
+def _telethon_message(msg_id, minutes):
+    msg = MagicMock(spec=Message)
+    msg.id = msg_id
+    msg.text = f"msg {msg_id}"
+    msg.date = BASE + timedelta(minutes=minutes)
+    msg.sender_id = 7
+    return msg
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_only_fetches_above_high_water_mark(tmp_path):
+    """A re-run over an overlapping window only requests new messages."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
+
+        batches = [
+            [_telethon_message(1, 0), _telethon_message(2, 30)],
+            [_telethon_message(3, 60)],
+        ]
+
+        def iter_messages(*args, **kwargs):
+            async def gen():
+                for msg in batches.pop(0):
+                    yield msg
+
+            return gen()
+
+        mock_client_instance.iter_messages = MagicMock(side_effect=iter_messages)
+
+        store = MessageStore(tmp_path)
+        wrapper = TelegramClientWrapper(123, "hash", message_store=store)
+
+        first = [r async for r in wrapper.iter_messages("@c", offset_date=BASE)]
+        second = [
+            r
+            async for r in wrapper.iter_messages(
+                "@c", offset_date=BASE + timedelta(minutes=10)
+            )
+        ]
+
+        assert [r.id for r in first] == [1, 2]
+        # Message 1 is older than the second window; 2 comes from the store
+        assert [r.id for r in second] == [2, 3]
+        _, kwargs = mock_client_instance.iter_messages.call_args
+        assert kwargs["min_id"] == 2
+        assert "offset_date" not in kwargs
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_after_interrupted_sync(tmp_path):
+    """Rows of an older range are not served after a restarted sync failed."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
+
+        history = [_telethon_message(i, i * 10) for i in range(1, 7)]
+        fail_after = {}
+
+        def iter_messages(*args, min_id=0, offset_date=None, **kwargs):
+            async def gen():
+                for msg in history:
+                    if msg.id > fail_after.get("id", msg.id):
+                        raise ConnectionError("connection lost")
+                    if msg.id > min_id and (
+                        offset_date is None or msg.date > offset_date
+                    ):
+                        yield msg
+
+            return gen()
+
+        mock_client_instance.iter_messages = MagicMock(side_effect=iter_messages)
+
+        store = MessageStore(tmp_path)
+        wrapper = TelegramClientWrapper(123, "hash", message_store=store)
+
+        recent = BASE + timedelta(minutes=45)
+        assert [
+            r.id async for r in wrapper.iter_messages("@c", offset_date=recent)
+        ] == [5, 6]
+
+        # A longer window starts a new range and fails after two messages
+        fail_after["id"] = 2
+        with pytest.raises(ConnectionError):
+            async for _ in wrapper.iter_messages("@c", offset_date=BASE):
+                pass
+        del fail_after["id"]
+
+        rerun = [r.id async for r in wrapper.iter_messages("@c", offset_date=BASE)]
+
+        assert rerun == [1, 2, 3, 4, 5, 6]
+        _, kwargs = mock_client_instance.iter_messages.call_args
+        assert kwargs["min_id"] == 2
+        store.close()
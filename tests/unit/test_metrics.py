@@ -0,0 +1,59 @@
+import json
+from teleshell.metrics import RunMetrics, metrics_path
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_metrics_records_timings_and_usage():
+    """Timings accumulate per channel and summary usage is copied over."""
+    clock = FakeClock()
+    metrics = RunMetrics("summarize", clock=clock)
+
+    with metrics.timed("@a", "fetch_time"):
+        clock.now += 1.5
+    with metrics.timed("@a", "fetch_time"):
+        clock.now += 0.5
+    metrics.record("@a", messages=12, status="ok")
+    metrics.record_result(
+        "@a",
+        {"latency": 2.0, "ttft": 0.4, "input_tokens": 100, "output_tokens": 20},
+    )
+    metrics.record("@b", messages=3, status="summary_failed")
+
+    records = metrics.records()
+    assert [r["channel"] for r in records] == ["@a", "@b"]
+    assert records[0]["fetch_time"] == 2.0
+    assert records[0]["llm_latency"] == 2.0
+    assert records[0]["ttft"] == 0.4
+    assert records[0]["run_id"] == records[1]["run_id"] == metrics.run_id
+
+    totals = metrics.totals()
+    assert totals["messages"] == 15
+    assert totals["input_tokens"] == 100
+
+
+def test_metrics_write_appends_json_lines(tmp_path):
+    """Each run appends one JSON line per channel."""
+    path = tmp_path / "out" / "metrics.jsonl"
+    for _ in range(2):
+        metrics = RunMetrics("summarize")
+        metrics.record("@a", messages=1)
+        metrics.write(path)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["run_id"] != lines[1]["run_id"]
+
+
+def test_metrics_path_from_config(tmp_path):
+    """Metrics are written only when enabled, by default next to the config."""
+    assert metrics_path({"enabled": False}, tmp_path) is None
+    assert metrics_path({"enabled": True}, tmp_path) == tmp_path / "metrics.jsonl"
+    custom = tmp_path / "custom.jsonl"
+    assert metrics_path({"enabled": True, "path": str(custom)}, tmp_path) == custom
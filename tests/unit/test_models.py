@@ -0,0 +1,21 @@
+import sys
+from datetime import datetime, timezone
+from teleshell.models import MessageRecord
+
+DATE = datetime(2026, 2, 18, tzinfo=timezone.utc)
+
+
+def test_message_record_is_compact():
+    """Records have no per-instance __dict__ and are smaller than the old dicts."""
+    record = MessageRecord(1, "hello", DATE, 7)
+    as_dict = {"id": 1, "text": "hello", "date": DATE, "sender_id": 7}
+
+    assert not hasattr(record, "__dict__")
+    assert sys.getsizeof(record) < sys.getsizeof(as_dict)
+
+
+def test_message_record_equality():
+    """Records compare by value."""
+    assert MessageRecord(1, "a", DATE) == MessageRecord(1, "a", DATE)
+    assert MessageRecord(1, "a", DATE) != MessageRecord(2, "a", DATE)
+    assert "MessageRecord(id=1" in repr(MessageRecord(1, "a", DATE))
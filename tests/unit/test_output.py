@@ -0,0 +1,91 @@
+import io
+import json
+from datetime import datetime
+
+from teleshell.models import MessageRecord
+from teleshell.output import RecordWriter, outcome_record
+
+
+def _outcome(channel="@test", status="ok"):
+    return {
+        "channel": channel,
+        "title": "Test Title",
+        "status": status,
+        "error": None,
+        "is_limited": False,
+        "messages": [
+            MessageRecord(1, "first", datetime(2024, 2, 18, 10, 0)),
+            MessageRecord(5, "last", datetime(2024, 2, 18, 12, 0)),
+        ],
+        "result": {"content": "Summary", "metadata": {"model": "test-model"}},
+    }
+
+
+def test_outcome_record_describes_message_range():
+    record = outcome_record(_outcome(), {"last_message_id": 5})
+
+    assert record["summary"] == "Summary"
+    assert record["metadata"] == {"model": "test-model"}
+    assert record["messages"] == {
+        "count": 2,
+        "first_id": 1,
+        "last_id": 5,
+        "from": "2024-02-18T10:00:00",
+        "to": "2024-02-18T12:00:00",
+        "is_limited": False,
+    }
+    assert record["checkpoint"] == {"last_message_id": 5}
+
+
+def test_outcome_record_without_messages():
+    outcome = {"channel": "@test", "title": "@test", "status": "empty"}
+
+    record = outcome_record(outcome)
+
+    assert record["summary"] is None
+    assert record["messages"] is None
+    assert record["checkpoint"] is None
+
+
+def test_json_writer_streams_a_valid_array():
+    stream = io.StringIO()
+    writer = RecordWriter(stream, "json")
+
+    writer.write(outcome_record(_outcome("@a")))
+    writer.write(outcome_record(_outcome("@b")))
+    writer.close()
+
+    assert [r["channel"] for r in json.loads(stream.getvalue())] == ["@a", "@b"]
+
+
+def test_json_writer_without_records():
+    stream = io.StringIO()
+    writer = RecordWriter(stream, "json")
+    writer.close()
+
+    assert json.loads(stream.getvalue()) == []
+
+
+def test_ndjson_writer_writes_one_line_per_record():
+    stream = io.StringIO()
+    writer = RecordWriter(stream, "ndjson")
+
+    writer.write(outcome_record(_outcome("@a")))
+    writer.write(outcome_record(_outcome("@b", status="summary_failed")))
+    writer.close()
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["status"] for line in lines] == ["ok", "summary_failed"]
+
+
+def test_markdown_writer_writes_a_section_per_channel():
+    stream = io.StringIO()
+    writer = RecordWriter(stream, "markdown")
+
+    writer.write(outcome_record(_outcome()))
+    writer.close()
+
+    output = stream.getvalue()
+    assert output.startswith("## Test Title\n")
+    assert "_2 messages," in output
+    assert "Summary" in output
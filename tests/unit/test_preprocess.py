@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from teleshell.models import MessageRecord
+from teleshell.preprocess import normalize_text, preprocess_messages
+
+DATE = datetime(2026, 2, 18, tzinfo=timezone.utc)
+
+ANNOUNCEMENT = (
+    "The quarterly community call takes place on Thursday at 18:00 UTC. "
+    "We will discuss the roadmap, the new staking rewards and answer questions "
+    "from the community about the upcoming token migration."
+)
+
+
+def _msg(msg_id, text, forward_key=None):
+    return MessageRecord(msg_id, text, DATE, 1, forward_key)
+
+
+def test_normalize_text_shrinks_urls_and_emoji():
+    """Emoji and extra whitespace disappear; links are kept unless opted in."""
+    text = "🚀🚀 Launch!  Read https://Example.com/blog/post?utm_source=tg now 🎉"
+    assert normalize_text(text) == (
+        "Launch! Read https://Example.com/blog/post?utm_source=tg now"
+    )
+    assert normalize_text(text, normalize_urls=True) == (
+        "Launch! Read <example.com/blog/post> now"
+    )
+    assert normalize_text(text, strip_emoji=False) == (
+        "🚀🚀 Launch! Read https://Example.com/blog/post?utm_source=tg now 🎉"
+    )
+    assert normalize_text("see www.example.com/#top", normalize_urls=True) == (
+        "see <example.com>"
+    )
+
+
+def test_preprocess_drops_noise_and_duplicates():
+    """Short, forwarded, exact and near-duplicate messages are dropped."""
+    messages = [
+        _msg(1, ANNOUNCEMENT, forward_key="-100:7"),
+        _msg(2, "ok"),
+        _msg(3, "👍👍"),
+        _msg(4, ANNOUNCEMENT.upper()),
+        _msg(5, "Different caption of the same post", forward_key="-100:7"),
+        _msg(6, ANNOUNCEMENT.replace("Thursday", "Friday")),
+        _msg(7, "Price of the token dropped 5% after the exchange listing."),
+    ]
+
+    kept, dropped = preprocess_messages(messages, {"min_chars": 3})
+
+    assert [m.id for m in kept] == [1, 7]
+    assert dropped == {"short": 2, "forward": 1, "duplicate": 1, "near_duplicate": 1}
+    # Records are copied, not mutated
+    assert messages[2].text == "👍👍"
+
+
+def test_preprocess_respects_config():
+    """Individual stages can be switched off."""
+    messages = [
+        _msg(1, ANNOUNCEMENT),
+        _msg(2, ANNOUNCEMENT.replace("Thursday", "Friday")),
+        _msg(3, "short reply"),
+    ]
+
+    kept, dropped = preprocess_messages(
+        messages, {"near_duplicates": False, "min_words": 3}
+    )
+
+    assert [m.id for m in kept] == [1, 2]
+    assert dropped["short"] == 1
+    assert dropped["near_duplicate"] == 0
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from typing import Dict
+
+# Modules that must only be imported by the commands that need them
+HEAVY_MODULES = ("litellm", "telethon", "InquirerPy", "rich.markdown")
+
+# Generous ceiling for importing the CLI, far below the multi-second cost of
+# importing litellm alone
+STARTUP_BUDGET_SECONDS = 1.0
+
+
+def _import_times(code: str) -> Dict[str, float]:
+    """Run code under `python -X importtime` and map module -> cumulative seconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def test_cli_import_skips_heavy_dependencies():
+    """Importing the CLI (as `tshell --help` does) must not load heavy libraries."""
+    times = _import_times("import teleshell.main")
+
+    loaded = [m for m in HEAVY_MODULES if m in times]
+    assert loaded == []
+
+
+def test_channels_list_skips_heavy_dependencies(tmp_path):
+    """`tshell channels list` only needs YAML and must stay lightweight."""
+    code = (
+        "import sys; from pathlib import Path; from unittest.mock import patch; "
+        f"patch.object(Path, 'home', return_value=Path({str(tmp_path)!r})).start(); "
+        "from teleshell.main import cli; "
+        "sys.argv = ['tshell', 'channels', 'list']; cli()"
+    )
+    times = _import_times(code)
+
+    loaded = [m for m in HEAVY_MODULES if m in times]
+    assert loaded == []
+
+
+def test_cli_import_time_budget():
+    """Guard against startup regressions in the CLI import graph."""
+    times = _import_times("import teleshell.main")
+    assert times["teleshell.main"] < STARTUP_BUDGET_SECONDS
@@ -1,8 +1,28 @@
+import asyncio
+import httpx
 import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
-from teleshell.summarizer import Summarizer, SummarizationError
+from teleshell.models import MessageRecord
+from teleshell.summarizer import (
+    LLMScheduler,
+    MessageFormatter,
+    Summarizer,
+    SummarizationError,
+    TokenBucket,
+    TokenBudget,
+    chunk_lines,
+    digest_groups,
+    fit_to_budget,
+    parse_digest,
+    relative_time,
+    sender_alias,
+)
 import litellm.exceptions
 
+DATE = datetime(2026, 2, 18)
+
 
 def test_prompt_construction():
     """Test if prompt is correctly constructed using templates and placeholders."""
@@ -23,6 +43,91 @@ def test_prompt_construction():
     assert "Msg 1\nMsg 2" in prompt
 
 
+def test_prompt_from_message_lines():
+    """Message lines are joined while rendering and counted."""
+    summarizer = Summarizer(api_key="test_key")
+
+    prompt = summarizer.build_prompt(
+        template="{{message_count}} messages:\n{{messages}}",
+        channel_name="@test",
+        time_period="today",
+        summary_length_guideline="",
+        messages=["- a", "- b"],
+    )
+
+    assert prompt.startswith("2 messages:\n- a\n- b\n\nFormat the output")
+
+
+@pytest.mark.asyncio
+async def test_summarize_uses_message_format():
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = _llm_response("Summary")
+
+        summarizer = Summarizer(api_key="test_key")
+        await summarizer.summarize(
+            messages=[MessageRecord(4, "hello", DATE), MessageRecord(5, "world", DATE)],
+            channel_name="@test",
+            time_period="today",
+            config={"message_format": "#{{id}} {{text}}"},
+            template="{{messages}}",
+        )
+
+    prompt = mock_acompletion.call_args.kwargs["messages"][0]["content"]
+    assert prompt.startswith("#4 hello\n#5 world")
+
+
+@pytest.mark.asyncio
+async def test_summarize_compact_format_has_legend():
+    """Compact lines are preceded by a legend explaining their notation."""
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = _llm_response("Summary")
+
+        summarizer = Summarizer(api_key="test_key")
+        await summarizer.summarize(
+            messages=[MessageRecord(4, "hello", DATE, 501)],
+            channel_name="@test",
+            time_period="today",
+            config={"message_format": "compact"},
+            template="{{message_count}}\n{{messages}}",
+        )
+
+    prompt = mock_acompletion.call_args.kwargs["messages"][0]["content"]
+    assert prompt.startswith("1\nMessage lines: `+3h05` is the time")
+    assert "(`>?`: to an earlier message).\n+0m A: hello\n" in prompt
+
+
+def test_compact_message_format():
+    """Compact lines carry relative time, sender alias and reply target."""
+    start = datetime(2026, 2, 18, 10, 0)
+    messages = [
+        MessageRecord(1, "hello", start, sender_id=501),
+        MessageRecord(2, "hi", start + timedelta(minutes=45), 702, reply_to=1),
+        MessageRecord(3, "news", start + timedelta(hours=3, minutes=5), 501),
+        MessageRecord(4, "late", start + timedelta(days=2, hours=4), 903, reply_to=99),
+    ]
+
+    format_message = MessageFormatter({"message_format": "compact"}, messages)
+
+    assert [format_message(m) for m in messages] == [
+        "+0m A: hello",
+        "+45m B >A: hi",
+        "+3h05 A: news",
+        "+2d4h C >?: late",
+    ]
+
+
+def test_sender_aliases_and_relative_times():
+    assert [sender_alias(i) for i in (0, 25, 26, 27, 701)] == [
+        "A",
+        "Z",
+        "AA",
+        "AB",
+        "ZZ",
+    ]
+    assert relative_time(59) == "+0m"
+    assert relative_time(3600 * 25) == "+1d1h"
+
+
 def test_get_length_guideline():
     """Test translation of config length to text guideline."""
     summarizer = Summarizer(api_key="test_key")
@@ -49,7 +154,7 @@ async def test_summarize_call():
 
         summarizer = Summarizer(api_key="test_key")
         result = await summarizer.summarize(
-            messages=[{"text": "msg1"}],
+            messages=[MessageRecord(1, "msg1", DATE)],
             channel_name="@test",
             time_period="today",
             config={"length": "short"},
@@ -71,13 +176,450 @@ async def test_summarize_service_unavailable():
             message="Overloaded", model="gemini", llm_provider="google"
         )
 
-        summarizer = Summarizer(api_key="test_key")
+        summarizer = Summarizer(
+            api_key="test_key", scheduler=LLMScheduler(max_retries=2, base_delay=0)
+        )
         with pytest.raises(SummarizationError) as exc_info:
             await summarizer.summarize(
-                messages=[{"text": "msg1"}],
+                messages=[MessageRecord(1, "msg1", DATE)],
                 channel_name="@test",
                 time_period="today",
                 config={"length": "short"},
                 template="Summarize {{messages}}",
             )
         assert "overloaded" in str(exc_info.value)
+        assert mock_acompletion.call_count == 3
+
+
+def test_chunk_lines_respects_budget():
+    """Lines are grouped into consecutive chunks within the token budget."""
+    lines = ["x" * 40] * 10  # ~11 tokens each
+
+    chunks = list(chunk_lines(lines, max_tokens=25))
+
+    assert len(chunks) == 5
+    assert all(len(c) == 2 for c in chunks)
+    assert sum(chunks, []) == lines
+
+
+def test_chunk_lines_oversized_line():
+    """A line larger than the budget becomes its own chunk."""
+    chunks = list(chunk_lines(["short", "y" * 400, "short"], max_tokens=10))
+    assert chunks == [["short"], ["y" * 400], ["short"]]
+
+
+def _llm_response(content, prompt_tokens=10, completion_tokens=5):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.model = "gemini/gemini-flash-latest"
+    response.usage.prompt_tokens = prompt_tokens
+    response.usage.completion_tokens = completion_tokens
+    return response
+
+
+@pytest.mark.asyncio
+async def test_summarize_map_reduce():
+    """Large message sets are summarized per chunk and then combined."""
+    prompts = []
+
+    async def fake_completion(model, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        if "partial summaries" in messages[0]["content"]:
+            return _llm_response("Final summary")
+        return _llm_response(f"Partial {len(prompts)}")
+
+    with patch("litellm.acompletion", side_effect=fake_completion):
+        summarizer = Summarizer(api_key="test_key")
+        result = await summarizer.summarize(
+            messages=[MessageRecord(i, "m" * 40, DATE) for i in range(6)],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short", "chunk_tokens": 25},
+            template="Summarize {{messages}}",
+        )
+
+    assert result["content"] == "Final summary"
+    meta = result["metadata"]
+    assert meta["chunks"] == 3
+    assert [s["stage"] for s in meta["stages"]] == ["map", "reduce"]
+    assert meta["stages"][0]["calls"] == 3
+    assert meta["input_tokens"] == 40
+    assert meta["output_tokens"] == 20
+    # The final combine call sees every partial summary
+    assert all(f"Partial {i}" in prompts[-1] for i in (1, 2, 3))
+
+
+@pytest.mark.asyncio
+async def test_summarize_chunk_calls_share_run_limit():
+    """Chunk calls hold a slot of the run-level limiter, not their own pool."""
+    active = 0
+    peak = 0
+
+    async def fake_completion(model, messages, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _llm_response("Partial")
+
+    with patch("litellm.acompletion", side_effect=fake_completion):
+        summarizer = Summarizer(api_key="test_key")
+        result = await summarizer.summarize(
+            messages=[MessageRecord(i, "m" * 40, DATE) for i in range(8)],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short", "chunk_tokens": 25, "chunk_concurrency": 4},
+            template="Summarize {{messages}}",
+            limit=asyncio.Semaphore(2),
+        )
+
+    assert result["metadata"]["stages"][0]["calls"] == 4
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_summarize_preprocesses_messages():
+    """Noise and duplicates are filtered before the prompt is built."""
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = _llm_response("Summary")
+
+        summarizer = Summarizer(api_key="test_key")
+        result = await summarizer.summarize(
+            messages=[
+                MessageRecord(
+                    1, "Release 2.0 is out, see https://example.com/notes", DATE
+                ),
+                MessageRecord(2, "ok", DATE),
+                MessageRecord(
+                    3, "Release 2.0 is out, see https://example.com/notes", DATE
+                ),
+                # Media without a caption is not counted as filtered
+                MessageRecord(4, "", DATE),
+            ],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short", "preprocessing": {"enabled": True}},
+            template="Summarize {{messages}}",
+        )
+
+    prompt = mock_acompletion.call_args.kwargs["messages"][0]["content"]
+    assert prompt.startswith(
+        "Summarize - Release 2.0 is out, see https://example.com/notes\n"
+    )
+    prep = result["metadata"]["preprocessing"]
+    assert prep["input_messages"] == 3
+    assert prep["kept_messages"] == 1
+    assert prep["dropped"]["short"] == 1
+    assert prep["dropped"]["duplicate"] == 1
+    assert prep["tokens_saved"] > 0
+
+
+def test_fit_to_budget_strategies():
+    """Lines are kept newest-first or sampled evenly, in original order."""
+    lines = [f"{i}" * 39 for i in range(10)]  # 10 tokens each
+
+    assert fit_to_budget(lines, 100) == lines
+    assert fit_to_budget(lines, 35) == lines[-3:]
+    assert fit_to_budget(lines, 50, strategy="sample") == lines[1::2]
+
+
+@pytest.mark.asyncio
+async def test_summarize_trims_to_token_budget():
+    """Messages are trimmed to the channel and run budgets before the call."""
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = _llm_response("Summary")
+
+        summarizer = Summarizer(api_key="test_key")
+        budget = TokenBudget(1000)
+        result = await summarizer.summarize(
+            messages=[MessageRecord(i, f"message {i} " * 10, DATE) for i in range(20)],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short", "token_budget": {"per_channel": 150}},
+            template="Summarize {{messages}}",
+            budget=budget,
+        )
+
+    prompt = mock_acompletion.call_args.kwargs["messages"][0]["content"]
+    assert "message 19" in prompt
+    assert "message 0 " not in prompt
+    meta = result["metadata"]
+    assert meta["trimming"]["limit"] == 150
+    assert meta["trimming"]["run_limited"] is False
+    assert 0 < meta["estimated_input_tokens"] <= 150
+    assert 850 <= budget.remaining < 1000
+
+
+@pytest.mark.asyncio
+async def test_summarize_run_budget_exhausted():
+    """A summary that cannot fit the remaining run budget fails before any call."""
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        summarizer = Summarizer(api_key="test_key")
+        with pytest.raises(SummarizationError):
+            await summarizer.summarize(
+                messages=[MessageRecord(1, "msg1", DATE)],
+                channel_name="@test",
+                time_period="today",
+                config={"length": "short"},
+                template="Summarize {{messages}}",
+                budget=TokenBudget(0),
+            )
+        mock_acompletion.assert_not_called()
+
+
+def test_digest_groups_packs_small_channels():
+    """Small channels are packed in order; large ones and singletons are left out."""
+    groups = digest_groups(
+        [100, 5000, 300, 400, 200, 50], max_tokens=700, max_channel_tokens=1000
+    )
+    assert groups == [[0, 2], [3, 4, 5]]
+    assert digest_groups([100, 5000], max_tokens=700, max_channel_tokens=1000) == []
+
+
+def test_parse_digest_sections():
+    """Numbered sections are split out; empty and repeated ones are ignored."""
+    text = (
+        "Here is the digest.\n"
+        "=== CHANNEL 1 ===\n- **Launch** news\n\n"
+        "**=== Channel [3] ===**\nQuiet day.\n"
+        "=== CHANNEL 2 ===\n"
+        "=== CHANNEL 1 ===\nDuplicate"
+    )
+    assert parse_digest(text) == {1: "- **Launch** news", 3: "Quiet day."}
+
+
+@pytest.mark.asyncio
+async def test_summarize_digest_single_call():
+    """Several channels share one LLM call and get their own sections back."""
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = _llm_response(
+            "=== CHANNEL 1 ===\nAbout A\n=== CHANNEL 2 ===\nAbout B"
+        )
+
+        summarizer = Summarizer(api_key="test_key")
+        results = await summarizer.summarize_digest(
+            [
+                ("@a", "today", [MessageRecord(1, "news from a", DATE)]),
+                ("@b", "today", [MessageRecord(2, "news from b", DATE)]),
+                ("@c", "today", [MessageRecord(3, "news from c", DATE)]),
+            ],
+            config={"length": "short"},
+        )
+
+    mock_acompletion.assert_called_once()
+    prompt = mock_acompletion.call_args.kwargs["messages"][0]["content"]
+    assert "### [3] @c (today)\n- news from c" in prompt
+    assert results[0]["content"] == "About A"
+    assert results[1]["content"] == "About B"
+    assert results[1]["metadata"]["digest"] == 3
+    assert results[2] is None
+
+
+@pytest.mark.asyncio
+async def test_ask_sends_most_relevant_messages_in_order():
+    """Only the best matches that fit the budget are sent, oldest first."""
+    now = datetime(2026, 2, 18, 12, 0)
+    ranked = [
+        MessageRecord(7, "merger approved by the board", now),
+        MessageRecord(2, "merger talks started", now - timedelta(days=3)),
+        MessageRecord(9, "x" * 400 + " merger", now),
+    ]
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = _llm_response("It was approved.")
+
+        summarizer = Summarizer(api_key="test_key")
+        result = await summarizer.ask(
+            "what happened with the merger?",
+            ranked,
+            channel_name="@news",
+            time_period="last 30d",
+            config={"length": "short"},
+            max_tokens=150,
+        )
+
+    prompt = mock_acompletion.call_args.kwargs["messages"][0]["content"]
+    assert "Question: what happened with the merger?" in prompt
+    assert "- merger talks started\n- merger approved by the board" in prompt
+    assert "x" * 400 not in prompt
+    assert result["content"] == "It was approved."
+    assert result["metadata"]["retrieval"] == {"candidates": 3, "selected": 2}
+
+
+def _stream_chunk(content=None, usage=None):
+    delta = SimpleNamespace(content=content)
+    choices = [SimpleNamespace(delta=delta)] if content is not None else []
+    return SimpleNamespace(
+        model="gemini/gemini-flash-latest", choices=choices, usage=usage
+    )
+
+
+@pytest.mark.asyncio
+async def test_summarize_streams_final_call():
+    """With on_text, the summary is streamed and time to first token recorded."""
+
+    async def stream():
+        for token in ("Hello", " ", "world"):
+            yield _stream_chunk(token)
+        yield _stream_chunk(
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+        )
+
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.return_value = stream()
+
+        received = []
+        summarizer = Summarizer(api_key="test_key")
+        result = await summarizer.summarize(
+            messages=[MessageRecord(1, "msg1", DATE)],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short"},
+            template="Summarize {{messages}}",
+            on_text=received.append,
+        )
+
+    assert mock_acompletion.call_args.kwargs["stream"] is True
+    assert received == ["Hello", "Hello ", "Hello world"]
+    assert result["content"] == "Hello world"
+    meta = result["metadata"]
+    assert meta["input_tokens"] == 12
+    assert meta["output_tokens"] == 3
+    assert 0 <= meta["ttft"] <= meta["latency"] + 0.01
+
+
+def _rate_limit_error():
+    return litellm.exceptions.RateLimitError(
+        message="Too many requests", model="gemini", llm_provider="google"
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_reservations():
+    """Reservations beyond the budget wait until the bucket has refilled."""
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)  # 1 unit per second
+
+    assert bucket.reserve(50) == 0
+    assert bucket.reserve(20) == pytest.approx(10)
+    # A later caller queues behind the earlier overdraft
+    assert bucket.reserve(5) == pytest.approx(15)
+
+    clock.now = 15
+    assert bucket.reserve(1) == pytest.approx(1)
+
+    # Refunding an over-estimate frees budget for the next caller
+    bucket.adjust(-10)
+    assert bucket.reserve(5) == 0
+
+
+@pytest.mark.asyncio
+async def test_summarize_retries_rate_limits():
+    """Rate-limited calls are retried by the scheduler and counted in metadata."""
+    responses = [_rate_limit_error(), _rate_limit_error(), _llm_response("Summary")]
+
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_acompletion.side_effect = responses
+        summarizer = Summarizer(
+            api_key="test_key", scheduler=LLMScheduler(base_delay=0.01)
+        )
+        result = await summarizer.summarize(
+            messages=[MessageRecord(1, "msg1", DATE)],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short"},
+            template="Summarize {{messages}}",
+        )
+
+    assert result["content"] == "Summary"
+    assert result["metadata"]["retries"] == 2
+    assert mock_acompletion.call_count == 3
+    # litellm must not retry on its own behind the scheduler's back
+    assert mock_acompletion.call_args[1]["num_retries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_backoff_is_shared():
+    """A rate limit hit by one call pauses calls that start afterwards."""
+    scheduler = LLMScheduler(base_delay=0.2)
+    started = {}
+    loop = asyncio.get_running_loop()
+
+    async def limited():
+        if "first" not in started:
+            started["first"] = loop.time()
+            raise _rate_limit_error()
+        return "ok"
+
+    async def other():
+        started["other"] = loop.time()
+        return "ok"
+
+    first = asyncio.create_task(scheduler.run(limited))
+    await asyncio.sleep(0.01)
+    result, retries = await scheduler.run(other)
+    await first
+
+    assert result == "ok"
+    assert retries == 0
+    # The jittered delay is at least half of base_delay
+    assert started["other"] - started["first"] >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_scheduler_waits_at_least_retry_after():
+    """Jitter never shortens the delay the provider asked for."""
+    scheduler = LLMScheduler(base_delay=0.01)
+    response = httpx.Response(
+        429,
+        headers={"retry-after": "0.2"},
+        request=httpx.Request("POST", "https://example.com"),
+    )
+    calls = []
+    loop = asyncio.get_running_loop()
+
+    async def limited():
+        calls.append(loop.time())
+        if len(calls) == 1:
+            raise litellm.exceptions.RateLimitError(
+                message="Too many requests",
+                model="gemini",
+                llm_provider="google",
+                response=response,
+            )
+        return "ok"
+
+    with patch("teleshell.summarizer.random.uniform", side_effect=lambda a, b: a):
+        result, retries = await scheduler.run(limited)
+
+    assert (result, retries) == ("ok", 1)
+    assert calls[1] - calls[0] >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_transient_errors():
+    """Timeouts and connection errors are retried like rate limits."""
+    scheduler = LLMScheduler(base_delay=0.001)
+    errors = [
+        litellm.exceptions.Timeout(
+            message="timed out", model="gemini", llm_provider="google"
+        ),
+        litellm.exceptions.APIConnectionError(
+            message="reset", model="gemini", llm_provider="google"
+        ),
+    ]
+
+    async def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert await scheduler.run(flaky) == ("ok", 2)
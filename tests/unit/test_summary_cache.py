@@ -0,0 +1,86 @@
+import os
+import time
+import pytest
+from datetime import datetime
+from unittest.mock import patch, AsyncMock, MagicMock
+from teleshell.summarizer import Summarizer
+from teleshell.models import MessageRecord
+from teleshell.summary_cache import SummaryCache, make_cache_key
+
+DATE = datetime(2026, 2, 18)
+
+
+def test_cache_key_depends_on_messages_and_prompt():
+    """Keys change with message content, IDs and prompt inputs."""
+    msgs = [MessageRecord(1, "a", DATE), MessageRecord(2, "b", DATE)]
+    key = make_cache_key("model", "template", messages=msgs)
+
+    assert key == make_cache_key("model", "template", messages=list(msgs))
+    assert key != make_cache_key("model", "other template", messages=msgs)
+    assert key != make_cache_key("model", "template", messages=msgs[:1])
+    assert key != make_cache_key(
+        "model",
+        "template",
+        messages=[MessageRecord(1, "a", DATE), MessageRecord(3, "b", DATE)],
+    )
+
+
+def test_cache_round_trip_and_age_eviction(tmp_path):
+    """Entries are returned until they are older than max_age_days."""
+    cache = SummaryCache(tmp_path, max_age_days=1)
+    cache.put("k", {"content": "summary", "metadata": {"model": "m"}})
+
+    assert cache.get("k")["content"] == "summary"
+
+    old = time.time() - 2 * 86400
+    os.utime(cache.cache_dir / "k.json", (old, old))
+    assert cache.get("k") is None
+    assert not (cache.cache_dir / "k.json").exists()
+
+
+def test_cache_size_eviction(tmp_path):
+    """Only the newest max_entries results are kept."""
+    cache = SummaryCache(tmp_path, max_entries=2)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"content": key, "metadata": {}})
+        stamp = time.time() - 100 + i
+        os.utime(cache.cache_dir / f"{key}.json", (stamp, stamp))
+    cache.evict()
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_summarize_uses_cache(tmp_path):
+    """A repeated summary of the same messages skips the LLM call."""
+    with patch("litellm.acompletion", new_callable=AsyncMock) as mock_acompletion:
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "This is a summary."
+        mock_response.model = "gemini/gemini-flash-latest"
+        mock_response.usage.prompt_tokens = 10
+        mock_response.usage.completion_tokens = 5
+        mock_acompletion.return_value = mock_response
+
+        summarizer = Summarizer(api_key="test_key", cache=SummaryCache(tmp_path))
+        kwargs = dict(
+            messages=[MessageRecord(1, "msg1", DATE)],
+            channel_name="@test",
+            time_period="today",
+            config={"length": "short"},
+            template="Summarize {{messages}}",
+        )
+        first = await summarizer.summarize(**kwargs)
+        second = await summarizer.summarize(**kwargs)
+
+        mock_acompletion.assert_called_once()
+        assert second["content"] == first["content"]
+        assert second["metadata"]["cached"] is True
+        assert second["metadata"]["input_tokens"] == 0
+        assert "cached" not in first["metadata"]
+        # Timings of the original call are not reported again
+        assert "stages" in first["metadata"]
+        for key in ("ttft", "prompt_build_time", "stages"):
+            assert key not in second["metadata"]
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from teleshell.telegram_client import TelegramClientWrapper
@@ -27,6 +28,7 @@ async def test_fetch_messages_success():
         mock_client_instance = mock_client_class.return_value
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
 
         mock_msg = MagicMock(spec=Message)
         mock_msg.text = "Hello World"
@@ -128,6 +130,7 @@ async def test_fetch_messages_numeric_id_string():
         mock_client_instance = mock_client_class.return_value
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
         mock_client_instance.get_messages = AsyncMock(return_value=[])
 
         wrapper = TelegramClientWrapper(123, "hash")
@@ -149,3 +152,281 @@ async def test_fetch_messages_numeric_id_string():
         args, _ = mock_client_instance.get_messages.call_args
         assert args[0] == "@handle"
         assert isinstance(args[0], str)
+
+
+@pytest.mark.asyncio
+async def test_persistent_connection_is_reused():
+    """Fetches inside the wrapper's context manager share one connection."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
+        mock_client_instance.is_connected = MagicMock(return_value=False)
+        mock_client_instance.connect = AsyncMock(
+            side_effect=lambda: mock_client_instance.is_connected.configure_mock(
+                return_value=True
+            )
+        )
+        mock_client_instance.disconnect = AsyncMock()
+        mock_client_instance.get_messages = AsyncMock(return_value=[])
+
+        wrapper = TelegramClientWrapper(123, "hash", idle_timeout=None)
+        async with wrapper:
+            await wrapper.fetch_messages("@a", limit=10)
+            await wrapper.fetch_messages("@b", limit=10)
+
+        mock_client_instance.connect.assert_called_once()
+        mock_client_instance.__aenter__.assert_not_called()
+        mock_client_instance.disconnect.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_persistent_connection_reconnects_with_retries():
+    """A dropped connection is re-established, retrying transient failures."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.is_connected = MagicMock(return_value=False)
+        mock_client_instance.connect = AsyncMock(
+            side_effect=[ConnectionError("reset"), None]
+        )
+        mock_client_instance.disconnect = AsyncMock()
+
+        wrapper = TelegramClientWrapper(
+            123, "hash", idle_timeout=None, reconnect_delay=0
+        )
+        await wrapper.open()
+
+        assert mock_client_instance.connect.call_count == 2
+        await wrapper.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_connection_is_dropped():
+    """The long-lived connection is closed after idle_timeout with no activity."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.is_connected = MagicMock(return_value=True)
+        mock_client_instance.disconnect = AsyncMock()
+
+        wrapper = TelegramClientWrapper(123, "hash", idle_timeout=0.02)
+        await wrapper.open()
+        await asyncio.sleep(0.05)
+
+        mock_client_instance.disconnect.assert_called()
+        await wrapper.close()
+
+
+def _async_iter(items):
+    async def gen(*args, **kwargs):
+        for item in items:
+            yield item
+
+    return gen
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_streams_oldest_first():
+    """iter_messages yields compact records using Telethon's reverse iteration."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+
+        raw = []
+        for msg_id in (1, 2, 3):
+            msg = MagicMock(spec=Message)
+            msg.id = msg_id
+            msg.text = f"msg {msg_id}"
+            msg.date = MagicMock()
+            msg.sender_id = 999
+            raw.append(msg)
+        mock_client_instance.iter_messages = MagicMock(side_effect=_async_iter(raw))
+
+        wrapper = TelegramClientWrapper(123, "hash")
+        records = [r async for r in wrapper.iter_messages("-100", offset_id=7)]
+
+        assert [r.id for r in records] == [1, 2, 3]
+        assert records[0].text == "msg 1"
+        args, kwargs = mock_client_instance.iter_messages.call_args
+        assert args[0] == -100
+        assert kwargs == {"limit": None, "reverse": True, "min_id": 7}
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_resolves_entity_on_value_error():
+    """An unresolvable target is retried through get_input_entity."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+
+        msg = MagicMock(spec=Message)
+        msg.id = 5
+        msg.text = "found"
+        msg.date = MagicMock()
+        msg.sender_id = 1
+
+        async def failing(*args, **kwargs):
+            raise ValueError("Could not find the input entity")
+            yield  # pragma: no cover
+
+        mock_client_instance.iter_messages = MagicMock(
+            side_effect=[failing(), _async_iter([msg])()]
+        )
+        entity = MagicMock()
+        mock_client_instance.get_input_entity = AsyncMock(return_value=entity)
+
+        wrapper = TelegramClientWrapper(123, "hash")
+        records = [r async for r in wrapper.iter_messages("@handle")]
+
+        assert [r.id for r in records] == [5]
+        assert mock_client_instance.iter_messages.call_args[0][0] is entity
+
+
+@pytest.mark.asyncio
+async def test_subscribe_new_messages_routes_events():
+    """NewMessage events of subscribed chats reach the callback as records."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
+        mock_client_instance.get_peer_id = AsyncMock(return_value=-100123)
+        mock_client_instance.add_event_handler = MagicMock()
+
+        received = []
+
+        async def callback(channel, record):
+            received.append((channel, record.id))
+
+        wrapper = TelegramClientWrapper(123, "hash")
+        await wrapper.subscribe_new_messages(["@news"], callback)
+
+        handler = mock_client_instance.add_event_handler.call_args[0][0]
+        msg = MagicMock(spec=Message)
+        msg.id = 77
+        msg.text = "breaking"
+        msg.date = MagicMock()
+        msg.sender_id = 1
+        await handler(MagicMock(chat_id=-100123, message=msg))
+        await handler(MagicMock(chat_id=-100999, message=msg))
+
+        assert received == [("@news", 77)]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_new_messages_skips_unresolvable_channels():
+    """A channel that cannot be resolved is reported; the others are watched."""
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=lambda t: t)
+
+        async def get_peer_id(entity):
+            if entity == "@gone":
+                raise ValueError("No user has 'gone' as username")
+            return -100123
+
+        mock_client_instance.get_peer_id = AsyncMock(side_effect=get_peer_id)
+        mock_client_instance.add_event_handler = MagicMock()
+
+        wrapper = TelegramClientWrapper(123, "hash")
+        skipped = await wrapper.subscribe_new_messages(["@gone", "@news"], AsyncMock())
+
+        assert list(skipped) == ["@gone"]
+        mock_client_instance.add_event_handler.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_dialogs_since_stops_at_older_dialogs():
+    """Incremental fetch stops at the first non-pinned dialog older than since."""
+    from datetime import datetime, timezone
+
+    def dialog(d_id, day, pinned=False):
+        d = MagicMock()
+        d.id = d_id
+        d.name = f"Dialog {d_id}"
+        d.pinned = pinned
+        d.date = datetime(2026, 2, day, tzinfo=timezone.utc)
+        d.is_channel = True
+        d.is_group = False
+        d.entity.username = None
+        d.dialog.folder_id = 0
+        return d
+
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.iter_dialogs = MagicMock(
+            side_effect=_async_iter(
+                [dialog(1, 1, pinned=True), dialog(2, 20), dialog(3, 5), dialog(4, 28)]
+            )
+        )
+
+        wrapper = TelegramClientWrapper(123, "hash")
+        dialogs = await wrapper.fetch_dialogs(
+            since=datetime(2026, 2, 10, tzinfo=timezone.utc)
+        )
+
+        assert [d["id"] for d in dialogs] == [1, 2]
+        mock_client_instance.get_dialogs.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_uses_entity_cache(tmp_path):
+    """Handles are resolved once and served from the entity cache afterwards."""
+    from telethon.errors import ChannelPrivateError
+    from telethon.tl.types import InputPeerChannel
+    from teleshell.entity_cache import EntityCache
+
+    peer = InputPeerChannel(channel_id=42, access_hash=-7)
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(return_value=peer)
+        mock_client_instance.iter_messages = MagicMock(side_effect=_async_iter([]))
+
+        wrapper = TelegramClientWrapper(
+            123, "hash", base_dir=tmp_path, entity_cache=EntityCache(tmp_path)
+        )
+        assert [r async for r in wrapper.iter_messages("@news")] == []
+        # A later run (fresh cache instance) skips network resolution
+        wrapper.entity_cache = EntityCache(tmp_path)
+        assert [r async for r in wrapper.iter_messages("@News")] == []
+
+        mock_client_instance.get_input_entity.assert_awaited_once_with("@news")
+        assert mock_client_instance.iter_messages.call_args[0][0] == peer
+
+        # Losing access invalidates the cached entity
+        mock_client_instance.iter_messages = MagicMock(
+            side_effect=ChannelPrivateError(request=None)
+        )
+        with pytest.raises(ChannelPrivateError):
+            [r async for r in wrapper.iter_messages("@news")]
+        assert EntityCache(tmp_path).get("@news") is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_time_measured_without_entity_cache():
+    """Handle resolution is timed even when no entity cache is configured."""
+
+    async def resolve(target):
+        await asyncio.sleep(0.02)
+        return target
+
+    with patch("teleshell.telegram_client.TelegramClient") as mock_client_class:
+        mock_client_instance = mock_client_class.return_value
+        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+        mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+        mock_client_instance.get_input_entity = AsyncMock(side_effect=resolve)
+        mock_client_instance.iter_messages = MagicMock(side_effect=_async_iter([]))
+
+        wrapper = TelegramClientWrapper(123, "hash")
+        assert [r async for r in wrapper.iter_messages("@news")] == []
+
+        assert wrapper.resolve_time("@news") >= 0.02
+        mock_client_instance.get_input_entity.assert_awaited_once_with("@news")
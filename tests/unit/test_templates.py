@@ -0,0 +1,63 @@
+import pytest
+from teleshell.templates import (
+    TemplateError,
+    compile_template,
+    message_format_legend,
+    validate_templates,
+)
+
+
+def test_render_fills_placeholders_in_one_pass():
+    """Values are inserted as-is, even when they look like placeholders."""
+    template = compile_template("{{channel_name}}: {{ messages }} ({{time_period}})")
+
+    prompt = template.render(
+        {"channel_name": "{{messages}}", "messages": "hi", "time_period": "today"}
+    )
+
+    assert prompt == "{{messages}}: hi (today)"
+
+
+def test_render_joins_line_sequences_and_suffix():
+    template = compile_template("Messages:\n{{messages}}\nEnd")
+
+    assert template.render({"messages": ["- a", "- b"]}, suffix="!") == (
+        "Messages:\n- a\n- b\nEnd!"
+    )
+    assert template.render({"messages": ["a", "b"]}, separator="\n\n") == (
+        "Messages:\na\n\nb\nEnd"
+    )
+    assert template.render({"messages": []}) == "Messages:\n\nEnd"
+
+
+def test_compile_template_is_cached():
+    assert compile_template("{{text}}") is compile_template("{{text}}")
+    assert compile_template("a {{x}} b {{y}}").placeholders == {"x", "y"}
+
+
+def test_message_format_legend_explains_used_placeholders():
+    """Only formats with compact placeholders get a legend, naming just those."""
+    compact = message_format_legend("compact")
+    assert compact.startswith("Message lines: ")
+    assert all(mark in compact for mark in ("+3h05", "`B`", ">A", ">?"))
+
+    assert message_format_legend("{{sender}}: {{text}}") == (
+        "Message lines: `B` is an alias of the sender."
+    )
+    assert message_format_legend(None) == ""
+    assert message_format_legend("plain") == ""
+    assert message_format_legend("#{{id}} {{text}}") == ""
+
+
+def test_validate_templates_rejects_unknown_placeholders():
+    validate_templates(
+        {
+            "prompt_templates": {"default_summary": "{{messages}} {{message_count}}"},
+            "summary_config": {"message_format": "[{{id}}] {{text}}"},
+        }
+    )
+
+    with pytest.raises(TemplateError, match=r"default_summary.*\{\{mesages\}\}"):
+        validate_templates({"prompt_templates": {"default_summary": "{{mesages}}"}})
+    with pytest.raises(TemplateError, match="message_format"):
+        validate_templates({"summary_config": {"message_format": "{{messages}}"}})
@@ -44,3 +44,34 @@ def test_prepare_choices_handle_logic():
     # Sort order: NoHandle (N), User (U)
     assert choices[1].value == "456"
     assert choices[2].value == "@username"
+
+
+def test_prepare_choices_scales_linearly():
+    """
+    Micro-benchmark: 10k dialogs x 1k tracked channels. Matching against a
+    precomputed set keeps this well under a second; the former per-dialog
+    list rebuild and scan took well over a second.
+    """
+    import time
+
+    dialogs = [
+        {
+            "title": f"Channel {i}",
+            "handle": f"chan{i}" if i % 2 else None,
+            "folder_id": i % 5,
+            "id": 100000 + i,
+        }
+        for i in range(10_000)
+    ]
+    # Every tenth dialog is tracked, alternating handle/ID spellings
+    tracked = [
+        f"@Chan{i}" if i % 2 else str(100000 + i) for i in range(0, 10_000, 10)
+    ]
+
+    start = time.perf_counter()
+    choices = prepare_channel_choices(dialogs, {0: "Main"}, tracked)
+    elapsed = time.perf_counter() - start
+
+    selected = [c for c in choices if isinstance(c, Choice) and c.enabled]
+    assert len(selected) == 1_000
+    assert elapsed < 1.0
@@ -0,0 +1,25 @@
+from typing import List, Union
+from teleshell.utils import normalize_channel, unique_channels
+
+
+def test_normalize_channel_spellings():
+    """Handles, links and IDs of the same channel normalize to one key."""
+    assert normalize_channel("@SwaperCom") == "swapercom"
+    assert normalize_channel(" swapercom ") == "swapercom"
+    assert normalize_channel("https://t.me/SwaperCom/") == "swapercom"
+    assert normalize_channel(-1001234) == "-1001234"
+    assert normalize_channel("-1001234") == normalize_channel(-1001234)
+
+
+def test_unique_channels_keeps_first_spelling():
+    """Repeated channels are dropped while preserving order and spelling."""
+    channels: List[Union[str, int]] = [
+        "@News",
+        "news",
+        "@other",
+        "t.me/news",
+        42,
+        "42",
+        "",
+    ]
+    assert unique_channels(channels) == ["@News", "@other", 42]
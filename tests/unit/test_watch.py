@@ -0,0 +1,44 @@
+from datetime import datetime
+from teleshell.models import MessageRecord
+from teleshell.watch import WatchBuffer
+
+DATE = datetime(2026, 2, 18)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_buffer_ready_on_message_count():
+    """A channel is ready once it has buffered max_messages."""
+    buffer = WatchBuffer(max_messages=2, max_wait=60)
+
+    assert buffer.add("@a", MessageRecord(2, "", DATE)) is False
+    assert buffer.add("@b", MessageRecord(9, "", DATE)) is False
+    assert buffer.add("@a", MessageRecord(1, "", DATE)) is True
+
+    assert [m.id for m in buffer.pop("@a")] == [1, 2]
+    assert buffer.pop("@a") == []
+    assert len(buffer) == 1
+
+
+def test_buffer_due_on_wait_time():
+    """A channel is due once its oldest buffered message waited max_wait."""
+    clock = FakeClock()
+    buffer = WatchBuffer(max_messages=100, max_wait=60, clock=clock)
+
+    buffer.add("@a", MessageRecord(1, "", DATE))
+    clock.now = 30
+    buffer.add("@b", MessageRecord(2, "", DATE))
+    assert buffer.due() == []
+
+    clock.now = 60
+    assert buffer.due() == ["@a"]
+
+    buffer.pop("@a")
+    clock.now = 90
+    assert buffer.due() == ["@b"]